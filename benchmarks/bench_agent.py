@@ -0,0 +1,230 @@
+"""End-to-end benchmark of ReasoningAgent.handle and POST /chat.
+
+Runs the real agent, clients, limiter and stores against the local fake
+OpenAI server (tests/fake_openai_server.py) with scripted responses and a
+fixed per-call latency, so numbers are reproducible without an API key.
+For every concurrency level it reports end-to-end p50/p95/p99, throughput,
+per-stage latency and LLM calls per turn, and writes everything as JSON.
+
+    python benchmarks/bench_agent.py --clients 1 8 64 --turns 128
+    python benchmarks/bench_agent.py --baseline benchmarks/results/agent-<ts>.json
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import json
+import math
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from tests.fake_openai_server import FakeOpenAIServer
+
+CALCULATE = {"primary_intent": "calculate", "action_required": "compute expression", "urgency": "low", "complexity": "simple", "confidence": 0.9, "reasoning": "math"}
+NEUTRAL = {"label": "NEUTRAL", "score": 0.6, "reasoning": "plain request"}
+SELECT = {"intent": "calculator", "tool_arguments": {"expr": "6*7"}, "reasoning": "arithmetic"}
+SCRIPT = {
+    "analyze_intent": CALCULATE,
+    "analyze_sentiment": NEUTRAL,
+    "select_tool": SELECT,
+    "triage_message": {"intent_analysis": CALCULATE, "sentiment": NEUTRAL, "tool_selection": SELECT},
+    "rate_importance": {"importance": 0.4, "reasoning": "routine"},
+    "summarize_conversation": {"summary": "User asked for arithmetic", "key_topics": ["math"]},
+    "extract_important": {"important_facts": [], "importance_score": 0.1, "reasoning": "nothing durable"},
+    "extract_teaching": {"is_teaching": False, "learning_type": "none", "confidence": 0.1},
+    "analyze_user_profile": {"primary_interests": ["math"], "frequent_topics": ["arithmetic"], "communication_style": "brief"}
+}
+# Rotated so the response cache and single-flight cannot collapse every turn
+MESSAGES = [
+    "could you multiply six by seven for me",
+    "I need the product of six and seven please",
+    "work out six times seven and explain it",
+    "what do you get when six is multiplied by seven",
+    "help me compute six multiplied by seven"
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def _latency_summary(values):
+    return {
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _run_level(turn, clients, turns):
+    """Run turns calls of turn(message) from clients threads; turn returns (timings, llm_calls)"""
+    latencies, llm_calls, stages, errors = [], [], {}, []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            timings, calls = turn(MESSAGES[i % len(MESSAGES)] + f" (turn {i})")
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            llm_calls.append(calls)
+            for stage, seconds in timings.items():
+                stages.setdefault(stage, []).append(seconds)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(turns)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "clients": clients,
+        "turns": turns,
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "wall_seconds": round(wall, 4),
+        "throughput": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency": _latency_summary(latencies),
+        "llm_calls_per_turn": round(sum(llm_calls) / len(llm_calls), 2) if llm_calls else 0.0,
+        "stages": {stage: _latency_summary(values) for stage, values in sorted(stages.items())}
+    }
+
+
+def _handle_turn(agent):
+    def turn(message):
+        result = agent.handle(message)
+        return result.get("timings", {}), len(result.get("meta", {}).get("llm", {}).get("calls", []))
+    return turn
+
+
+def _chat_turn(base_url):
+    def turn(message):
+        request = urllib.request.Request(f"{base_url}/chat", data=json.dumps({"message": message}).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=120) as response:
+            debug = json.loads(response.read())["debug"]
+        return debug.get("timings", {}), sum(stage["calls"] for stage in debug.get("llm", {}).values())
+    return turn
+
+
+def run(clients_levels, turns, latency, targets, pipeline_mode):
+    commit = git_commit()
+    workdir = tempfile.mkdtemp(prefix="agent-bench-")
+    fake = FakeOpenAIServer(SCRIPT, latency=latency, text="Six times seven is 42.").start()
+    # Everything below reads its configuration from the environment at import time
+    os.chdir(workdir)
+    os.environ.update({"OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": fake.base_url, "EMBEDDING_FUNCTION": "hash",
+                       "PIPELINE_MODE": pipeline_mode, "LLM_CACHE_ENABLED": "false"})
+    # Unthrottled by default so the agent, not the provider quota, is measured
+    os.environ.setdefault("LLM_REQUESTS_PER_SECOND", "0")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "0")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(max(clients_levels) * 4))
+
+    # The agent logs every stage with print(); keep it out of the report
+    log = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(log):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from src import web
+        from src.bootstrap import build_agent
+        agent = build_agent()
+        app = web.create_app(agent)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="bench-web", daemon=True).start()
+    turn_fns = {"handle": _handle_turn(agent), "chat": _chat_turn(f"http://127.0.0.1:{server.server_port}")}
+
+    results = {}
+    try:
+        for target in targets:
+            results[target] = {}
+            for clients in clients_levels:
+                requests_before = len(fake.requests)
+                with contextlib.redirect_stdout(log):
+                    level = _run_level(turn_fns[target], clients, turns)
+                    # Background jobs are part of each turn's LLM cost
+                    agent.background.flush(timeout=60)
+                level["fake_server_requests_per_turn"] = round((len(fake.requests) - requests_before) / turns, 2)
+                results[target][str(clients)] = level
+                print(f"[bench] {target} x{clients}: p50 {level['latency']['p50']}s, p99 {level['latency']['p99']}s, "
+                      f"{level['throughput']} turns/s, {level['llm_calls_per_turn']} LLM calls/turn, {level['errors']} errors")
+    finally:
+        server.shutdown()
+        fake.stop()
+    return {
+        "timestamp": time.time(),
+        "commit": commit,
+        "config": {"clients": clients_levels, "turns": turns, "llm_latency": latency, "pipeline_mode": pipeline_mode,
+                   "limiter": {k: os.environ[k] for k in ("LLM_REQUESTS_PER_SECOND", "LLM_TOKENS_PER_MINUTE", "LLM_MAX_CONCURRENCY")}},
+        "results": results
+    }
+
+
+def compare(current, baseline):
+    """Print p50/p99/throughput change per target and concurrency level against a previous run"""
+    for target, levels in current["results"].items():
+        for clients, level in levels.items():
+            base = baseline.get("results", {}).get(target, {}).get(clients)
+            if not base:
+                continue
+            deltas = []
+            for label, now, before in (("p50", level["latency"]["p50"], base["latency"]["p50"]),
+                                       ("p99", level["latency"]["p99"], base["latency"]["p99"]),
+                                       ("throughput", level["throughput"], base["throughput"])):
+                change = (now - before) / before * 100 if before else 0.0
+                deltas.append(f"{label} {before} -> {now} ({change:+.1f}%)")
+            print(f"[bench] {target} x{clients} vs baseline: " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ReasoningAgent.handle and /chat against a fake LLM server")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--turns", type=int, default=128, help="turns per concurrency level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call (seconds)")
+    parser.add_argument("--target", choices=["handle", "chat", "both"], default="both")
+    parser.add_argument("--pipeline-mode", choices=["staged", "fused"], default="staged")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/agent-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    output = os.path.abspath(args.output or os.path.join(root, "results", f"agent-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    targets = ["handle", "chat"] if args.target == "both" else [args.target]
+
+    report = run(args.clients, args.turns, args.latency, targets, args.pipeline_mode)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results written to {output}")
+    if baseline:
+        with open(baseline, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Retrieval quality and indexing throughput of DocumentStore per chunk size and search mode.
+
+Writes a deterministic corpus of multi-paragraph .txt files, indexes it with
+each --chunk-sizes value (0 = every file whole, the pre-chunking behaviour)
+and then searches for sentences taken from random paragraphs, with a few
+words dropped. A query counts as recalled when one of the top k hits is
+the right file and its returned text contains the whole target sentence.
+For whole files it also reports head300_recall: the target was in the first
+300 characters, which is all search used to return. Indexing is reported
+as files/s, chunks/s and MB/s; HashingEmbeddingFunction keeps it offline.
+
+Each --modes value (vector, keyword, hybrid) is evaluated separately. Some
+paragraphs carry an error code such as ERR-40213; id_recall is how often a
+query of the form "what does ERR-40213 mean" finds its paragraph. Finally
+--lookup-chunks synthetic chunks are written straight to a KeywordIndex to
+time lexical lookups on a corpus far larger than the one embedded.
+
+    python benchmarks/bench_docs.py --files 200 --chunk-sizes 0 500 1000 2000
+    python benchmarks/bench_docs.py --chunk-sizes 1000 --modes vector keyword hybrid --lookup-chunks 500000
+    python benchmarks/bench_docs.py --baseline benchmarks/results/docs-<ts>.json
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import json
+import random
+import shutil
+import tempfile
+import time
+from src.store.embeddings import HashingEmbeddingFunction
+from src.store.document_store import DocumentStore
+from src.store.keyword_index import KeywordIndex
+from bench_agent import percentile, git_commit
+from bench_stores import Corpus
+
+
+def write_corpus(docs_dir: str, files: int, paragraphs: int, seed: int):
+    """Files of paragraphs of sentences; returns every (file, sentence) for sampling queries and every (file, error code)"""
+    corpus = Corpus(seed=seed)
+    sentences, codes = [], []
+    for i in range(files):
+        name = f"doc{i:05d}.txt"
+        body = []
+        for _ in range(paragraphs):
+            paragraph = [corpus.sentence(corpus.random.randint(8, 16)).capitalize() + "." for _ in range(corpus.random.randint(2, 6))]
+            sentences.extend((name, s) for s in paragraph)
+            if corpus.random.random() < 0.25:
+                code = f"ERR-{corpus.random.randint(10000, 99999)}"
+                codes.append((name, code))
+                paragraph.append(f"The log then shows {code}.")
+            body.append(" ".join(paragraph))
+        with open(os.path.join(docs_dir, name), 'w') as f:
+            f.write("\n\n".join(body))
+    return sentences, codes
+
+
+def _query(sentence: str, rng: random.Random) -> str:
+    words = sentence.rstrip(".").split()
+    keep = sorted(rng.sample(range(len(words)), max(3, int(len(words) * 0.7))))
+    return " ".join(words[i].lower() for i in keep)
+
+
+def evaluate(store: DocumentStore, targets, codes, k: int, mode: str, rng: random.Random) -> dict:
+    recalled = head_recalled = 0
+    latencies, returned_chars = [], []
+    for name, sentence in targets:
+        start = time.perf_counter()
+        hits = store.search(_query(sentence, rng), k=k, mode=mode)
+        latencies.append(time.perf_counter() - start)
+        returned_chars.append(sum(len(h["text"]) for h in hits))
+        recalled += any(h["source"] == name and sentence in h["text"] for h in hits)
+        head_recalled += any(h["source"] == name and sentence in h["text"][:300] for h in hits)
+    result = {
+        "recall": round(recalled / len(targets), 3),
+        "mean_returned_chars": round(sum(returned_chars) / len(returned_chars)),
+        "search_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "search_p95_ms": round(percentile(latencies, 95) * 1000, 2)
+    }
+    if codes:
+        found = sum(any(h["source"] == name and code in h["text"] for h in store.search(f"what does {code} mean", k=k, mode=mode))
+                    for name, code in codes)
+        result["id_recall"] = round(found / len(codes), 3)
+    if store.chunk_size <= 0:
+        result["head300_recall"] = round(head_recalled / len(targets), 3)
+    return result
+
+
+def keyword_lookups(workdir: str, chunks: int, queries: int, seed: int) -> dict:
+    """Lookup latency of a KeywordIndex holding chunks synthetic chunks of ~60 words"""
+    corpus = Corpus(seed=seed)
+    index = KeywordIndex(os.path.join(workdir, "lookup.sqlite3"))
+    codes = []
+    start = time.perf_counter()
+    for offset in range(0, chunks, 10000):
+        ids, documents = [], []
+        for i in range(offset, min(offset + 10000, chunks)):
+            code = f"ERR-{i:07d}"
+            codes.append(code)
+            ids.append(f"DOC-bulk{i // 10}.txt#{i % 10}")
+            documents.append(f"{corpus.sentence(60)} {code}")
+        index.upsert(ids, documents, [{"source": i.split("#")[0]} for i in ids])
+    build_seconds = time.perf_counter() - start
+    rng = random.Random(seed)
+    latencies = {"identifier": [], "words": []}
+    for _ in range(queries):
+        for kind, query in (("identifier", f"what does {rng.choice(codes)} mean"), ("words", corpus.sentence(6))):
+            start = time.perf_counter()
+            index.search(query, k=20)
+            latencies[kind].append(time.perf_counter() - start)
+    index.close()
+    result = {"chunks": chunks, "build_seconds": round(build_seconds, 2),
+              "index_mb": round(sum(os.path.getsize(os.path.join(workdir, f)) for f in os.listdir(workdir) if f.startswith("lookup")) / 2**20, 1)}
+    for kind, values in latencies.items():
+        result[f"{kind}_p50_ms"] = round(percentile(values, 50) * 1000, 2)
+        result[f"{kind}_p95_ms"] = round(percentile(values, 95) * 1000, 2)
+    return result
+
+
+def run(files: int, paragraphs: int, chunk_sizes, overlap_ratio: float, queries: int, k: int, seed: int, modes=("vector",), lookup_chunks: int = 0) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-docs-")
+    results = {}
+    try:
+        source = os.path.join(workdir, "corpus")
+        os.makedirs(source)
+        sentences, codes = write_corpus(source, files, paragraphs, seed)
+        corpus_bytes = sum(os.path.getsize(os.path.join(source, f)) for f in os.listdir(source))
+        targets = random.Random(seed).sample(sentences, min(queries, len(sentences)))
+        codes = random.Random(seed).sample(codes, min(queries, len(codes)))
+        for size in chunk_sizes:
+            docs_dir = os.path.join(workdir, f"docs-{size}")
+            shutil.copytree(source, docs_dir)
+            overlap = int(size * overlap_ratio)
+            with open(os.devnull, 'w') as log, contextlib.redirect_stdout(log):
+                store = DocumentStore(docs_dir, embedding_function=HashingEmbeddingFunction(), index=False, chunk_size=size, chunk_overlap=overlap)
+                start = time.perf_counter()
+                store.index()
+                seconds = time.perf_counter() - start
+            chunks = store.collection.count()
+            level = {
+                "overlap": overlap,
+                "chunks": chunks,
+                "index_seconds": round(seconds, 2),
+                "files_per_second": round(files / seconds, 1),
+                "chunks_per_second": round(chunks / seconds, 1),
+                "mb_per_second": round(corpus_bytes / 2**20 / seconds, 2)
+            }
+            for mode in modes:
+                level[mode] = evaluate(store, targets, codes, k, mode, random.Random(seed))
+                quality = level[mode]
+                head = f", head300 recall@{k} {quality['head300_recall']}" if "head300_recall" in quality else ""
+                print(f"[bench] chunk_size {size} {mode}: recall@{k} {quality['recall']}{head}, id recall@{k} {quality.get('id_recall')}, "
+                      f"{quality['mean_returned_chars']} chars returned, p50 {quality['search_p50_ms']}ms")
+            results[str(size)] = level
+            print(f"[bench] chunk_size {size}: {level['chunks']} chunks, {level['chunks_per_second']} chunks/s, {level['mb_per_second']} MB/s")
+        if lookup_chunks:
+            lookups = keyword_lookups(workdir, lookup_chunks, queries, seed)
+            print(f"[bench] keyword lookups over {lookup_chunks} chunks: identifier p50 {lookups['identifier_p50_ms']}ms / p95 {lookups['identifier_p95_ms']}ms, "
+                  f"words p50 {lookups['words_p50_ms']}ms / p95 {lookups['words_p95_ms']}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "timestamp": time.time(),
+        "commit": git_commit(),
+        "config": {"files": files, "paragraphs": paragraphs, "corpus_mb": round(corpus_bytes / 2**20, 2), "overlap_ratio": overlap_ratio,
+                   "queries": len(targets), "k": k, "seed": seed, "modes": list(modes)},
+        "results": results,
+        **({"keyword_lookups": lookups} if lookup_chunks else {})
+    }
+
+
+def compare(current, baseline):
+    """Print recall per mode and indexing throughput change per chunk size against a previous run"""
+    for size, level in current["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        print(f"[bench] chunk_size {size} vs baseline: chunks/s {base['chunks_per_second']} -> {level['chunks_per_second']}")
+        for mode in current["config"]["modes"]:
+            # Runs from before search modes existed were vector-only, with recall at the top level
+            before = base.get(mode, base if mode == "vector" else None)
+            if before:
+                print(f"[bench]   {mode}: recall {before['recall']} -> {level[mode]['recall']}, "
+                      f"id recall {before.get('id_recall')} -> {level[mode].get('id_recall')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DocumentStore recall and indexing throughput per chunk size")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=12, help="paragraphs per file")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[0, 500, 1000, 2000], help="characters; 0 indexes whole files")
+    parser.add_argument("--overlap", type=float, default=0.15, help="overlap as a fraction of the chunk size")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["vector", "keyword", "hybrid"], choices=["vector", "keyword", "hybrid"])
+    parser.add_argument("--lookup-chunks", type=int, default=200000, help="synthetic chunks for the keyword lookup latency test (0 skips it)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/docs-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    output = os.path.abspath(args.output or os.path.join(root, "results", f"docs-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    report = run(args.files, args.paragraphs, args.chunk_sizes, args.overlap, args.queries, args.k, args.seed, args.modes, args.lookup_chunks)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results written to {output}")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Cold-start benchmark: from launching the server to its first answered request.
+
+For every corpus size it starts `python src/serve.py --workers 1` in a fresh
+directory holding that many documents, against the local fake OpenAI server,
+and measures from process launch until
+  - bind: /healthz answers (the port is open),
+  - ready: /readyz turns 200 (stores open, agent built),
+  - first_chat: the first POST /chat sent right after bind returns,
+  - indexed: the background warm-up has finished indexing ./docs,
+plus the time to `import src.web` on its own. Before lazy warm-up, bind and
+first_chat grew with the corpus; now only indexed should.
+
+    python benchmarks/bench_startup.py --docs 0 500 5000
+    python benchmarks/bench_startup.py --baseline benchmarks/results/startup-<ts>.json
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from tests.fake_openai_server import FakeOpenAIServer
+from bench_agent import SCRIPT, git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT = 300
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(url: str, body=None):
+    """(status, parsed JSON) or (None, None) while nothing listens"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError):
+        return None, None
+
+
+def _write_docs(docs_dir: str, count: int):
+    os.makedirs(docs_dir)
+    for i in range(count):
+        with open(os.path.join(docs_dir, f"doc{i:06d}.txt"), 'w') as f:
+            f.write(f"Document {i} about topic {i % 37}. " * 20)
+
+
+def measure_import() -> float:
+    code = "import time; t = time.perf_counter(); import src.web; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_once(docs: int, env: dict) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        _write_docs(os.path.join(workdir, "docs"), docs)
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "src", "serve.py"), "--workers", "1", "--host", "127.0.0.1", "--port", str(port)],
+                                   cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            result = {}
+            while _request(f"{base}/healthz")[0] != 200:
+                if process.poll() is not None or time.perf_counter() - started > TIMEOUT:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.005)
+            result["bind"] = time.perf_counter() - started
+            status, _ = _request(f"{base}/chat", {"message": "could you multiply six by seven for me"})
+            if status != 200:
+                raise RuntimeError(f"first /chat returned {status}")
+            result["first_chat"] = time.perf_counter() - started
+            while True:
+                status, body = _request(f"{base}/readyz")
+                if status == 200 and "ready" not in result:
+                    result["ready"] = time.perf_counter() - started
+                if status == 200 and body["state"] == "ready":
+                    result["indexed"] = time.perf_counter() - started
+                    result["server_first_request"] = body["first_request_seconds"]
+                    break
+                if time.perf_counter() - started > TIMEOUT:
+                    raise RuntimeError("documents were not indexed")
+                time.sleep(0.02)
+            return result
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def run(docs_levels, repeat: int) -> dict:
+    fake = FakeOpenAIServer(SCRIPT, latency=0.0, text="Six times seven is 42.").start()
+    env = dict(os.environ, OPENAI_API_KEY="bench", OPENAI_BASE_URL=fake.base_url, EMBEDDING_FUNCTION="hash",
+               PYTHONPATH=ROOT, LLM_REQUESTS_PER_SECOND="0", LLM_TOKENS_PER_MINUTE="0")
+    env.pop("CHROMA_HOST", None)
+    results = {"import_src_web": round(statistics.median(measure_import() for _ in range(repeat)), 3), "docs": {}}
+    try:
+        for docs in docs_levels:
+            runs = [measure_once(docs, env) for _ in range(repeat)]
+            level = {key: round(statistics.median(r[key] for r in runs), 3) for key in runs[0]}
+            results["docs"][str(docs)] = level
+            print(f"[bench] {docs} docs: bind {level['bind']}s, ready {level['ready']}s, "
+                  f"first /chat {level['first_chat']}s, indexed {level['indexed']}s")
+    finally:
+        fake.stop()
+    print(f"[bench] import src.web: {results['import_src_web']}s")
+    return {"timestamp": time.time(), "commit": git_commit(), "config": {"docs": docs_levels, "repeat": repeat}, "results": results}
+
+
+def compare(current, baseline):
+    """Print the change of every timing per corpus size against a previous run"""
+    for docs, level in current["results"]["docs"].items():
+        base = baseline.get("results", {}).get("docs", {}).get(docs)
+        if not base:
+            continue
+        deltas = [f"{key} {base[key]} -> {now}" for key, now in level.items() if key in base]
+        print(f"[bench] {docs} docs vs baseline: " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure server cold start and import-to-first-request time")
+    parser.add_argument("--docs", type=int, nargs="+", default=[0, 500, 5000], help="documents in ./docs per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size (the median is reported)")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/startup-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output or os.path.join(ROOT, "benchmarks", "results", f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    report = run(args.docs, args.repeat)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results written to {output}")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Scale benchmark for MemoryStore, EpisodicMemoryStore and DocumentStore.
+
+Seeds synthetic collections (deterministic text, HashingEmbeddingFunction so
+no model download or network is needed) and grows them through each size.
+At every size it times the public read/write operations and reports p50/p95
+latency, peak RSS while the operation ran and the on-disk size of the
+collection, so O(N) operations show up as latency growing with the size.
+
+    python benchmarks/bench_stores.py --sizes 10000 100000 1000000
+    python benchmarks/bench_stores.py --sizes 10000 --baseline benchmarks/results/stores-<ts>.json
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import json
+import random
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from src.store.embeddings import HashingEmbeddingFunction
+from src.store.memory_store import MemoryStore
+from src.store.episodic_memory_store import EpisodicMemoryStore
+from src.store.document_store import DocumentStore
+from bench_agent import percentile, git_commit
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa", "do", "fi", "gu", "ha", "je", "bo"]
+CATEGORIES = ["general", "personal", "work", "preference", "fact"]
+TAGS = ["pet", "food", "travel", "music", "code", "family", "health", "sport"]
+
+
+class Corpus:
+    """Deterministic synthetic sentences over a fixed vocabulary"""
+
+    def __init__(self, seed: int = 7, vocabulary: int = 5000):
+        self.random = random.Random(seed)
+        words = set()
+        while len(words) < vocabulary:
+            words.add("".join(self.random.choice(SYLLABLES) for _ in range(self.random.randint(2, 4))))
+        self.words = sorted(words)
+
+    def sentence(self, length: int = 12) -> str:
+        return " ".join(self.random.choice(self.words) for _ in range(length))
+
+
+class RSSSampler:
+    """Peak resident set size while the block runs (sampled from /proc, ru_maxrss elsewhere)"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def rss() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.rss())
+
+
+def disk_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def time_op(fn, repeats: int):
+    latencies = []
+    with RSSSampler() as sampler:
+        for i in range(repeats):
+            start = time.perf_counter()
+            fn(i)
+            latencies.append(time.perf_counter() - start)
+    return {
+        "repeats": repeats,
+        "mean": round(sum(latencies) / len(latencies), 5),
+        "p50": round(percentile(latencies, 50), 5),
+        "p95": round(percentile(latencies, 95), 5),
+        "peak_rss_mb": round(sampler.peak / 2**20, 1)
+    }
+
+
+def _seed(collection, corpus, start: int, stop: int, batch: int, make):
+    now = time.time()
+    for offset in range(start, stop, batch):
+        ids, documents, metadatas = [], [], []
+        for i in range(offset, min(stop, offset + batch)):
+            doc_id, metadata = make(i, now)
+            ids.append(doc_id)
+            documents.append(corpus.sentence())
+            metadatas.append(metadata)
+        collection.add(ids=ids, documents=documents, metadatas=metadatas)
+
+
+def _memory_record(i, now):
+    return f"MEM-{i}", {"category": CATEGORIES[i % len(CATEGORIES)], "tags": TAGS[i % len(TAGS)],
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - i)), "access_count": 0}
+
+
+def _episodic_record(i, now):
+    created = now - (i % 90) * 86400
+    return f"EPI-{i}", {"when": created, "where": "", "who": "user", "emotion_label": "NEUTRAL", "emotion_score": 0.5,
+                        "importance": (i % 10) / 10, "access_count": 0, "last_access": created, "created_at": created}
+
+
+def _document_record(i, now):
+    return f"DOC-synthetic-{i}.txt", {"source": f"synthetic-{i}.txt", "path": f"synthetic-{i}.txt"}
+
+
+def run(sizes, queries, heavy_repeats, consolidate_max, dim, batch):
+    workdir = tempfile.mkdtemp(prefix="store-bench-")
+    ef = HashingEmbeddingFunction(dim=dim)
+    query_corpus = Corpus(seed=11)
+    log = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(log):
+        stores = {
+            "memory": MemoryStore(os.path.join(workdir, "memory"), embedding_function=ef),
+            "episodic": EpisodicMemoryStore(None, os.path.join(workdir, "episodic"), embedding_function=ef),
+            "documents": DocumentStore(os.path.join(workdir, "docs"), embedding_function=ef)
+        }
+    paths = {"memory": "memory", "episodic": "episodic", "documents": os.path.join("docs", ".chroma")}
+    makers = {"memory": _memory_record, "episodic": _episodic_record, "documents": _document_record}
+    corpora = {name: Corpus(seed=index) for index, name in enumerate(stores)}
+    batch = min(batch, stores["memory"].client.get_max_batch_size())
+    seeded = 0
+    results = {}
+    try:
+        for size in sorted(sizes):
+            level = {}
+            for name, store in stores.items():
+                start = time.perf_counter()
+                with RSSSampler() as sampler:
+                    _seed(store.collection, corpora[name], seeded, size, batch, makers[name])
+                level[name] = {
+                    "seed": {"added": size - seeded, "seconds": round(time.perf_counter() - start, 2), "peak_rss_mb": round(sampler.peak / 2**20, 1)},
+                    "disk_mb": round(disk_bytes(os.path.join(workdir, paths[name])) / 2**20, 1),
+                    "ops": {}
+                }
+            seeded = size
+            memory, episodic, docs = stores["memory"], stores["episodic"], stores["documents"]
+            # Ids forgotten at this size are never reused (seeding continues above them)
+            doomed = [f"MEM-{i}" for i in range(size - queries, size)]
+            ops = {
+                "memory": {
+                    "recall": (lambda i: memory.recall(query_corpus.sentence(6)), queries),
+                    "list_all": (lambda i: memory.list_all(limit=10), heavy_repeats),
+                    "get_stats": (lambda i: memory.get_stats(), heavy_repeats),
+                    "forget_id": (lambda i: memory.forget(memory_id=doomed[i]), queries),
+                    "forget_query": (lambda i: memory.forget(query=query_corpus.sentence(1)), heavy_repeats)
+                },
+                "episodic": {
+                    "retrieve_memories": (lambda i: episodic.retrieve_memories(query_corpus.sentence(6)), queries),
+                    "retrieve_memories_min_importance": (lambda i: episodic.retrieve_memories(query_corpus.sentence(6), min_importance=0.5), queries)
+                },
+                "documents": {
+                    "search": (lambda i: docs.search(query_corpus.sentence(6)), queries)
+                }
+            }
+            with contextlib.redirect_stdout(log):
+                for name, store_ops in ops.items():
+                    for op, (fn, repeats) in store_ops.items():
+                        level[name]["ops"][op] = time_op(fn, repeats)
+                    print(f"[bench] {name} @ {size}: " + ", ".join(f"{op} p50 {r['p50']}s" for op, r in level[name]["ops"].items()), file=sys.__stdout__)
+            if size <= consolidate_max:
+                # consolidate_memories queries once per entry and merges neighbours, so it runs on a copy
+                copy_dir = os.path.join(workdir, f"consolidate-{size}")
+                shutil.copytree(os.path.join(workdir, "episodic"), copy_dir)
+                with contextlib.redirect_stdout(log):
+                    copy = EpisodicMemoryStore(None, copy_dir, embedding_function=ef)
+                    level["episodic"]["ops"]["consolidate_memories"] = time_op(lambda i: copy.consolidate_memories(), 1)
+                shutil.rmtree(copy_dir, ignore_errors=True)
+            else:
+                level["episodic"]["ops"]["consolidate_memories"] = {"skipped": f"size > --consolidate-max ({consolidate_max})"}
+            results[str(size)] = level
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "timestamp": time.time(),
+        "commit": git_commit(),
+        "config": {"sizes": sorted(sizes), "queries": queries, "heavy_repeats": heavy_repeats, "embedding_dim": dim, "batch": batch},
+        "results": results,
+        "scaling": scaling(results)
+    }
+
+
+def scaling(results):
+    """p50 growth factor per operation between consecutive sizes (close to the size ratio means O(N))"""
+    sizes = sorted(results, key=int)
+    factors = {}
+    for smaller, larger in zip(sizes, sizes[1:]):
+        for store, level in results[larger].items():
+            for op, now in level["ops"].items():
+                before = results[smaller][store]["ops"].get(op, {})
+                if "p50" in now and before.get("p50"):
+                    factors.setdefault(f"{store}.{op}", {})[f"{smaller}->{larger}"] = round(now["p50"] / before["p50"], 2)
+    return factors
+
+
+def compare(current, baseline):
+    for size, level in current["results"].items():
+        for store, data in level.items():
+            for op, now in data["ops"].items():
+                before = baseline.get("results", {}).get(size, {}).get(store, {}).get("ops", {}).get(op, {})
+                if "p50" in now and before.get("p50"):
+                    change = (now["p50"] - before["p50"]) / before["p50"] * 100
+                    print(f"[bench] {store}.{op} @ {size}: p50 {before['p50']} -> {now['p50']} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory/document stores at growing collection sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=20, help="repetitions of per-item operations")
+    parser.add_argument("--heavy-repeats", type=int, default=3, help="repetitions of full-collection operations")
+    parser.add_argument("--consolidate-max", type=int, default=10000, help="largest size to run consolidate_memories at")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimensions")
+    parser.add_argument("--batch", type=int, default=5000, help="seeding batch size")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/stores-<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", f"stores-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    report = run(args.sizes, args.queries, args.heavy_repeats, args.consolidate_max, args.dim, args.batch)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results written to {output}")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,16 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.llm_client.ollama_client import OllamaClient
 from src.store.learning_store import LearningStore
 from src.store.continuous_learning import ContinuousLearning
+from src.store.background_executor import BackgroundExecutor
 
 def example_continuous_learning():
     print("=== Continuous Learning Example ===\n")
     
     ollama = OllamaClient(model="gpt-4o-mini")
     learning = LearningStore(learning_dir="./learnings")
-    continuous = ContinuousLearning(ollama, learning)
+    # Own queue: jobs in ./memory/background_jobs.sqlite3 would be run by the main app
+    executor = BackgroundExecutor(path="./memory_example/background_jobs.sqlite3")
+    continuous = ContinuousLearning(ollama, learning, executor=executor)
     
     print("💬 Natural Conversation:\n")
     
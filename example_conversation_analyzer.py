@@ -9,12 +9,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.llm_client.ollama_client import OllamaClient
 from src.store.conversation_analyzer import ConversationAnalyzer
+from src.store.background_executor import BackgroundExecutor
 
 def simulate_conversations():
     print("=== Conversation Analyzer Example ===\n")
     
     ollama = OllamaClient(model="gpt-4o-mini")
-    analyzer = ConversationAnalyzer(ollama, persist_dir="./memory_example")
+    # Own queue: jobs in ./memory/background_jobs.sqlite3 would be run by the main app
+    executor = BackgroundExecutor(path="./memory_example/background_jobs.sqlite3")
+    analyzer = ConversationAnalyzer(ollama, persist_dir="./memory_example", executor=executor)
     
     # Simulate 100+ messages over time
     print("📊 Simulating 100+ conversations...\n")
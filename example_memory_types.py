@@ -11,6 +11,7 @@ from src.llm_client.ollama_client import OllamaClient
 from src.store.episodic_memory_store import EpisodicMemoryStore
 from src.store.learning_store import LearningStore
 from src.store.memory_types import MemoryTypes
+from src.store.background_executor import BackgroundExecutor
 
 def example_memory_types():
     print("=== Memory Types Example ===\n")
@@ -18,7 +19,9 @@ def example_memory_types():
     ollama = OllamaClient(model="gpt-4o-mini")
     episodic = EpisodicMemoryStore(ollama, persist_directory="./memory_example")
     learning = LearningStore(learning_dir="./learnings")
-    memory_types = MemoryTypes(ollama, episodic, learning, persist_dir="./memory_example")
+    # Own queue: jobs in ./memory/background_jobs.sqlite3 would be run by the main app
+    executor = BackgroundExecutor(path="./memory_example/background_jobs.sqlite3")
+    memory_types = MemoryTypes(ollama, episodic, learning, persist_dir="./memory_example", executor=executor)
     
     # Simulate conversation
     print("💬 Conversation Flow:\n")
@@ -1,7 +1,12 @@
-from typing import Optional, Dict, Any
-import json
-from ..llm_client.ollama_client import OllamaClient
-from ..sentiment.sentiment import SentimentAnalyzer
+from typing import Optional, Dict, Any, List, Callable, Iterator, Tuple
+import asyncio
+import os
+import queue
+from ..llm_client.call_metrics import current_turn, summarize
+from ..llm_client.prompt_builder import PromptBuilder
+from ..llm_client.model_router import ModelRouter, get_model_router, route_scope
+from ..llm_client.ollama_client import OllamaClient, AsyncOllamaClient, run_sync, submit
+from ..sentiment.sentiment import SentimentAnalyzer, SentimentOutput
 from ..store.document_store import DocumentStore
 from ..store.memory_store import MemoryStore
 from ..store.learning_store import LearningStore
@@ -9,9 +14,13 @@ from ..store.episodic_memory_store import EpisodicMemoryStore
 from ..store.memory_types import MemoryTypes
 from ..store.continuous_learning import ContinuousLearning
 from ..store.conversation_analyzer import ConversationAnalyzer
+from ..store.background_executor import BackgroundExecutor, get_background_executor
 from ..intent_analyser.intent_analyzer import IntentAnalyzer
+from ..intent_analyser.triage_analyzer import TriageAnalyzer
+from ..intent_analyser.fast_router import FastRouter
 from ..functions.tool_selection_functions import get_tool_selection_function
 from ..tools import Tools
+from .pipeline import Pipeline, Stage, PipelineHalt
 
 class AgentOutput:
     def __init__(self, intent: str, arguments: Dict[str, Any], reasoning: str):
@@ -22,18 +31,48 @@ class AgentOutput:
     def model_dump(self):
         return {"intent": self.intent, "arguments": self.arguments, "reasoning": self.reasoning}
 
+PIPELINE_MODES = ("staged", "fused")
+
+# Per-tool final-response policy: "template" renders the tool output with
+# Tools.render_response and skips LLM synthesis, "llm" always synthesizes.
+# Tools without a template always go through the LLM.
+DEFAULT_RESPONSE_POLICY = {
+    "search_docs": "llm",
+    "recall": "llm",
+    "list_memories": "llm"
+}
+
 class ReasoningAgent:
-    def __init__(self, ollama: OllamaClient, docs: DocumentStore, sentiment: SentimentAnalyzer, memory: MemoryStore = None, learning: LearningStore = None, episodic: EpisodicMemoryStore = None):
+    def __init__(self, ollama: OllamaClient, docs: DocumentStore, sentiment: SentimentAnalyzer, memory: MemoryStore = None, learning: LearningStore = None, episodic: EpisodicMemoryStore = None, async_ollama: AsyncOllamaClient = None, pipeline_mode: str = None, fast_router: FastRouter = None, response_policy: Dict[str, str] = None, background: BackgroundExecutor = None, router: ModelRouter = None):
+        self.pipeline_mode = (pipeline_mode or os.getenv("PIPELINE_MODE", "staged")).lower()
+        if self.pipeline_mode not in PIPELINE_MODES:
+            raise ValueError(f"Unknown pipeline mode: {self.pipeline_mode} (expected one of {PIPELINE_MODES})")
         self.ollama = ollama
+        self.async_ollama = async_ollama
         self.docs = docs
         self.sentiment = sentiment
         self.memory = memory or MemoryStore()
         self.learning = learning or LearningStore()
         self.episodic = episodic or EpisodicMemoryStore(ollama)
-        self.memory_types = MemoryTypes(ollama, self.episodic, self.learning)
-        self.continuous_learning = ContinuousLearning(ollama, self.learning)
-        self.conversation_analyzer = ConversationAnalyzer(ollama)
-        self.intent_analyzer = IntentAnalyzer(ollama)
+        # One bounded worker pool runs all post-turn memory/learning/profile jobs
+        self.background = background or get_background_executor()
+        self.memory_types = MemoryTypes(ollama, self.episodic, self.learning, executor=self.background)
+        self.continuous_learning = ContinuousLearning(ollama, self.learning, executor=self.background)
+        self.conversation_analyzer = ConversationAnalyzer(ollama, executor=self.background)
+        # Per-stage model choice (cheap model unless the turn needs the large one)
+        self.router = router or get_model_router()
+        self.intent_analyzer = IntentAnalyzer(ollama, async_ollama, router=self.router)
+        self.triage_analyzer = TriageAnalyzer(ollama, async_ollama, router=self.router)
+        if fast_router is None and os.getenv("FAST_PATH_ENABLED", "true").lower() == "true":
+            fast_router = FastRouter()
+        self.fast_router = fast_router
+        self.response_policy = {**DEFAULT_RESPONSE_POLICY, **(response_policy or {})}
+        self.pipelines = self._build_pipelines()
+
+    async def _chat_async(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        if self.async_ollama:
+            return await self.async_ollama.chat(messages, **kwargs)
+        return await asyncio.to_thread(self.ollama.chat, messages, **kwargs)
 
     def _build_tool_selection_prompt(self, user_message: str, intent_analysis: Dict[str, Any] = None) -> str:
         context = f"User message: {user_message}\n"
@@ -173,68 +212,192 @@ class ReasoningAgent:
         
         return {"tool": "none", "result": None}
 
-    def _synthesize_final(self, user_message: str, ao: AgentOutput, tool_out: Dict[str, Any], memory_context: str = "") -> str:
+    def _build_synthesis_messages(self, user_message: str, ao: AgentOutput, tool_out: Dict[str, Any], memory_context: str = "") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         system = "You are an assistant. Use the tool_output to craft a concise user-facing reply."
-        if memory_context:
-            system += f"\n\nRelevant past context:\n{memory_context}"
         payload = {"user_message": user_message, "agent_decision": ao.model_dump(), "tool_output": tool_out}
-        messages = [
-            {"role": "system", "content": system},
-            {"role": "user", "content": json.dumps(payload, indent=2)}
+        # Large tool outputs (memory lists, learnings) are trimmed to the synthesis budget
+        return PromptBuilder("synthesis").build(system, payload, shrinkable={"tool_output": "head"}, context=memory_context)
+
+    def _log_prompt(self, report: Dict[str, Any], logs: Optional[List[str]]):
+        line = f"[PROMPT] {report['stage']}: {report['tokens']}/{report['budget']} tokens, dropped {report['dropped_tokens']}"
+        if report["truncated"]:
+            line += f" (truncated {', '.join(report['truncated'])})"
+        if logs is not None:
+            logs.append(line)
+        else:
+            print(line)
+
+    def _log_route(self, route, logs: Optional[List[str]]):
+        line = f"[MODEL] {route.key} -> {route.model}"
+        if logs is not None:
+            logs.append(line)
+        else:
+            print(line)
+
+    def _route_synthesis(self, ao: AgentOutput, tool_out: Dict[str, Any], report: Dict[str, Any], intent_analysis: Dict[str, Any] = None, logs: List[str] = None):
+        route = self.router.select("synthesis", intent_analysis, tool=tool_out.get("tool") or ao.intent, payload_tokens=report["tokens"])
+        self._log_route(route, logs)
+        return route
+
+    def _synthesize_final(self, user_message: str, ao: AgentOutput, tool_out: Dict[str, Any], memory_context: str = "", logs: List[str] = None, intent_analysis: Dict[str, Any] = None) -> str:
+        messages, report = self._build_synthesis_messages(user_message, ao, tool_out, memory_context)
+        self._log_prompt(report, logs)
+        route = self._route_synthesis(ao, tool_out, report, intent_analysis, logs)
+        with route_scope(route):
+            return self.ollama.chat(messages, model=route.model)
+
+    async def _synthesize_final_async(self, user_message: str, ao: AgentOutput, tool_out: Dict[str, Any], memory_context: str = "", emit: Callable = None, logs: List[str] = None, intent_analysis: Dict[str, Any] = None) -> str:
+        messages, report = self._build_synthesis_messages(user_message, ao, tool_out, memory_context)
+        self._log_prompt(report, logs)
+        route = self._route_synthesis(ao, tool_out, report, intent_analysis, logs)
+        with route_scope(route):
+            if not emit:
+                return await self._chat_async(messages, model=route.model)
+            
+            # Streaming: forward each delta as a "token" event while accumulating the reply
+            parts = []
+            if self.async_ollama:
+                async for delta in await self.async_ollama.chat(messages, model=route.model, stream=True):
+                    parts.append(delta)
+                    emit("token", delta)
+            else:
+                loop = asyncio.get_running_loop()
+                
+                def consume():
+                    for delta in self.ollama.chat(messages, model=route.model, stream=True):
+                        parts.append(delta)
+                        loop.call_soon_threadsafe(emit, "token", delta)
+                
+                await asyncio.to_thread(consume)
+            return "".join(parts)
+
+    def _agent_output_from_args(self, args: Dict[str, Any]) -> AgentOutput:
+        return AgentOutput(
+            intent=args.get("intent", "escalate"),
+            arguments=args.get("tool_arguments", args.get("arguments", {})),
+            reasoning=args.get("reasoning", "No reasoning provided")
+        )
+
+    def _build_pipelines(self) -> Dict[str, Pipeline]:
+        """Declare the turn pipeline for each mode; the executor runs independent stages concurrently"""
+        context_stages = [
+            Stage("short_term", self._stage_short_term, outputs=["short_term_context"], offload=False),
+            Stage("profile", self._stage_profile, outputs=["profile_context"], offload=False),
+            Stage("episodic_retrieval", self._stage_episodic_retrieval, inputs=["user_message"], outputs=["past_memories"], fallback=self._fallback_episodic_retrieval)
         ]
-        # Use gpt-4o for final synthesis (best quality response)
-        resp = self.ollama.chat(messages, model="gpt-4o")
-        return resp
+        intent = Stage("intent", self._stage_intent, inputs=["user_message"], outputs=["intent_analysis"], fallback=self._fallback_intent)
+        sentiment = Stage("sentiment", self._stage_sentiment, inputs=["user_message"], outputs=["sentiment"], fallback=self._fallback_sentiment)
+        triage = Stage("triage", self._stage_triage, inputs=["user_message"], outputs=["intent_analysis", "sentiment", "selection"], fallback=self._fallback_triage)
+        tail = [
+            Stage("gate", self._stage_gate, inputs=["intent_analysis", "sentiment", "notify"], outputs=["proceed"], offload=False),
+            Stage("tool_select", self._stage_tool_select, inputs=["user_message", "intent_analysis", "selection", "proceed"], outputs=["agent_output"], fallback=self._fallback_tool_select),
+            Stage("tool_run", self._stage_tool_run, inputs=["agent_output", "notify"], outputs=["tool_out"]),
+            Stage("synthesis", self._stage_synthesis, inputs=["user_message", "intent_analysis", "agent_output", "tool_out", "short_term_context", "profile_context", "past_memories", "notify", "emit"], outputs=["final"], fallback=self._fallback_synthesis),
+            Stage("post_processing", self._stage_post_process, inputs=["user_message", "final", "agent_output", "sentiment"])
+        ]
+        return {
+            "staged": Pipeline(context_stages + [intent, sentiment] + tail),
+            "fused": Pipeline(context_stages + [triage] + tail),
+            # Fast path: the router seeds intent_analysis and selection
+            "fast": Pipeline(context_stages + [sentiment] + tail)
+        }
 
-    def handle(self, user_message: str) -> Dict[str, Any]:
-        logs = []
-        logs.append(f"[INPUT] User message: {user_message}")
-        
+    # Pipeline stages: each takes its declared inputs plus a logs list and returns its outputs
+
+    def _stage_short_term(self, logs: List[str]) -> Dict[str, Any]:
         # Get short-term working memory context
         short_term_context = self.memory_types.get_short_term_context()
         if short_term_context:
             logs.append(f"[SHORT_TERM] {short_term_context[:100]}")
-        
+        return {"short_term_context": short_term_context}
+
+    def _stage_profile(self, logs: List[str]) -> Dict[str, Any]:
         # Get user profile context
         profile_context = self.conversation_analyzer.get_profile_context()
         if profile_context:
             logs.append(f"[PROFILE] {profile_context}")
-        
+        return {"profile_context": profile_context}
+
+    def _stage_episodic_retrieval(self, user_message: str, logs: List[str]) -> Dict[str, Any]:
         # Retrieve relevant episodic memories (long-term)
         past_memories = self.episodic.retrieve_memories(user_message, n_results=3, min_importance=0.3)
         if past_memories:
             logs.append(f"[LONG_TERM] Retrieved {len(past_memories)} relevant memories")
-        
-        try:
-            # Step 1: Deep Intent Analysis
-            logs.append("[INTENT_ANALYSIS] Starting deep intent analysis...")
-            intent_analysis = self.intent_analyzer.analyze_intent(user_message)
-            logs.append(f"[INTENT_ANALYSIS] Primary: {intent_analysis.get('primary_intent')}")
-            logs.append(f"[INTENT_ANALYSIS] Action: {intent_analysis.get('action_required')}")
-            logs.append(f"[INTENT_ANALYSIS] Urgency: {intent_analysis.get('urgency')}, Complexity: {intent_analysis.get('complexity')}")
-            logs.append(f"[INTENT_ANALYSIS] Confidence: {intent_analysis.get('confidence', 0):.2f}")
-            logs.append(f"[INTENT_ANALYSIS] Reasoning: {intent_analysis.get('reasoning', 'N/A')}")
-        except Exception as e:
-            logs.append(f"[INTENT_ANALYSIS] Error: {str(e)}")
-            intent_analysis = {"primary_intent": "unknown", "action_required": "escalate", "urgency": "medium", "complexity": "simple", "confidence": 0, "reasoning": "Analysis failed"}
-        
-        try:
-            # Step 2: Sentiment Analysis (LLM-based)
-            sent = self.sentiment.analyze(user_message)
-            logs.append(f"[SENTIMENT] Label: {sent.label}, Score: {sent.score:.3f}")
-            if sent.reasoning:
-                logs.append(f"[SENTIMENT] Reasoning: {sent.reasoning}")
-        except Exception as e:
-            logs.append(f"[SENTIMENT] Error: {str(e)}")
-            from ..sentiment.sentiment import SentimentOutput
-            sent = SentimentOutput(label="NEUTRAL", score=0.5, reasoning="Analysis failed")
-        
-        if sent.label == "NEGATIVE" and sent.score >= 0.8:
+        return {"past_memories": past_memories}
+
+    def _fallback_episodic_retrieval(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        logs.append(f"[LONG_TERM] Error: {str(error)}")
+        return {"past_memories": []}
+
+    async def _stage_intent(self, user_message: str, logs: List[str]) -> Dict[str, Any]:
+        # Step 1: Deep Intent Analysis
+        logs.append("[INTENT_ANALYSIS] Starting deep intent analysis...")
+        intent_analysis = await self.intent_analyzer.analyze_intent_async(user_message)
+        self._log_intent(intent_analysis, logs)
+        return {"intent_analysis": intent_analysis}
+
+    def _log_intent(self, intent_analysis: Dict[str, Any], logs: List[str]):
+        logs.append(f"[INTENT_ANALYSIS] Primary: {intent_analysis.get('primary_intent')}")
+        logs.append(f"[INTENT_ANALYSIS] Action: {intent_analysis.get('action_required')}")
+        logs.append(f"[INTENT_ANALYSIS] Urgency: {intent_analysis.get('urgency')}, Complexity: {intent_analysis.get('complexity')}")
+        logs.append(f"[INTENT_ANALYSIS] Confidence: {intent_analysis.get('confidence', 0):.2f}")
+        logs.append(f"[INTENT_ANALYSIS] Reasoning: {intent_analysis.get('reasoning', 'N/A')}")
+
+    def _fallback_intent(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        logs.append(f"[INTENT_ANALYSIS] Error: {str(error)}")
+        return {"intent_analysis": {"primary_intent": "unknown", "action_required": "escalate", "urgency": "medium", "complexity": "simple", "confidence": 0, "reasoning": "Analysis failed"}}
+
+    async def _stage_sentiment(self, user_message: str, logs: List[str]) -> Dict[str, Any]:
+        # Step 2: Sentiment Analysis (LLM-based)
+        sent = await self.sentiment.analyze_async(user_message)
+        self._log_sentiment(sent, logs)
+        return {"sentiment": sent}
+
+    def _log_sentiment(self, sent: SentimentOutput, logs: List[str]):
+        logs.append(f"[SENTIMENT] Label: {sent.label}, Score: {sent.score:.3f}")
+        if sent.reasoning:
+            logs.append(f"[SENTIMENT] Reasoning: {sent.reasoning}")
+
+    def _fallback_sentiment(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        logs.append(f"[SENTIMENT] Error: {str(error)}")
+        if "user_message" in inputs:
+            # Cheap local verdict keeps the escalation gate meaningful while the LLM is down
+            sent = self.sentiment.analyze_lexicon(inputs["user_message"])
+            logs.append(f"[SENTIMENT] Lexicon fallback: {sent.label} ({sent.score:.3f})")
+            return {"sentiment": sent}
+        return {"sentiment": SentimentOutput(label="NEUTRAL", score=0.5, reasoning="Analysis failed")}
+
+    async def _stage_triage(self, user_message: str, logs: List[str]) -> Dict[str, Any]:
+        logs.append("[TRIAGE] Fused intent, sentiment and tool selection in one call...")
+        triage = await self.triage_analyzer.triage_async(user_message)
+        self._log_intent(triage["intent_analysis"], logs)
+        self._log_sentiment(triage["sentiment"], logs)
+        return {"intent_analysis": triage["intent_analysis"], "sentiment": triage["sentiment"], "selection": triage["tool_selection"]}
+
+    async def _fallback_triage(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        logs.append(f"[TRIAGE] Error: {str(error)}, falling back to staged analysis")
+        user_message = inputs["user_message"]
+        outputs = {"selection": None}
+        for stage, fallback in ((self._stage_intent, self._fallback_intent), (self._stage_sentiment, self._fallback_sentiment)):
+            try:
+                outputs.update(await stage(user_message, logs))
+            except Exception as e:
+                outputs.update(fallback(e, logs, user_message=user_message))
+        return outputs
+
+    def _stage_gate(self, intent_analysis: Dict[str, Any], sentiment: SentimentOutput, notify: Callable, logs: List[str]) -> Dict[str, Any]:
+        notify("intent", intent_analysis)
+        notify("sentiment", sentiment.model_dump())
+        if sentiment.label == "NEGATIVE" and sentiment.score >= 0.8:
             logs.append("[DECISION] Escalating due to strong negative sentiment")
-            return {"final": "Escalating to human operator due to strong negative sentiment.", "meta": {"sentiment": sent.model_dump(), "intent_analysis": intent_analysis}, "logs": logs}
-        
-        # Step 3: Tool selection using function calling
-        try:
+            raise PipelineHalt({"final": "Escalating to human operator due to strong negative sentiment.", "meta": {"sentiment": sentiment.model_dump(), "intent_analysis": intent_analysis}})
+        return {"proceed": True}
+
+    async def _stage_tool_select(self, user_message: str, intent_analysis: Dict[str, Any], selection: Optional[Dict[str, Any]], proceed: bool, logs: List[str]) -> Dict[str, Any]:
+        # Step 3: Tool selection using function calling (already done by triage / fast path when selection is set)
+        if selection:
+            ao = self._agent_output_from_args(selection)
+        else:
             prompt = self._build_tool_selection_prompt(user_message, intent_analysis)
             logs.append(f"[PROMPT] Built tool selection prompt")
             print(f"[agent] Prompt: {prompt[:100]}")
@@ -244,7 +407,10 @@ class ReasoningAgent:
                 {"role": "user", "content": prompt}
             ]
             
-            result = self.ollama.chat(messages, model="gpt-4o", functions=[get_tool_selection_function()])
+            route = self.router.select("tool_select", intent_analysis)
+            self._log_route(route, logs)
+            with route_scope(route):
+                result = await self._chat_async(messages, model=route.model, functions=[get_tool_selection_function()])
             print(f"[agent] Result keys: {list(result.keys())}")
             
             if "function_name" not in result:
@@ -256,46 +422,59 @@ class ReasoningAgent:
             else:
                 args = result["arguments"]
                 print(f"[agent] Args keys: {list(args.keys())}")
-                ao = AgentOutput(
-                    intent=args.get("intent", "escalate"),
-                    arguments=args.get("tool_arguments", args.get("arguments", {})),
-                    reasoning=args.get("reasoning", "No reasoning provided")
-                )
-            logs.append(f"[TOOL_SELECTION] Intent: {ao.intent}, Args: {ao.arguments}")
-            logs.append(f"[REASONING] {ao.reasoning}")
-        except Exception as e:
-            print(f"[agent] Exception: {type(e).__name__}: {str(e)}")
-            logs.append(f"[TOOL_SELECTION] Error: {str(e)}")
-            ao = AgentOutput(intent="escalate", arguments={"reason": "Tool selection failed", "priority": "medium"}, reasoning="Error in tool selection")
-        
+                ao = self._agent_output_from_args(args)
+        logs.append(f"[TOOL_SELECTION] Intent: {ao.intent}, Args: {ao.arguments}")
+        logs.append(f"[REASONING] {ao.reasoning}")
+        return {"agent_output": ao}
+
+    def _fallback_tool_select(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        print(f"[agent] Exception: {type(error).__name__}: {str(error)}")
+        logs.append(f"[TOOL_SELECTION] Error: {str(error)}")
+        return {"agent_output": AgentOutput(intent="escalate", arguments={"reason": "Tool selection failed", "priority": "medium"}, reasoning="Error in tool selection")}
+
+    async def _stage_tool_run(self, agent_output: AgentOutput, notify: Callable, logs: List[str]) -> Dict[str, Any]:
         try:
-            tool_out = self._run_tool(ao)
+            tool_out = await asyncio.to_thread(self._run_tool, agent_output)
             logs.append(f"[TOOL] Executed {tool_out.get('tool')}, Result: {str(tool_out.get('result'))[:100]}...")
         except Exception as e:
             logs.append(f"[TOOL] Error: {str(e)}")
             tool_out = {"tool": "error", "result": {"error": str(e)}}
-        
-        try:
-            memory_context = ""
-            if profile_context:
-                memory_context += f"User profile: {profile_context}\n"
-            if short_term_context:
-                memory_context += f"Recent conversation: {short_term_context}\n"
-            if past_memories:
-                memory_context += "\n".join([f"- {m['content'][:100]}" for m in past_memories[:2]])
-            
-            final = self._synthesize_final(user_message, ao, tool_out, memory_context)
+        notify("tool", {"intent": agent_output.intent, "tool": tool_out.get("tool"), "reasoning": agent_output.reasoning})
+        return {"tool_out": tool_out}
+
+    async def _stage_synthesis(self, user_message: str, intent_analysis: Dict[str, Any], agent_output: AgentOutput, tool_out: Dict[str, Any], short_term_context: str, profile_context: str,
+                               past_memories: List[Dict[str, Any]], notify: Callable, emit: Optional[Callable], logs: List[str]) -> Dict[str, Any]:
+        memory_context = ""
+        if profile_context:
+            memory_context += f"User profile: {profile_context}\n"
+        if short_term_context:
+            memory_context += f"Recent conversation: {short_term_context}\n"
+        if past_memories:
+            memory_context += "\n".join([f"- {m['content'][:100]}" for m in past_memories[:2]])
+        
+        templated = None
+        if self.response_policy.get(tool_out.get("tool"), "template") == "template":
+            templated = Tools.render_response(tool_out.get("tool"), tool_out.get("result"))
+        if templated is not None:
+            final = templated
+            notify("token", final)
+            logs.append(f"[SYNTHESIS] Templated response for {tool_out.get('tool')}, LLM synthesis skipped")
+        else:
+            final = await self._synthesize_final_async(user_message, agent_output, tool_out, memory_context, emit=emit, logs=logs, intent_analysis=intent_analysis)
             logs.append(f"[SYNTHESIS] Generated final response")
-            logs.append(f"[FINAL_ANSWER] {final}")
-        except Exception as e:
-            logs.append(f"[SYNTHESIS] Error: {str(e)}")
-            final = "I encountered an error processing your request. Please try again."
-        
+        logs.append(f"[FINAL_ANSWER] {final}")
+        return {"final": final}
+
+    def _fallback_synthesis(self, error: Exception, logs: List[str], **inputs) -> Dict[str, Any]:
+        logs.append(f"[SYNTHESIS] Error: {str(error)}")
+        return {"final": "I encountered an error processing your request. Please try again."}
+
+    def _stage_post_process(self, user_message: str, final: str, agent_output: AgentOutput, sentiment: SentimentOutput, logs: List[str]) -> Dict[str, Any]:
         # Add to memory types (background processing)
         try:
-            explicit_remember = ao.intent == "remember"
-            self.memory_types.add_interaction(user_message, final, sent.model_dump(), explicit_remember)
-            logs.append("[MEMORY] Background processing initiated")
+            explicit_remember = agent_output.intent == "remember"
+            self.memory_types.add_interaction(user_message, final, sentiment.model_dump(), explicit_remember)
+            logs.append("[MEMORY] Background processing queued")
         except Exception as e:
             logs.append(f"[MEMORY] Error: {str(e)}")
         
@@ -308,9 +487,70 @@ class ReasoningAgent:
         
         # Conversation analysis (background)
         try:
-            self.conversation_analyzer.log_conversation(user_message, final, sent.model_dump())
+            self.conversation_analyzer.log_conversation(user_message, final, sentiment.model_dump())
             logs.append("[ANALYZER] Conversation logged")
         except Exception as e:
             logs.append(f"[ANALYZER] Error: {str(e)}")
+
+        queue_stats = self.background.stats()
+        logs.append(f"[BACKGROUND] {queue_stats['pending']} pending, {queue_stats['running']} running, {queue_stats['coalesced']} coalesced")
+        return {}
+
+    def handle(self, user_message: str) -> Dict[str, Any]:
+        """Synchronous entry point; runs handle_async on the shared LLM event loop"""
+        return run_sync(self.handle_async(user_message))
+
+    def handle_stream(self, user_message: str) -> Iterator[Dict[str, Any]]:
+        """Yield pipeline events as they happen.
+
+        Events are dicts with "event" and "data": "intent", "sentiment" and
+        "tool" after each stage, "token" for every synthesis delta and a
+        final "done" carrying the same result handle() returns.
+        """
+        events = queue.Queue()
+        future = submit(self.handle_async(user_message, emit=lambda event, data: events.put({"event": event, "data": data})))
+        future.add_done_callback(lambda _: events.put(None))
+        while True:
+            item = events.get()
+            if item is None:
+                break
+            yield item
+        yield {"event": "done", "data": future.result()}
+
+    async def handle_async(self, user_message: str, emit: Callable = None) -> Dict[str, Any]:
+        """Run the agent pipeline; when emit(event, data) is given, stage results and synthesis tokens are streamed through it"""
+        llm_calls = []
+        turn = current_turn.set(llm_calls)
+        try:
+            result = await self._handle_turn(user_message, emit)
+        finally:
+            current_turn.reset(turn)
+        result["meta"] = {**result.get("meta", {}), "llm": {"calls": llm_calls, "total": summarize(llm_calls, None), "by_stage": summarize(llm_calls, "stage")}}
+        return result
+
+    async def _handle_turn(self, user_message: str, emit: Callable = None) -> Dict[str, Any]:
+        logs = []
+        logs.append(f"[INPUT] User message: {user_message}")
+        context = {"user_message": user_message, "emit": emit, "notify": emit or (lambda event, data: None)}
+        
+        # Deterministic fast path: obvious tool requests skip LLM intent analysis and tool selection
+        fast = self.fast_router.route(user_message) if self.fast_router else None
+        if fast:
+            logs.append(f"[FAST_PATH] Rule '{fast['rule']}' matched -> {fast['tool']} (confidence: {fast['confidence']:.2f}, saved ~{fast['saved_seconds'] * 1000:.0f}ms)")
+            context["intent_analysis"] = {"primary_intent": fast["tool"], "action_required": f"run {fast['tool']}", "urgency": "low", "complexity": "simple", "confidence": fast["confidence"], "reasoning": f"Fast path rule: {fast['rule']}"}
+            context["selection"] = {"intent": fast["tool"], "tool_arguments": fast["arguments"], "reasoning": f"Fast path rule: {fast['rule']}"}
+            mode = "fast"
+        else:
+            mode = self.pipeline_mode
+            if mode == "staged":
+                context["selection"] = None
+        
+        try:
+            context, timings = await self.pipelines[mode].run(context, logs)
+        except PipelineHalt as halt:
+            return {**halt.result, "timings": halt.timings, "logs": logs}
+        
+        if self.fast_router and not fast:
+            self.fast_router.record_llm_routing(timings.get("intent", timings.get("triage", 0.0)) + timings.get("tool_select", 0.0))
         
-        return {"final": final, "agent_output": ao.model_dump(), "tool_out": tool_out, "sentiment": sent.model_dump(), "intent_analysis": intent_analysis, "logs": logs}
+        return {"final": context["final"], "agent_output": context["agent_output"].model_dump(), "tool_out": context["tool_out"], "sentiment": context["sentiment"].model_dump(), "intent_analysis": context["intent_analysis"], "fast_path": fast, "timings": timings, "logs": logs}
@@ -0,0 +1,118 @@
+from typing import Dict, Any, List, Callable, Iterable, Optional, Tuple
+import asyncio
+import inspect
+import time
+from ..llm_client.call_metrics import stage_scope
+
+
+class PipelineHalt(Exception):
+    """Raised by a stage to stop the pipeline early with a final result.
+
+    Pipeline.run() sets timings to the stages that ran before the halt.
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__("pipeline halted")
+        self.result = result
+        self.timings = {}
+
+
+class Stage:
+    """One step of the agent pipeline.
+
+    fn is called with its declared inputs as keyword arguments plus a
+    per-stage logs list, and returns a dict with its declared outputs.
+    Coroutine functions are awaited; plain functions run on the default
+    thread pool unless offload=False (for trivially cheap stages).
+    fallback(error, logs, **inputs) supplies outputs when fn raises (it may
+    be a coroutine function); without one the error propagates and fails
+    the turn.
+    """
+
+    def __init__(self, name: str, fn: Callable, inputs: Iterable[str] = (), outputs: Iterable[str] = (),
+                 fallback: Optional[Callable] = None, offload: bool = True):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.fallback = fallback
+        self.offload = offload
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class Pipeline:
+    """Runs stages as soon as their inputs are available; independent stages run concurrently"""
+
+    def __init__(self, stages: List[Stage]):
+        names = [s.name for s in stages]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Duplicate stage names: {names}")
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Output '{output}' produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        self.stages = stages
+
+    async def run(self, context: Dict[str, Any], logs: List[str]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Execute all stages against context (updated in place); returns (context, timings in seconds)"""
+        timings = {}
+        pending = list(self.stages)
+        running = {}
+        available = set(context)
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(i in available for i in s.inputs)]:
+                    pending.remove(stage)
+                    task = asyncio.ensure_future(self._run_stage(stage, context))
+                    running[task] = stage
+                if not running:
+                    raise ValueError(f"Stages with unsatisfiable inputs: {pending}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    outputs, stage_logs, elapsed, halt = task.result()
+                    timings[stage.name] = elapsed
+                    logs.extend(stage_logs)
+                    logs.append(f"[TIMING] {stage.name}: {elapsed * 1000:.1f}ms")
+                    if halt:
+                        halt.timings = timings
+                        raise halt
+                    context.update(outputs)
+                    available.update(stage.outputs)
+        finally:
+            for task in running:
+                task.cancel()
+        return context, timings
+
+    async def _run_stage(self, stage: Stage, context: Dict[str, Any]):
+        stage_logs = []
+        kwargs = {name: context[name] for name in stage.inputs}
+        start = time.perf_counter()
+        halt = None
+        # LLM calls made by the stage (including its fallback) are attributed to it
+        with stage_scope(stage.name):
+            try:
+                if inspect.iscoroutinefunction(stage.fn):
+                    outputs = await stage.fn(logs=stage_logs, **kwargs)
+                elif stage.offload:
+                    outputs = await asyncio.to_thread(stage.fn, logs=stage_logs, **kwargs)
+                else:
+                    outputs = stage.fn(logs=stage_logs, **kwargs)
+            except PipelineHalt as e:
+                outputs, halt = {}, e
+            except Exception as e:
+                if stage.fallback is None:
+                    raise
+                outputs = stage.fallback(e, stage_logs, **kwargs)
+                if inspect.isawaitable(outputs):
+                    outputs = await outputs
+        outputs = outputs or {}
+        missing = [o for o in stage.outputs if o not in outputs]
+        if missing and not halt:
+            raise ValueError(f"Stage {stage.name} did not produce {missing}")
+        return outputs, stage_logs, time.perf_counter() - start, halt
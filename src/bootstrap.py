@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, Optional
+import os
+import threading
+import time
+from .llm_client.ollama_client import OllamaClient, AsyncOllamaClient
+from .llm_client.response_cache import ResponseCache
+from .sentiment.sentiment import SentimentAnalyzer
+from .store.document_store import DocumentStore, DocumentWatcher
+from .store.memory_store import MemoryStore
+from .store.learning_store import LearningStore
+from .store.episodic_memory_store import EpisodicMemoryStore
+from .agent.agent import ReasoningAgent
+
+
+def build_agent(docs_dir: str = "./docs", memory_dir: str = "./memory", learning_dir: str = "./learnings", index_docs: bool = True) -> ReasoningAgent:
+    """Wire clients and stores into a ReasoningAgent from the environment.
+
+    Every call opens its own store handles, so each worker process builds
+    its agent after it has been forked. index_docs=False leaves scanning
+    docs_dir to a later agent.docs.index().
+    """
+    cache = ResponseCache(path=os.path.join(memory_dir, "llm_cache.sqlite3")) if os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true" else None
+    ollama = OllamaClient(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"), cache=cache)
+    async_ollama = AsyncOllamaClient(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"), cache=cache)
+    sentiment = SentimentAnalyzer(ollama_client=ollama, async_client=async_ollama, prefilter=os.getenv("SENTIMENT_PREFILTER", "true").lower() == "true")
+    docs = DocumentStore(docs_dir=docs_dir, index=index_docs)
+    memory = MemoryStore(memory_dir=memory_dir)
+    learning = LearningStore(learning_dir=learning_dir)
+    episodic = EpisodicMemoryStore(ollama, persist_directory=memory_dir)
+    return ReasoningAgent(ollama, docs, sentiment, memory, learning, episodic, async_ollama=async_ollama)
+
+
+class AgentWarmup:
+    """Builds the agent on a background thread so a server can bind its port right away.
+
+    Opening the stores (and importing chromadb/openai with them) makes the
+    agent ready; document indexing (and, with DOC_WATCH_INTERVAL, the
+    polling watcher) starts afterwards, so cold start no longer grows with
+    the corpus. Requests arriving earlier
+    wait() for readiness; /readyz reports status(). "failed" means no agent
+    was built; an indexing failure after that leaves the agent ready and
+    sets state "ready_index_failed" and index_error instead.
+    """
+
+    def __init__(self, factory: Callable[..., ReasoningAgent] = build_agent, agent: ReasoningAgent = None, on_ready: Callable[[ReasoningAgent], None] = None):
+        self.factory = factory
+        self.on_ready = on_ready
+        self.agent = None
+        self.error = None
+        self.index_error = None
+        self.state = "pending"
+        self.started_at = time.perf_counter()
+        self.ready_seconds = None
+        self.indexed_seconds = None
+        self.watcher = None
+        self._ready = threading.Event()
+        self._thread = None
+        if agent is not None:
+            self._set_ready(agent)
+            self.state = "ready"
+
+    def start(self) -> "AgentWarmup":
+        if self._thread is None and not self._ready.is_set():
+            self.started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="agent-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _set_ready(self, agent: ReasoningAgent):
+        self.agent = agent
+        self.ready_seconds = time.perf_counter() - self.started_at
+        if self.on_ready:
+            self.on_ready(agent)
+        self._ready.set()
+
+    def _run(self):
+        try:
+            self.state = "opening_stores"
+            agent = self.factory(index_docs=False)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+            print(f"[warmup] Failed: {self.error}")
+            # Wake waiters; they see agent is None
+            self._ready.set()
+            return
+        self.state = "indexing_docs"
+        self._set_ready(agent)
+        print(f"[warmup] Agent ready in {self.ready_seconds:.2f}s")
+        try:
+            if agent.docs is not None:
+                agent.docs.index()
+                # Picks up later edits when DOC_WATCH_INTERVAL is set
+                self.watcher = DocumentWatcher(agent.docs).start()
+        except Exception as e:
+            # The agent still answers, only without (fresh) document search
+            self.index_error = f"{type(e).__name__}: {e}"
+            self.state = "ready_index_failed"
+            print(f"[warmup] Document indexing failed: {self.index_error}")
+            return
+        self.indexed_seconds = time.perf_counter() - self.started_at
+        self.state = "ready"
+        print(f"[warmup] Documents indexed in {self.indexed_seconds:.2f}s")
+
+    @property
+    def ready(self) -> bool:
+        return self.agent is not None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[ReasoningAgent]:
+        """The agent once ready, or None after timeout seconds or when warm-up failed"""
+        self._ready.wait(timeout)
+        return self.agent
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "error": self.error,
+            "index_error": self.index_error,
+            "ready_seconds": round(self.ready_seconds, 3) if self.ready_seconds is not None else None,
+            "indexed_seconds": round(self.indexed_seconds, 3) if self.indexed_seconds is not None else None,
+        }
@@ -1,5 +1,6 @@
 from .sentiment_functions import get_sentiment_function
 from .intent_functions import get_intent_function
 from .tool_selection_functions import get_tool_selection_function
+from .triage_functions import get_triage_function
 
-__all__ = ['get_sentiment_function', 'get_intent_function', 'get_tool_selection_function']
+__all__ = ['get_sentiment_function', 'get_intent_function', 'get_tool_selection_function', 'get_triage_function']
@@ -0,0 +1,24 @@
+from .intent_functions import get_intent_function
+from .sentiment_functions import get_sentiment_function
+from .tool_selection_functions import get_tool_selection_function
+
+
+def get_triage_function():
+    """Intent, sentiment and tool selection merged into one schema so a single call returns all three"""
+    parts = {
+        "intent_analysis": get_intent_function(),
+        "sentiment": get_sentiment_function(),
+        "tool_selection": get_tool_selection_function()
+    }
+    return {
+        "name": "triage_message",
+        "description": "Analyze the user's intent and sentiment, then select the tool to execute with its tool_arguments",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                key: {**fn["parameters"], "description": fn["description"]}
+                for key, fn in parts.items()
+            },
+            "required": list(parts.keys())
+        }
+    }
@@ -0,0 +1,68 @@
+"""Bulk ingestion of a document corpus into the DocumentStore.
+
+Finds every .txt, .md, .html and .jsonl file under the docs directory
+(recursively), reads, parses and chunks them in a process pool and embeds
+the chunks in large batches, printing progress and throughput as it goes.
+Progress is checkpointed in the index manifest: re-running after an
+interruption skips what is already indexed, and later runs only touch
+files that changed.
+
+    python src/ingest.py --docs-dir ./docs --workers 8 --batch-size 512
+
+Run it while the server is stopped, or point both at a shared Chroma
+server with CHROMA_HOST; one embedded Chroma directory must not be opened
+by two processes.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Any, Dict
+import argparse
+import time
+
+
+def ingest(docs_dir: str = "./docs", workers: int = None, batch_size: int = None, progress_interval: float = 2.0, embedding_function=None) -> Dict[str, Any]:
+    """Index docs_dir with workers processes; returns the index counts plus elapsed seconds and throughput"""
+    from src.store.document_store import DocumentStore
+    workers = workers or os.cpu_count() or 1
+    store = DocumentStore(docs_dir=docs_dir, embedding_function=embedding_function, index=False)
+    last_report = [0.0]
+
+    def report(stats):
+        now = time.perf_counter()
+        if now - last_report[0] < progress_interval and stats["files_done"] < stats["files_total"]:
+            return
+        last_report[0] = now
+        total = stats["files_total"] or 1
+        remaining = (stats["files_total"] - stats["files_done"]) / stats["files_per_second"] if stats["files_per_second"] else 0
+        print(f"[ingest] {stats['files_done']}/{stats['files_total']} files ({stats['files_done'] / total:.1%}), {stats['chunks']} chunks, "
+              f"{stats['files_per_second']} files/s, {stats['chunks_per_second']} chunks/s, ETA {remaining:.0f}s")
+
+    started = time.perf_counter()
+    counts = store.index(workers=workers, batch_size=batch_size, progress=report)
+    elapsed = time.perf_counter() - started
+    processed = counts.get("added", 0) + counts.get("updated", 0)
+    return dict(counts, seconds=round(elapsed, 2), workers=workers,
+                files_per_second=round(processed / elapsed, 1) if elapsed else 0.0,
+                chunks_per_second=round(counts.get("chunks", 0) / elapsed, 1) if elapsed else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-index a document corpus (.txt, .md, .html, .jsonl) into the DocumentStore")
+    parser.add_argument("--docs-dir", default="./docs")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DOC_INDEX_WORKERS", str(os.cpu_count() or 1))), help="parser processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="chunks per embedding/upsert call (default DOC_INDEX_BATCH_SIZE or 256)")
+    parser.add_argument("--progress-interval", type=float, default=2.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    result = ingest(args.docs_dir, args.workers, args.batch_size, args.progress_interval)
+    if "added" not in result:
+        sys.exit("[ingest] Indexing failed; see the errors above")
+    print(f"[ingest] Done in {result['seconds']}s with {result['workers']} workers: {result['added']} new, {result['updated']} changed, "
+          f"{result['removed']} removed, {result['unchanged']} unchanged, {result['errors']} unreadable files; "
+          f"{result['chunks']} chunks at {result['chunks_per_second']} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from typing import Dict, Any, Optional, Set
+import re
+import threading
+from .intent_analyzer import TOOL_KEYWORDS
+from ..tools import Tools
+
+_ARITHMETIC_PREFIX = re.compile(r"^(?:what(?:'s| is)|calculate|compute|evaluate|solve)\s+")
+_ARITHMETIC_EXPR = re.compile(r"^[\d\s.+\-*/()]+$")
+_ARITHMETIC_OP = re.compile(r"[\d)]\s*[-+*/]\s*[\d(.]")
+# Digit groups joined by bare hyphens (2024-01-15, 555-1234) are dates, phone
+# numbers or ids; they only count as subtraction after "what is" / "calculate"
+_HYPHENATED_NUMBER = re.compile(r"^\d+(?:-\d+)+$")
+_DATETIME_PHRASE = re.compile(
+    r"^(?:what(?:'s| is) the (?:current )?(?:time|date|day)(?: now| today| right now)?"
+    r"|what time is it(?: now| right now)?"
+    r"|what day is (?:it|today)"
+    r"|what(?:'s| is) today(?:'s date)?"
+    r"|(?:current|today's) (?:time|date)"
+    r"|time now|date today)$"
+)
+# The whole message must be the request, like _DATETIME_PHRASE: "validate <value>"
+# or "is <value> a valid <type>". Values are single tokens
+_VALIDATION_TYPE = r"(?P<type>email|e-mail|url|link|ip|phone)(?: address| number)?"
+_VALIDATION_PHRASE = re.compile(
+    r"^(?:(?:validate|verify|check)(?: (?:this|the|my|that))?(?: " + _VALIDATION_TYPE + r")?:? (?P<value>\S+)"
+    r"|is (?P<value2>\S+) (?:a )?valid(?: " + _VALIDATION_TYPE.replace("type", "type2") + r")?)$"
+)
+_VALIDATION_TYPE_NAMES = {"email": "email", "e-mail": "email", "url": "url", "link": "url", "ip": "ip", "phone": "phone"}
+_TOKEN_STRIP = "\"'`<>,;!?()[]"
+# Checked in order when the message names no type; phone numbers need the word
+# "phone", since the phone pattern also matches plain integers
+_VALIDATION_ORDER = ("email", "url", "ip")
+
+
+def _normalize(message: str) -> str:
+    text = " ".join(message.lower().split())
+    text = re.sub(r"^(?:hey|hi|please|ok|okay)[,!]?\s+", "", text)
+    return text.rstrip("?!. =")
+
+
+def _keyword_tools(text: str) -> Set[str]:
+    """Tools whose keywords appear in text as whole words (the substring match in
+    map_intent_to_tool would e.g. read "validate" as a date request)"""
+    hits = set()
+    for tool, keywords in TOOL_KEYWORDS.items():
+        if any(re.search(rf"\b{re.escape(kw)}\b", text) for kw in keywords):
+            hits.add(tool)
+    return hits
+
+
+class FastRouter:
+    """Deterministic pre-router that answers obvious tool requests without LLM routing.
+
+    A match bypasses intent analysis and tool selection. Rules only fire
+    when they are unambiguous; anything else returns None and the message
+    takes the normal LLM path.
+    """
+
+    def __init__(self, min_confidence: float = 0.9):
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.hits = 0
+        self.rule_hits = {}
+        self.saved_seconds = 0.0
+        self._routing_samples = 0
+        self._routing_avg = 0.0
+
+    def route(self, message: str) -> Optional[Dict[str, Any]]:
+        """Return {"tool", "arguments", "confidence", "rule"} or None"""
+        text = _normalize(message)
+        match = None
+        for rule in (self._arithmetic, self._datetime, self._validator):
+            match = rule(text, message)
+            if match:
+                break
+        if match and match["confidence"] < self.min_confidence:
+            match = None
+
+        with self._lock:
+            self.turns += 1
+            if match:
+                self.hits += 1
+                self.rule_hits[match["rule"]] = self.rule_hits.get(match["rule"], 0) + 1
+                # Estimated saving: what LLM routing has been costing on turns that needed it
+                match["saved_seconds"] = self._routing_avg
+                self.saved_seconds += self._routing_avg
+        return match
+
+    def record_llm_routing(self, seconds: float):
+        """Feed back the measured cost of LLM intent analysis + tool selection"""
+        with self._lock:
+            self._routing_samples += 1
+            self._routing_avg += (seconds - self._routing_avg) / self._routing_samples
+
+    def _arithmetic(self, text: str, message: str) -> Optional[Dict[str, Any]]:
+        expr = _ARITHMETIC_PREFIX.sub("", text).strip()
+        if not _ARITHMETIC_EXPR.match(expr) or not _ARITHMETIC_OP.search(expr):
+            return None
+        if expr == text and _HYPHENATED_NUMBER.match(expr):
+            return None
+        return {"tool": "calculator", "arguments": {"expr": expr}, "confidence": 0.99, "rule": "arithmetic"}
+
+    def _datetime(self, text: str, message: str) -> Optional[Dict[str, Any]]:
+        if not _DATETIME_PHRASE.match(text) or "get_datetime" not in _keyword_tools(text):
+            return None
+        return {"tool": "get_datetime", "arguments": {"timezone": "UTC"}, "confidence": 0.95, "rule": "datetime"}
+
+    def _validator(self, text: str, message: str) -> Optional[Dict[str, Any]]:
+        match = _VALIDATION_PHRASE.match(text)
+        if not match:
+            return None
+        value = (match.group("value") or match.group("value2")).strip(_TOKEN_STRIP)
+        # The value as typed (text is lowercased); URLs are case-sensitive
+        data = next((t for t in (t.strip(_TOKEN_STRIP + ".") for t in message.split()) if t.lower() == value), value)
+        named = match.group("type") or match.group("type2")
+        if named:
+            data_type = _VALIDATION_TYPE_NAMES[named]
+        else:
+            data_type = next((t for t in _VALIDATION_ORDER if re.match(Tools.VALIDATION_PATTERNS[t], data)), None)
+            if data_type is None and "@" in data:
+                # Invalid addresses still mean "validate this email"
+                data_type = "email"
+        if data_type is None:
+            return None
+        return {"tool": "validate_data", "arguments": {"data": data, "data_type": data_type}, "confidence": 0.95, "rule": f"validate_{data_type}"}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.turns if self.turns else 0.0,
+                "rule_hits": dict(self.rule_hits),
+                "saved_seconds_total": self.saved_seconds,
+                "avg_saved_seconds_per_hit": self.saved_seconds / self.hits if self.hits else 0.0,
+                "avg_llm_routing_seconds": self._routing_avg
+            }
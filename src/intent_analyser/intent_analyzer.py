@@ -1,20 +1,41 @@
-from typing import Dict, Any
-from ..llm_client.ollama_client import OllamaClient
+from typing import Dict, Any, List
+import asyncio
+from ..llm_client.ollama_client import OllamaClient, AsyncOllamaClient
+from ..llm_client.model_router import ModelRouter, get_model_router, route_scope
 from ..functions.intent_functions import get_intent_function
 
+# Direct tool mapping
+TOOL_KEYWORDS = {
+    "search_docs": ["search", "find", "lookup", "document", "knowledge", "information", "what do you know"],
+    "calculator": ["calculate", "compute", "math", "add", "subtract", "multiply", "divide"],
+    "get_datetime": ["time", "date", "today", "now", "when", "current"],
+    "text_analysis": ["analyze text", "word count", "character count", "text metrics"],
+    "generate_id": ["generate id", "create id", "unique id", "identifier"],
+    "string_transform": ["uppercase", "lowercase", "reverse", "transform", "convert text"],
+    "validate_data": ["validate", "check email", "verify", "check url", "check phone"],
+    "remember": ["remember", "store", "save", "keep in mind", "note that", "my name is", "introduce"],
+    "recall": ["recall", "what did i", "do you remember", "retrieve memory", "what do you know about me"],
+    "forget": ["forget", "delete memory", "remove memory", "erase"],
+    "teach": ["teach", "learn", "procedure", "workflow", "steps", "how to"],
+    "execute_learning": ["execute", "run", "follow", "do the", "perform"],
+    "list_learnings": ["list learnings", "show procedures", "what workflows"],
+    "escalate": ["escalate", "human help", "talk to person", "need assistance"]
+}
+
+
 class IntentAnalyzer:
-    def __init__(self, ollama: OllamaClient):
+    def __init__(self, ollama: OllamaClient, async_ollama: AsyncOllamaClient = None, router: ModelRouter = None):
         self.ollama = ollama
+        self.async_ollama = async_ollama
+        self.router = router or get_model_router()
 
-    def analyze_intent(self, user_message: str) -> Dict[str, Any]:
-        """Deep intent analysis using LLM reasoning"""
-        print(f"[intent] Analyzing: {user_message[:50]}")
-        messages = [
+    def _build_messages(self, user_message: str) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": "You are an expert intent analyzer."},
             {"role": "user", "content": f"Analyze the user's intent deeply for this message: '{user_message}'"}
         ]
-        
-        result = self.ollama.chat(messages, model="gpt-4o-mini", functions=[get_intent_function()])
+
+    def _parse_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         print(f"[intent] Result keys: {list(result.keys())}")
         
         if "function_name" in result:
@@ -22,6 +43,24 @@ class IntentAnalyzer:
         
         raise ValueError(f"No function call returned, got: {result}")
 
+    def analyze_intent(self, user_message: str) -> Dict[str, Any]:
+        """Deep intent analysis using LLM reasoning"""
+        print(f"[intent] Analyzing: {user_message[:50]}")
+        route = self.router.select("intent")
+        with route_scope(route):
+            result = self.ollama.chat(self._build_messages(user_message), model=route.model, functions=[get_intent_function()])
+        return self._parse_result(result)
+
+    async def analyze_intent_async(self, user_message: str) -> Dict[str, Any]:
+        """Async variant of analyze_intent; falls back to a worker thread without an async client"""
+        if not self.async_ollama:
+            return await asyncio.to_thread(self.analyze_intent, user_message)
+        print(f"[intent] Analyzing (async): {user_message[:50]}")
+        route = self.router.select("intent")
+        with route_scope(route):
+            result = await self.async_ollama.chat(self._build_messages(user_message), model=route.model, functions=[get_intent_function()])
+        return self._parse_result(result)
+
     def map_intent_to_tool(self, intent_analysis: Dict[str, Any]) -> str:
         """Map analyzed intent to specific tool"""
         
@@ -29,31 +68,13 @@ class IntentAnalyzer:
         action = intent_analysis.get("action_required", "").lower()
         suggested = intent_analysis.get("suggested_tools", [])
         
-        # Direct tool mapping
-        tool_keywords = {
-            "search_docs": ["search", "find", "lookup", "document", "knowledge", "information", "what do you know"],
-            "calculator": ["calculate", "compute", "math", "add", "subtract", "multiply", "divide"],
-            "get_datetime": ["time", "date", "today", "now", "when", "current"],
-            "text_analysis": ["analyze text", "word count", "character count", "text metrics"],
-            "generate_id": ["generate id", "create id", "unique id", "identifier"],
-            "string_transform": ["uppercase", "lowercase", "reverse", "transform", "convert text"],
-            "validate_data": ["validate", "check email", "verify", "check url", "check phone"],
-            "remember": ["remember", "store", "save", "keep in mind", "note that", "my name is", "introduce"],
-            "recall": ["recall", "what did i", "do you remember", "retrieve memory", "what do you know about me"],
-            "forget": ["forget", "delete memory", "remove memory", "erase"],
-            "teach": ["teach", "learn", "procedure", "workflow", "steps", "how to"],
-            "execute_learning": ["execute", "run", "follow", "do the", "perform"],
-            "list_learnings": ["list learnings", "show procedures", "what workflows"],
-            "escalate": ["escalate", "human help", "talk to person", "need assistance"]
-        }
-        
         # Check suggested tools first
         if suggested:
             return suggested[0]
         
         # Match keywords in both primary intent and action
         combined = f"{primary} {action}"
-        for tool, keywords in tool_keywords.items():
+        for tool, keywords in TOOL_KEYWORDS.items():
             if any(kw in combined for kw in keywords):
                 return tool
         
@@ -0,0 +1,58 @@
+from typing import Dict, Any, List
+import asyncio
+from ..llm_client.ollama_client import OllamaClient, AsyncOllamaClient
+from ..llm_client.model_router import ModelRouter, get_model_router, route_scope
+from ..functions.triage_functions import get_triage_function
+from ..sentiment.sentiment import SentimentOutput
+
+
+class TriageAnalyzer:
+    """Fused intent + sentiment + tool selection in a single LLM round trip"""
+
+    def __init__(self, ollama: OllamaClient, async_ollama: AsyncOllamaClient = None, router: ModelRouter = None):
+        self.ollama = ollama
+        self.async_ollama = async_ollama
+        self.router = router or get_model_router()
+
+    def _build_messages(self, user_message: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "You are an expert intent analyzer, sentiment analysis expert and tool router. Fill in every section."},
+            {"role": "user", "content": f"User message: '{user_message}'\nAnalyze the intent and sentiment, then select the appropriate tool and provide arguments."}
+        ]
+
+    def _parse_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"[triage] Result keys: {list(result.keys())}")
+        if "function_name" not in result:
+            raise ValueError(f"No function call returned, got: {result}")
+
+        args = result["arguments"]
+        sent_args = args.get("sentiment") or {}
+        sentiment = SentimentOutput(
+            label=str(sent_args.get("label", "NEUTRAL")).upper(),
+            score=sent_args.get("score", 0.5),
+            reasoning=sent_args.get("reasoning", "")
+        )
+        if sentiment.label not in {"POSITIVE", "NEGATIVE", "NEUTRAL"}:
+            raise ValueError(f"Invalid label returned: {sentiment.label}")
+
+        intent_analysis = args.get("intent_analysis")
+        if not intent_analysis:
+            raise ValueError("Triage returned no intent analysis")
+        return {"intent_analysis": intent_analysis, "sentiment": sentiment, "tool_selection": args.get("tool_selection") or {}}
+
+    def triage(self, user_message: str) -> Dict[str, Any]:
+        """Return {"intent_analysis", "sentiment", "tool_selection"} from one call"""
+        print(f"[triage] Analyzing: {user_message[:50]}")
+        route = self.router.select("triage")
+        with route_scope(route):
+            result = self.ollama.chat(self._build_messages(user_message), model=route.model, functions=[get_triage_function()])
+        return self._parse_result(result)
+
+    async def triage_async(self, user_message: str) -> Dict[str, Any]:
+        if not self.async_ollama:
+            return await asyncio.to_thread(self.triage, user_message)
+        print(f"[triage] Analyzing (async): {user_message[:50]}")
+        route = self.router.select("triage")
+        with route_scope(route):
+            result = await self.async_ollama.chat(self._build_messages(user_message), model=route.model, functions=[get_triage_function()])
+        return self._parse_result(result)
@@ -0,0 +1,145 @@
+from typing import List, Dict, Optional, Any, Callable
+from collections import deque
+from contextlib import contextmanager
+import contextvars
+import math
+import threading
+import time
+import weakref
+
+# USD per 1M tokens (input, output). Unknown models are reported with cost 0.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60)
+}
+
+# Name of the pipeline stage (or background job) issuing LLM calls; asyncio
+# tasks and asyncio.to_thread copy it, so calls are attributed automatically.
+current_stage = contextvars.ContextVar("llm_stage", default=None)
+# Per-turn list that every record is also appended to, set by the agent
+current_turn = contextvars.ContextVar("llm_turn", default=None)
+# "<stage>:<rule>" of the model route chosen by ModelRouter, if any
+current_route = contextvars.ContextVar("llm_route", default=None)
+
+
+@contextmanager
+def stage_scope(name: str):
+    """Attribute LLM calls made inside the block to stage name"""
+    token = current_stage.set(name)
+    try:
+        yield
+    finally:
+        current_stage.reset(token)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def summarize(records: List[Dict[str, Any]], group_by: Optional[str] = "stage") -> Dict[str, Any]:
+    """Aggregate records (optionally grouped by "stage", "route", "model" or "function")"""
+    groups = {}
+    for record in records:
+        key = (record.get(group_by) or "unknown") if group_by else "all"
+        groups.setdefault(key, []).append(record)
+
+    summary = {}
+    for key, group in groups.items():
+        latencies = sorted(r["latency"] for r in group if not r["cached"])
+        summary[key] = {
+            "calls": len(group),
+            "cached": sum(1 for r in group if r["cached"]),
+            "errors": sum(1 for r in group if r["error"]),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in group),
+            "completion_tokens": sum(r["completion_tokens"] for r in group),
+            "cost": round(sum(r["cost"] for r in group), 6),
+            "latency_total": round(sum(latencies), 4),
+            "queue_wait_total": round(sum(r.get("queue_wait", 0.0) for r in group), 4),
+            "p50": round(_percentile(latencies, 50), 4),
+            "p95": round(_percentile(latencies, 95), 4),
+            "p99": round(_percentile(latencies, 99), 4)
+        }
+    return summary if group_by else summary.get("all", {})
+
+
+class CallMetrics:
+    """Ring buffer of the most recent LLM calls with latency/token aggregates"""
+
+    def __init__(self, capacity: int = 2048):
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener(record) for every recorded call (e.g. to feed cumulative counters).
+
+        A bound method is held weakly: once its object is garbage collected
+        (an app built in a test, say) it stops being called.
+        """
+        ref = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else (lambda: listener)
+        with self._lock:
+            self._listeners.append(ref)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() not in (None, listener)]
+
+    def record(self, model: str, function: Optional[str], latency: float, usage: Any = None, cached: bool = False,
+               error: Optional[str] = None, stream: bool = False, queue_wait: float = 0.0) -> Dict[str, Any]:
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        record = {
+            "timestamp": time.time(),
+            "stage": current_stage.get(),
+            "route": current_route.get(),
+            "model": model,
+            "function": function or ("stream" if stream else "text"),
+            "latency": latency,
+            "queue_wait": queue_wait,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": 0.0 if cached else estimate_cost(model, prompt_tokens, completion_tokens),
+            "cached": cached,
+            "error": error
+        }
+        with self._lock:
+            self._records.append(record)
+            listeners = [ref() for ref in self._listeners]
+            if None in listeners:
+                self._listeners = [ref for ref in self._listeners if ref() is not None]
+        turn = current_turn.get()
+        if turn is not None:
+            turn.append(record)
+        for listener in listeners:
+            if listener is not None:
+                listener(record)
+        return record
+
+    def records(self, stage: str = None, since: float = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if (stage is None or r["stage"] == stage) and (since is None or r["timestamp"] >= since)]
+
+    def summary(self, group_by: Optional[str] = "stage", since: float = None) -> Dict[str, Any]:
+        return summarize(self.records(since=since), group_by)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+_default_metrics = CallMetrics()
+
+
+def get_call_metrics() -> CallMetrics:
+    """Process-wide recorder used by OllamaClient/AsyncOllamaClient unless one is passed in"""
+    return _default_metrics
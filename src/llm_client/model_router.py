@@ -0,0 +1,132 @@
+from typing import Dict, Optional, Any
+from contextlib import contextmanager
+import copy
+import json
+import os
+import threading
+from .call_metrics import CallMetrics, current_route, get_call_metrics, summarize
+
+# Rules are tried in order per stage; the first whose "when" matches picks
+# the model alias. Conditions: complexity/urgency/tool (lists of allowed
+# values) and min_payload_tokens/max_payload_tokens. A rule without "when"
+# always matches.
+DEFAULT_ROUTES = {
+    "models": {"small": "gpt-4o-mini", "large": "gpt-4o"},
+    "stages": {
+        "intent": [{"name": "default", "model": "small"}],
+        "sentiment": [{"name": "default", "model": "small"}],
+        # The fused call also selects the tool, which needs the stronger model
+        "triage": [{"name": "default", "model": "large"}],
+        "tool_select": [
+            {"name": "complex", "when": {"complexity": ["complex"]}, "model": "large"},
+            {"name": "default", "model": "small"}
+        ],
+        "synthesis": [
+            {"name": "complex", "when": {"complexity": ["complex"]}, "model": "large"},
+            {"name": "large_payload", "when": {"min_payload_tokens": 1200}, "model": "large"},
+            {"name": "retrieval", "when": {"tool": ["search_docs", "recall", "execute_learning"], "complexity": ["moderate"]}, "model": "large"},
+            {"name": "default", "model": "small"}
+        ]
+    }
+}
+
+
+class Route:
+    def __init__(self, stage: str, name: str, model: str):
+        self.stage = stage
+        self.name = name
+        self.model = model
+
+    @property
+    def key(self) -> str:
+        return f"{self.stage}:{self.name}"
+
+    def __repr__(self):
+        return f"Route({self.key!r}, model={self.model!r})"
+
+
+@contextmanager
+def route_scope(route: Route):
+    """Tag LLM calls made inside the block with the route, for per-route stats"""
+    token = current_route.set(route.key)
+    try:
+        yield
+    finally:
+        current_route.reset(token)
+
+
+class ModelRouter:
+    """Picks the cheapest adequate model per stage from declarative rules"""
+
+    def __init__(self, routes: Dict[str, Any] = None, metrics: CallMetrics = None):
+        self.routes = copy.deepcopy(routes or DEFAULT_ROUTES)
+        self.metrics = metrics or get_call_metrics()
+        self._lock = threading.Lock()
+        self._decisions = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """DEFAULT_ROUTES, optionally replaced by the JSON file at MODEL_ROUTES_PATH; MODEL_SMALL/MODEL_LARGE rename the aliases"""
+        routes = copy.deepcopy(DEFAULT_ROUTES)
+        path = os.getenv("MODEL_ROUTES_PATH")
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                loaded = json.load(f)
+            routes["models"].update(loaded.get("models", {}))
+            routes["stages"].update(loaded.get("stages", {}))
+            print(f"[router] Loaded model routes from {path}")
+        routes["models"]["small"] = os.getenv("MODEL_SMALL", os.getenv("OPENAI_MODEL", routes["models"]["small"]))
+        routes["models"]["large"] = os.getenv("MODEL_LARGE", routes["models"]["large"])
+        return cls(routes)
+
+    @staticmethod
+    def _matches(when: Dict[str, Any], features: Dict[str, Any]) -> bool:
+        for key, expected in when.items():
+            if key == "min_payload_tokens":
+                if features.get("payload_tokens", 0) < expected:
+                    return False
+            elif key == "max_payload_tokens":
+                if features.get("payload_tokens", 0) > expected:
+                    return False
+            elif features.get(key) not in expected:
+                return False
+        return True
+
+    def select(self, stage: str, intent_analysis: Optional[Dict[str, Any]] = None, tool: str = None, payload_tokens: int = 0) -> Route:
+        intent_analysis = intent_analysis or {}
+        features = {
+            "complexity": str(intent_analysis.get("complexity", "")).lower() or None,
+            "urgency": str(intent_analysis.get("urgency", "")).lower() or None,
+            "tool": tool,
+            "payload_tokens": payload_tokens
+        }
+        models = self.routes["models"]
+        route = None
+        for index, rule in enumerate(self.routes["stages"].get(stage, [])):
+            if self._matches(rule.get("when", {}), features):
+                route = Route(stage, rule.get("name", str(index)), models.get(rule["model"], rule["model"]))
+                break
+        if route is None:
+            route = Route(stage, "fallback", models["small"])
+        with self._lock:
+            self._decisions[route.key] = self._decisions.get(route.key, 0) + 1
+        return route
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-route decision counts with latency percentiles, tokens and cost of the routed calls"""
+        calls = summarize([r for r in self.metrics.records() if r.get("route")], "route")
+        with self._lock:
+            decisions = dict(self._decisions)
+        return {key: {"decisions": count, **calls.get(key, {})} for key, count in decisions.items()}
+
+
+_default_router = None
+_default_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    global _default_router
+    with _default_lock:
+        if _default_router is None:
+            _default_router = ModelRouter.from_env()
+        return _default_router
@@ -1,48 +1,291 @@
 from typing import List, Dict, Optional, Any
+import asyncio
+import concurrent.futures
 import json
 import os
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except Exception:
-    OPENAI_AVAILABLE = False
+import threading
+import time
+import weakref
+from .response_cache import ResponseCache
+from .singleflight import SingleFlight, get_singleflight
+from .call_metrics import CallMetrics, get_call_metrics
+from .resilience import ResiliencePolicy, CircuitOpenError, get_resilience_policy
+from .rate_limiter import LLMRateLimiter, current_lane, estimate_tokens, get_rate_limiter
+import importlib.util
+
+# The openai SDK takes about a second to import; it is imported when the first client is built
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+
+def _request_kwargs(model: str, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    kwargs = {"model": model, "messages": messages}
+    if functions:
+        kwargs["functions"] = functions
+        kwargs["function_call"] = {"name": functions[0]["name"]} if len(functions) == 1 else "auto"
+    return kwargs
+
+
+def _cache_key(cache: Optional[ResponseCache], model: str, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]], override: Optional[bool]) -> Optional[str]:
+    if cache is None or not cache.should_cache(functions, override):
+        return None
+    return cache.make_key(messages, model, functions)
+
+
+def _usage_tokens(usage: Any) -> Optional[int]:
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def _function_name(functions: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    return functions[0]["name"] if functions else None
+
+
+def _iter_deltas(response, usage: Dict[str, Any]):
+    for chunk in response:
+        if getattr(chunk, "usage", None):
+            usage["usage"] = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _iter_deltas_async(response, usage: Dict[str, Any]):
+    async for chunk in response:
+        if getattr(chunk, "usage", None):
+            usage["usage"] = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _parse_response(response, functions: Optional[List[Dict[str, Any]]]) -> Any:
+    message = response.choices[0].message
+    if not functions:
+        return message.content
+    print(f"[openai] Has function_call: {hasattr(message, 'function_call') and message.function_call is not None}")
+    if message.function_call:
+        args = json.loads(message.function_call.arguments)
+        print(f"[openai] Function: {message.function_call.name}, Args: {list(args.keys())}")
+        return {"function_name": message.function_call.name, "arguments": args}
+    print(f"[openai] No function call, content: {(message.content or '')[:100]}")
+    return {"content": message.content}
+
 
 class OllamaClient:
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini", cache: ResponseCache = None, metrics: CallMetrics = None, resilience: ResiliencePolicy = None, limiter: LLMRateLimiter = None, singleflight: SingleFlight = None):
         self.model = model
+        self.cache = cache
+        self.metrics = metrics or get_call_metrics()
+        self.resilience = resilience or get_resilience_policy()
+        self.limiter = limiter or get_rate_limiter()
+        self.singleflight = singleflight or get_singleflight()
+        self.base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
         if OPENAI_AVAILABLE:
+            from openai import OpenAI
+            # Retries are handled by the resilience policy, not the SDK
             self.client = OpenAI(
                 api_key=os.getenv('OPENAI_API_KEY'),
-                base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+                base_url=self.base_url,
+                max_retries=0
             )
             print(f"[openai] Using OpenAI with model: {model}")
         else:
             self.client = None
             raise Exception("OpenAI not available - install openai package")
 
-    def chat(self, messages: List[Dict[str, str]], model: str = None, functions: Optional[List[Dict[str, Any]]] = None) -> Any:
+    def chat(self, messages: List[Dict[str, str]], model: str = None, functions: Optional[List[Dict[str, Any]]] = None, stream: bool = False, cache: Optional[bool] = None) -> Any:
+        """Run a chat completion.
+
+        With stream=True (plain text only) a generator of content deltas is
+        returned instead of the full message. cache overrides the response
+        cache's per-function policy for this call.
+        """
         use_model = model or self.model
+        if stream:
+            if functions:
+                raise ValueError("Streaming is only supported for plain text completions")
+            return self._stream(use_model, messages)
+        cache_key = _cache_key(self.cache, use_model, messages, functions, cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"[openai] Cache hit for {functions[0]['name'] if functions else use_model}")
+                self.metrics.record(use_model, _function_name(functions), 0.0, cached=True)
+                return cached
+        # Identical calls already in flight share that request instead of sending another
+        flight_key = f"{self.base_url}|{cache_key or ResponseCache.make_key(messages, use_model, functions)}"
+        return self.singleflight.do(flight_key, lambda: self._complete(use_model, messages, functions, cache_key))
+
+    def _complete(self, use_model: str, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]], cache_key: Optional[str]) -> Any:
+        start = time.perf_counter()
+        lane, reserve, waits = current_lane(), estimate_tokens(messages, functions), []
         try:
             if functions:
                 print(f"[openai] Calling {use_model} with function: {functions[0]['name']}")
-                response = self.client.chat.completions.create(
-                    model=use_model,
-                    messages=messages,
-                    functions=functions,
-                    function_call={"name": functions[0]["name"]} if len(functions) == 1 else "auto"
-                )
-                message = response.choices[0].message
-                print(f"[openai] Has function_call: {hasattr(message, 'function_call') and message.function_call is not None}")
-                if message.function_call:
-                    args = json.loads(message.function_call.arguments)
-                    print(f"[openai] Function: {message.function_call.name}, Args: {list(args.keys())}")
-                    return {"function_name": message.function_call.name, "arguments": args}
-                print(f"[openai] No function call, content: {message.content[:100]}")
-                return {"content": message.content}
-            else:
-                response = self.client.chat.completions.create(model=use_model, messages=messages)
-                return response.choices[0].message.content
+            request = _request_kwargs(use_model, messages, functions)
+            # Every attempt (retries and hedges included) goes through the shared limiter
+            response = self.resilience.call(lambda timeout: self.limiter.call(lambda: self.client.chat.completions.create(timeout=timeout, **request), lane, reserve, waits), _function_name(functions))
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, usage=getattr(response, "usage", None), queue_wait=sum(waits))
+            result = _parse_response(response, functions)
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
+        except CircuitOpenError as e:
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, error=str(e))
+            raise
+        except Exception as e:
+            print(f"[openai] ERROR: {str(e)}")
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, error=str(e))
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    def _stream(self, use_model: str, messages: List[Dict[str, str]]):
+        start = time.perf_counter()
+        usage = {}
+        # The limiter slot is held for the whole stream, not just while opening it
+        ticket = self.limiter.acquire(current_lane(), estimate_tokens(messages))
+        queue_wait = time.perf_counter() - start
+        try:
+            print(f"[openai] Streaming {use_model}")
+            request = _request_kwargs(use_model, messages, None)
+            # Only opening the stream is retried; a stream that fails midway is not replayed
+            response = self.resilience.call(lambda timeout: self.client.chat.completions.create(stream=True, stream_options={"include_usage": True}, timeout=timeout, **request))
+            yield from _iter_deltas(response, usage)
+            self.metrics.record(use_model, None, time.perf_counter() - start, usage=usage.get("usage"), stream=True, queue_wait=queue_wait)
+        except CircuitOpenError as e:
+            self.metrics.record(use_model, None, time.perf_counter() - start, error=str(e), stream=True, queue_wait=queue_wait)
+            raise
+        except Exception as e:
+            print(f"[openai] ERROR: {str(e)}")
+            self.metrics.record(use_model, None, time.perf_counter() - start, error=str(e), stream=True, queue_wait=queue_wait)
+            raise Exception(f"OpenAI API error: {str(e)}")
+        finally:
+            self.limiter.release(ticket, _usage_tokens(usage.get("usage")))
+
+
+class AsyncOllamaClient:
+    """Async counterpart of OllamaClient.
+
+    All instances share one pooled AsyncOpenAI (and therefore one HTTP
+    connection pool) per event loop, so concurrent stages reuse connections
+    instead of opening a new one per call.
+    """
+
+    _clients = weakref.WeakKeyDictionary()
+    _clients_lock = threading.Lock()
+
+    def __init__(self, model: str = "gpt-4o-mini", cache: ResponseCache = None, metrics: CallMetrics = None, resilience: ResiliencePolicy = None, limiter: LLMRateLimiter = None, singleflight: SingleFlight = None):
+        if not OPENAI_AVAILABLE:
+            raise Exception("OpenAI not available - install openai package")
+        self.model = model
+        self.cache = cache
+        self.metrics = metrics or get_call_metrics()
+        self.resilience = resilience or get_resilience_policy()
+        self.limiter = limiter or get_rate_limiter()
+        self.singleflight = singleflight or get_singleflight()
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        self.base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+        print(f"[openai] Using async OpenAI with model: {model}")
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        key = (self.api_key, self.base_url)
+        with self._clients_lock:
+            pool = self._clients.setdefault(loop, {})
+            if key not in pool:
+                from openai import AsyncOpenAI
+                pool[key] = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+            return pool[key]
+
+    async def chat(self, messages: List[Dict[str, str]], model: str = None, functions: Optional[List[Dict[str, Any]]] = None, stream: bool = False, cache: Optional[bool] = None) -> Any:
+        """Async chat completion; with stream=True an async iterator of content deltas is returned"""
+        use_model = model or self.model
+        if stream:
+            if functions:
+                raise ValueError("Streaming is only supported for plain text completions")
+            return self._stream(use_model, messages)
+        cache_key = _cache_key(self.cache, use_model, messages, functions, cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"[openai] Cache hit for {functions[0]['name'] if functions else use_model}")
+                self.metrics.record(use_model, _function_name(functions), 0.0, cached=True)
+                return cached
+        flight_key = f"{self.base_url}|{cache_key or ResponseCache.make_key(messages, use_model, functions)}"
+        return await self.singleflight.do_async(flight_key, lambda: self._complete(use_model, messages, functions, cache_key))
+
+    async def _complete(self, use_model: str, messages: List[Dict[str, str]], functions: Optional[List[Dict[str, Any]]], cache_key: Optional[str]) -> Any:
+        start = time.perf_counter()
+        lane, reserve, waits = current_lane(), estimate_tokens(messages, functions), []
+        try:
+            if functions:
+                print(f"[openai] Calling {use_model} (async) with function: {functions[0]['name']}")
+            request = _request_kwargs(use_model, messages, functions)
+            response = await self.resilience.call_async(lambda timeout: self.limiter.call_async(lambda: self.client.chat.completions.create(timeout=timeout, **request), lane, reserve, waits), _function_name(functions))
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, usage=getattr(response, "usage", None), queue_wait=sum(waits))
+            result = _parse_response(response, functions)
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
+        except CircuitOpenError as e:
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, error=str(e))
+            raise
         except Exception as e:
             print(f"[openai] ERROR: {str(e)}")
+            self.metrics.record(use_model, _function_name(functions), time.perf_counter() - start, error=str(e))
             raise Exception(f"OpenAI API error: {str(e)}")
 
+    async def _stream(self, use_model: str, messages: List[Dict[str, str]]):
+        start = time.perf_counter()
+        usage = {}
+        ticket = await self.limiter.acquire_async(current_lane(), estimate_tokens(messages))
+        queue_wait = time.perf_counter() - start
+        try:
+            print(f"[openai] Streaming {use_model} (async)")
+            request = _request_kwargs(use_model, messages, None)
+            response = await self.resilience.call_async(lambda timeout: self.client.chat.completions.create(stream=True, stream_options={"include_usage": True}, timeout=timeout, **request))
+            async for delta in _iter_deltas_async(response, usage):
+                yield delta
+            self.metrics.record(use_model, None, time.perf_counter() - start, usage=usage.get("usage"), stream=True, queue_wait=queue_wait)
+        except CircuitOpenError as e:
+            self.metrics.record(use_model, None, time.perf_counter() - start, error=str(e), stream=True, queue_wait=queue_wait)
+            raise
+        except Exception as e:
+            print(f"[openai] ERROR: {str(e)}")
+            self.metrics.record(use_model, None, time.perf_counter() - start, error=str(e), stream=True, queue_wait=queue_wait)
+            raise Exception(f"OpenAI API error: {str(e)}")
+        finally:
+            self.limiter.release(ticket, _usage_tokens(usage.get("usage")))
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _loop
+
+
+def submit(coro) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared background event loop.
+
+    Using one long-lived loop keeps AsyncOllamaClient's connection pool warm
+    across sync callers (CLI, Flask request threads).
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Cannot block on the background loop from inside it; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def run_sync(coro) -> Any:
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    return submit(coro).result()
@@ -0,0 +1,151 @@
+from typing import List, Dict, Optional, Any, Tuple
+import json
+import os
+import re
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+# Default prompt budgets (tokens) per stage; override with PROMPT_BUDGET_<STAGE>
+STAGE_BUDGETS = {
+    "synthesis": 3000,
+    "profile_analysis": 4000,
+    "short_term_summary": 1500,
+    "long_term_extract": 1500,
+    "learning_extract": 1500
+}
+DEFAULT_BUDGET = 3000
+# Per-message framing overhead in chat formats
+MESSAGE_OVERHEAD = 4
+# Successively tighter (max list items, max string chars) caps tried when shrinking a value
+SHRINK_LEVELS = ((50, 2000), (20, 600), (10, 300), (5, 120), (3, 60), (1, 30))
+
+_APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise a deterministic BPE-like approximation"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(_APPROX_TOKEN.findall(text))
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def stage_budget(stage: str) -> int:
+    return int(os.getenv(f"PROMPT_BUDGET_{stage.upper()}", STAGE_BUDGETS.get(stage, DEFAULT_BUDGET)))
+
+
+def _shrink(value: Any, max_items: int, max_chars: int, keep: str) -> Any:
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return value[:max_chars] + f"...[+{len(value) - max_chars} chars]"
+    if isinstance(value, list):
+        items = value[-max_items:] if keep == "tail" else value[:max_items]
+        shrunk = [_shrink(v, max_items, max_chars, keep) for v in items]
+        omitted = len(value) - len(items)
+        if omitted:
+            marker = f"...[{omitted} more items omitted]"
+            shrunk = [marker] + shrunk if keep == "tail" else shrunk + [marker]
+        return shrunk
+    if isinstance(value, dict):
+        return {k: _shrink(v, max_items, max_chars, keep) for k, v in value.items()}
+    return value
+
+
+def fit_value(value: Any, budget: int, keep: str = "head") -> Tuple[Any, int]:
+    """Deterministically shrink value until its compact JSON fits budget tokens; returns (value, tokens)"""
+    tokens = count_tokens(compact_json(value))
+    if tokens <= budget:
+        return value, tokens
+    for max_items, max_chars in SHRINK_LEVELS:
+        shrunk = _shrink(value, max_items, max_chars, keep)
+        tokens = count_tokens(compact_json(shrunk))
+        if tokens <= budget:
+            return shrunk, tokens
+    # Still too large (e.g. very many keys): fall back to a truncated string
+    text = compact_json(value)
+    chars = max(0, budget * 3)
+    clipped = text[-chars:] if keep == "tail" else text[:chars]
+    while clipped and count_tokens(clipped) > budget:
+        chars = chars * 3 // 4
+        clipped = text[-chars:] if keep == "tail" else text[:chars]
+    return clipped, count_tokens(clipped)
+
+
+class PromptBuilder:
+    """Builds [system, user] messages within a per-stage token budget.
+
+    The user message is the compact JSON of payload. Keys listed in
+    shrinkable (key -> "head" or "tail": which end of lists to keep) share
+    whatever budget the fixed parts leave, smallest first, and are shrunk
+    deterministically when they do not fit. build() also returns a report
+    with the prompt size and how many tokens were dropped.
+    """
+
+    def __init__(self, stage: str, budget: int = None):
+        self.stage = stage
+        self.budget = budget or stage_budget(stage)
+
+    def build(self, system: str, payload: Dict[str, Any], shrinkable: Optional[Dict[str, str]] = None,
+              context: str = "", context_label: str = "Relevant past context") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        shrinkable = {k: v for k, v in (shrinkable or {}).items() if k in payload}
+        fixed = {k: (None if k in shrinkable else v) for k, v in payload.items()}
+        fixed_tokens = count_tokens(system) + count_tokens(compact_json(fixed)) + 2 * MESSAGE_OVERHEAD
+        if context:
+            fixed_tokens += count_tokens(f"\n\n{context_label}:\n")
+
+        items = [(k, payload[k], keep) for k, keep in shrinkable.items()]
+        if context:
+            items.append(("__context__", context, "head"))
+        sizes = {name: count_tokens(compact_json(value)) for name, value, _ in items}
+
+        # Water-filling: small items keep everything, large ones split what is left
+        available = max(0, self.budget - fixed_tokens)
+        allotment = {}
+        remaining = sorted(items, key=lambda item: sizes[item[0]])
+        while remaining:
+            share = available // len(remaining)
+            name, value, keep = remaining.pop(0)
+            allotment[name] = min(sizes[name], share)
+            available -= allotment[name]
+
+        fitted = dict(payload)
+        final_context = context
+        truncated = []
+        dropped = 0
+        for name, value, keep in items:
+            if sizes[name] <= allotment[name]:
+                continue
+            truncated.append("context" if name == "__context__" else name)
+            shrunk, kept = fit_value(value, allotment[name], keep)
+            dropped += sizes[name] - kept
+            if name == "__context__":
+                # Plain text: keep the beginning (memories are ordered by relevance)
+                final_context = shrunk if isinstance(shrunk, str) else compact_json(shrunk)
+            else:
+                fitted[name] = shrunk
+
+        system_text = f"{system}\n\n{context_label}:\n{final_context}" if final_context else system
+        messages = [
+            {"role": "system", "content": system_text},
+            {"role": "user", "content": compact_json(fitted)}
+        ]
+        tokens = sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+        report = {
+            "stage": self.stage,
+            "budget": self.budget,
+            "tokens": tokens,
+            "dropped_tokens": dropped,
+            "truncated": truncated
+        }
+        return messages, report
@@ -0,0 +1,246 @@
+from typing import List, Dict, Optional, Any, Callable, Awaitable
+from collections import deque
+import asyncio
+import json
+import os
+import threading
+import time
+from .call_metrics import current_stage
+
+LANES = ("foreground", "background")
+# Rough allowance for the completion when reserving tokens-per-minute budget
+COMPLETION_ALLOWANCE = 256
+
+
+def current_lane() -> str:
+    """Calls made from background executor jobs ("background:<kind>" stages) use the background lane"""
+    return "background" if (current_stage.get() or "").startswith("background:") else "foreground"
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], functions: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Cheap upper-bound estimate (~4 characters per token) used to reserve TPM budget"""
+    chars = sum(len(str(m.get("content") or "")) + 8 for m in messages)
+    if functions:
+        chars += len(json.dumps(functions, separators=(",", ":")))
+    return chars // 4 + COMPLETION_ALLOWANCE
+
+
+class _Ticket:
+    def __init__(self, lane: str, tokens: int, loop: asyncio.AbstractEventLoop = None):
+        self.lane = lane
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.event = asyncio.Event() if loop else threading.Event()
+
+    def wake(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.event.set)
+        else:
+            self.event.set()
+
+
+class _Bucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (0 when it already is)"""
+        needed = min(amount, self.capacity) - self.level
+        return 0.0 if needed <= 0 else needed / self.rate
+
+
+class LLMRateLimiter:
+    """Process-wide admission control for LLM requests.
+
+    Requests wait in a foreground or background lane. A request is only
+    admitted when a concurrency slot, a requests-per-second token and
+    enough tokens-per-minute budget are available; queued foreground
+    requests are always admitted before any background request, and the
+    background lane can never hold more than background_concurrency slots.
+    Token reservations are estimates and are corrected with the real usage
+    on release.
+    """
+
+    def __init__(self, max_concurrency: int = 8, background_concurrency: int = 2, requests_per_second: float = 10.0,
+                 tokens_per_minute: float = 200000, wait_samples: int = 1024):
+        self.max_concurrency = max_concurrency
+        self.background_concurrency = min(background_concurrency, max_concurrency)
+        self._rps = _Bucket(requests_per_second, max(1.0, requests_per_second)) if requests_per_second else None
+        self._tpm = _Bucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self._queues = {lane: deque() for lane in LANES}
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._waits = {lane: deque(maxlen=wait_samples) for lane in LANES}
+        self._counters = {lane: {"admitted": 0, "queued": 0, "wait_total": 0.0} for lane in LANES}
+
+    @classmethod
+    def from_env(cls) -> "LLMRateLimiter":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            background_concurrency=int(os.getenv("LLM_BACKGROUND_CONCURRENCY", "2")),
+            requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", "10")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+        )
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit queued tickets in priority order; returns seconds until a rate bucket refills (None if blocked on slots or idle)"""
+        now = time.monotonic()
+        for bucket in (self._rps, self._tpm):
+            if bucket:
+                bucket.refill(now)
+        for lane in LANES:
+            queue = self._queues[lane]
+            while queue:
+                ticket = queue[0]
+                if sum(self._in_flight.values()) >= self.max_concurrency:
+                    return None
+                if lane == "background" and self._in_flight[lane] >= self.background_concurrency:
+                    return None
+                wait = max(self._rps.wait_for(1) if self._rps else 0.0, self._tpm.wait_for(ticket.tokens) if self._tpm else 0.0)
+                if wait > 0:
+                    # Strict priority: nothing behind this ticket may overtake it
+                    return wait
+                queue.popleft()
+                if self._rps:
+                    self._rps.level -= 1
+                if self._tpm:
+                    self._tpm.level -= ticket.tokens
+                self._in_flight[lane] += 1
+                ticket.granted = True
+                waited = now - ticket.enqueued_at
+                self._waits[lane].append(waited)
+                self._counters[lane]["admitted"] += 1
+                self._counters[lane]["wait_total"] += waited
+                ticket.wake()
+        return None
+
+    def _enqueue(self, ticket: _Ticket):
+        with self._lock:
+            self._queues[ticket.lane].append(ticket)
+            self._dispatch()
+            if not ticket.granted:
+                self._counters[ticket.lane]["queued"] += 1
+
+    def _poll(self, ticket: _Ticket) -> float:
+        with self._lock:
+            wait = self._dispatch()
+        # Blocked on a slot: a release will wake us; the timeout is only a safety net
+        return 1.0 if wait is None else max(wait, 0.001)
+
+    def _abandon(self, ticket: _Ticket):
+        with self._lock:
+            if ticket.granted:
+                self._release_locked(ticket, None)
+            elif ticket in self._queues[ticket.lane]:
+                self._queues[ticket.lane].remove(ticket)
+            self._dispatch()
+
+    def acquire(self, lane: str = "foreground", tokens: int = 0) -> _Ticket:
+        """Block until admitted; returns the ticket to pass to release()"""
+        ticket = _Ticket(lane, tokens)
+        self._enqueue(ticket)
+        try:
+            while not ticket.granted:
+                ticket.event.wait(self._poll(ticket))
+                ticket.event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        return ticket
+
+    async def acquire_async(self, lane: str = "foreground", tokens: int = 0) -> _Ticket:
+        ticket = _Ticket(lane, tokens, loop=asyncio.get_running_loop())
+        self._enqueue(ticket)
+        try:
+            while not ticket.granted:
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), self._poll(ticket))
+                except asyncio.TimeoutError:
+                    pass
+                ticket.event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        return ticket
+
+    def _release_locked(self, ticket: _Ticket, actual_tokens: Optional[int]):
+        self._in_flight[ticket.lane] -= 1
+        if self._tpm and actual_tokens is not None:
+            # Settle the reservation against what the call really used (may go into debt)
+            self._tpm.level += ticket.tokens - actual_tokens
+
+    def release(self, ticket: _Ticket, actual_tokens: Optional[int] = None):
+        with self._lock:
+            self._release_locked(ticket, actual_tokens)
+            self._dispatch()
+
+    def call(self, fn: Callable[[], Any], lane: str = "foreground", tokens: int = 0, waits: List[float] = None) -> Any:
+        """Run fn() once admitted; the response's usage settles the token reservation"""
+        ticket = self.acquire(lane, tokens)
+        if waits is not None:
+            waits.append(time.monotonic() - ticket.enqueued_at)
+        response = None
+        try:
+            response = fn()
+            return response
+        finally:
+            self.release(ticket, _total_tokens(response))
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]], lane: str = "foreground", tokens: int = 0, waits: List[float] = None) -> Any:
+        ticket = await self.acquire_async(lane, tokens)
+        if waits is not None:
+            waits.append(time.monotonic() - ticket.enqueued_at)
+        response = None
+        try:
+            response = await fn()
+            return response
+        finally:
+            self.release(ticket, _total_tokens(response))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lanes = {}
+            for lane in LANES:
+                waits = sorted(self._waits[lane])
+                counters = self._counters[lane]
+                lanes[lane] = {
+                    "in_flight": self._in_flight[lane],
+                    "queue_depth": len(self._queues[lane]),
+                    "admitted": counters["admitted"],
+                    "queued": counters["queued"],
+                    "avg_wait": counters["wait_total"] / counters["admitted"] if counters["admitted"] else 0.0,
+                    "p95_wait": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+                }
+            return {
+                "lanes": lanes,
+                "max_concurrency": self.max_concurrency,
+                "tokens_available": round(self._tpm.level) if self._tpm else None
+            }
+
+
+def _total_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Process-wide limiter shared by every sync and async client"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = LLMRateLimiter.from_env()
+        return _default_limiter
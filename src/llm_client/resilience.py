@@ -0,0 +1,263 @@
+from typing import Dict, Optional, Any, Callable, Awaitable
+import asyncio
+import concurrent.futures
+import os
+import random
+import sys
+import threading
+import time
+
+# Short classification calls are cheap to duplicate and sit on the critical path
+HEDGED_FUNCTIONS = {"analyze_intent", "analyze_sentiment"}
+RETRYABLE_STATUS = {408, 409, 429}
+
+# Runs the first attempt of hedged calls; a separate pool, so a backlog of hedges never delays a primary
+_primary_pool = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-primary")
+# Runs hedge duplicates only; when all workers are busy, extra hedges wait here rather than add load
+_hedge_pool = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the backend while the circuit breaker is open"""
+
+
+def _openai():
+    # An SDK error can only exist once the client imported openai; never import it here
+    return sys.modules.get("openai")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient transport/provider errors (timeouts, connection resets, 408/409/429/5xx)"""
+    openai = _openai()
+    if openai is not None:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive backend failures, then lets one probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures, "opened": self.opened, "short_circuited": self.short_circuited}
+
+
+class ResiliencePolicy:
+    """Timeouts, jittered exponential retries, hedging and a circuit breaker for LLM calls.
+
+    One policy (and so one breaker) is normally shared by the sync and
+    async clients, since both talk to the same backend. Hedging fires a
+    duplicate of a classification call once it has been outstanding for
+    hedge_delay seconds and keeps whichever answer arrives first.
+    """
+
+    def __init__(self, timeout: float = 60.0, classify_timeout: float = 15.0, max_retries: int = 2, base_delay: float = 0.25,
+                 max_delay: float = 4.0, hedge_delay: Optional[float] = 1.5, hedged_functions: Optional[set] = None,
+                 breaker: CircuitBreaker = None):
+        self.timeout = timeout
+        self.classify_timeout = classify_timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_delay = hedge_delay
+        self.hedged_functions = set(HEDGED_FUNCTIONS if hedged_functions is None else hedged_functions)
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._counters = {"retries": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        hedge_delay = os.getenv("LLM_HEDGE_DELAY", "1.5")
+        return cls(
+            timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+            classify_timeout=float(os.getenv("LLM_CLASSIFY_TIMEOUT", "15")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            hedge_delay=float(hedge_delay) if hedge_delay.lower() not in ("", "off", "none") else None,
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30"))
+            )
+        )
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def timeout_for(self, function: Optional[str]) -> float:
+        return self.classify_timeout if function in self.hedged_functions else self.timeout
+
+    def should_hedge(self, function: Optional[str]) -> bool:
+        return self.hedge_delay is not None and function in self.hedged_functions
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads retries from concurrent callers across the window
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _before_attempt(self, function: Optional[str]):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"LLM backend circuit is open; not calling {function or 'completion'}")
+
+    def _after_failure(self, error: Exception, attempt: int) -> bool:
+        """Record the failure; True when the call should be retried"""
+        if not is_retryable(error):
+            # The backend answered (4xx); that says nothing about its health
+            self.breaker.record_success()
+            return False
+        openai = _openai()
+        if isinstance(error, TimeoutError) or (openai is not None and isinstance(error, openai.APITimeoutError)):
+            self._count("timeouts")
+        self.breaker.record_failure()
+        if attempt >= self.max_retries or self.breaker.state == "open":
+            return False
+        self._count("retries")
+        return True
+
+    def call(self, fn: Callable[[float], Any], function: Optional[str] = None) -> Any:
+        """Run fn(timeout) with retries, hedging and the breaker"""
+        attempt = 0
+        while True:
+            self._before_attempt(function)
+            try:
+                if self.should_hedge(function):
+                    result = self._hedged(fn, self.timeout_for(function))
+                else:
+                    result = fn(self.timeout_for(function))
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._after_failure(e, attempt):
+                    raise
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def _hedged(self, fn: Callable[[float], Any], timeout: float) -> Any:
+        # The hedge delay counts from when the primary starts running, so time spent waiting
+        # for a free worker never makes it look slow enough to hedge
+        started = threading.Event()
+
+        def run_primary():
+            started.set()
+            return fn(timeout)
+
+        primary = _primary_pool.submit(run_primary)
+        started.wait()
+        try:
+            return primary.result(timeout=self.hedge_delay)
+        except concurrent.futures.TimeoutError:
+            pass
+        self._count("hedges")
+        hedge = _hedge_pool.submit(fn, timeout)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    # The slower duplicate finishes in the background; its result is discarded
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def call_async(self, fn: Callable[[float], Awaitable[Any]], function: Optional[str] = None) -> Any:
+        """Async counterpart of call(); fn(timeout) returns an awaitable"""
+        attempt = 0
+        while True:
+            self._before_attempt(function)
+            try:
+                if self.should_hedge(function):
+                    result = await self._hedged_async(fn, self.timeout_for(function))
+                else:
+                    result = await fn(self.timeout_for(function))
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._after_failure(e, attempt):
+                    raise
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def _hedged_async(self, fn: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        primary = asyncio.ensure_future(fn(timeout))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done:
+            return primary.result()
+        self._count("hedges")
+        hedge = asyncio.ensure_future(fn(timeout))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "breaker": self.breaker.stats()}
+
+
+_default_policy = None
+_default_lock = threading.Lock()
+
+
+def get_resilience_policy() -> ResiliencePolicy:
+    """Process-wide policy (configured from LLM_* env vars) shared by the sync and async clients"""
+    global _default_policy
+    with _default_lock:
+        if _default_policy is None:
+            _default_policy = ResiliencePolicy.from_env()
+        return _default_policy
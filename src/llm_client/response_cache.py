@@ -0,0 +1,123 @@
+from typing import List, Dict, Optional, Any
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Classification and summarisation calls are deterministic enough to reuse.
+# Plain text completions (final synthesis) are never cached unless a caller
+# explicitly passes cache=True.
+DEFAULT_CACHEABLE_FUNCTIONS = {"analyze_intent", "analyze_sentiment", "summarize_conversation", "rate_importance"}
+
+
+class ResponseCache:
+    """Content-addressed cache for chat completions.
+
+    Two tiers: an in-memory LRU in front of a SQLite table. Entries expire
+    after ttl seconds and each tier is trimmed to its size limit on write.
+    """
+
+    def __init__(self, path: str = "./memory/llm_cache.sqlite3", ttl: float = 86400, max_memory_entries: int = 1024,
+                 max_disk_entries: int = 20000, cacheable_functions: Optional[set] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.cacheable_functions = set(DEFAULT_CACHEABLE_FUNCTIONS if cacheable_functions is None else cacheable_functions)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created_at REAL, accessed_at REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, str]], model: str, functions: Optional[List[Dict[str, Any]]]) -> str:
+        normalized = [{"role": m.get("role", "").strip().lower(), "content": " ".join(str(m.get("content") or "").split())} for m in messages]
+        raw = json.dumps({"model": model, "messages": normalized, "functions": functions or []}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def should_cache(self, functions: Optional[List[Dict[str, Any]]], cache: Optional[bool] = None) -> bool:
+        if cache is not None:
+            return cache
+        return bool(functions) and functions[0]["name"] in self.cacheable_functions
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+                expired = True
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row:
+                    if now - row[1] <= self.ttl:
+                        value = json.loads(row[0])
+                        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[1], value)
+                        self._counters["disk_hits"] += 1
+                        return copy.deepcopy(value)
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    expired = True
+
+            if expired:
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, copy.deepcopy(value))
+            self._counters["writes"] += 1
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                                 (key, json.dumps(value), now, now))
+                overflow = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    self._db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (overflow,))
+                    self._counters["evictions"] += overflow
+                self._db.commit()
+
+    def _remember(self, key: str, created_at: float, value: Any):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
@@ -0,0 +1,96 @@
+from typing import Dict, Any, Callable, Awaitable
+import asyncio
+import copy
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse identical in-flight calls into one.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving with the same key while it is in flight wait for its outcome
+    and receive a copy of the result (or the same exception). Thread-based
+    callers and coroutines on an event loop are tracked separately but
+    share the counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._tasks = {}
+        self._counters = {"leaders": 0, "deduplicated": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._counters["leaders"] += 1
+            else:
+                flight.waiters += 1
+                self._counters["deduplicated"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fn()
+            return copy.deepcopy(flight.result) if flight.waiters else flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Futures are bound to their loop, so flights are keyed per loop
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._tasks.get(loop_key)
+            if future is None:
+                future = self._tasks[loop_key] = asyncio.ensure_future(fn())
+                future.add_done_callback(lambda done: self._forget(loop_key, done))
+                self._counters["leaders"] += 1
+            else:
+                self._counters["deduplicated"] += 1
+        # shield: a cancelled caller must not cancel the call others are waiting on
+        result = await asyncio.shield(future)
+        return copy.deepcopy(result)
+
+    def _forget(self, loop_key, future):
+        with self._lock:
+            self._tasks.pop(loop_key, None)
+        if not future.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._counters["leaders"] + self._counters["deduplicated"]
+            return {
+                **self._counters,
+                "in_flight": len(self._flights) + len(self._tasks),
+                "dedup_rate": self._counters["deduplicated"] / total if total else 0.0
+            }
+
+
+_default_singleflight = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Process-wide instance shared by OllamaClient and AsyncOllamaClient"""
+    return _default_singleflight
@@ -2,23 +2,12 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.llm_client.ollama_client import OllamaClient
-from src.sentiment.sentiment import SentimentAnalyzer
-from src.store.document_store import DocumentStore
-from src.store.memory_store import MemoryStore
-from src.store.learning_store import LearningStore
-from src.store.episodic_memory_store import EpisodicMemoryStore
-from src.agent.agent import ReasoningAgent
+from src.bootstrap import AgentWarmup
 
 if __name__ == "__main__":
     print("Starting Ollama reasoning agent (modular OOP)")
-    ollama = OllamaClient(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
-    sentiment = SentimentAnalyzer(ollama_client=ollama)
-    docs = DocumentStore(docs_dir="./docs")
-    memory = MemoryStore(memory_dir="./memory")
-    learning = LearningStore(learning_dir="./learnings")
-    episodic = EpisodicMemoryStore(ollama, persist_directory="./memory")
-    agent = ReasoningAgent(ollama, docs, sentiment, memory, learning, episodic)
+    # Stores open and documents index while the first message is typed
+    warmup = AgentWarmup().start()
 
     while True:
         user = input("You: ")
@@ -26,6 +15,10 @@ if __name__ == "__main__":
             continue
         if user.strip().lower() in ("exit", "quit"):
             break
+        agent = warmup.wait()
+        if agent is None:
+            print(f"Agent failed to start: {warmup.error}")
+            break
         out = agent.handle(user)
         print("\n--- Final Reply ---\n")
         print(out["final"])
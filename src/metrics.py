@@ -0,0 +1,213 @@
+from typing import List, Dict, Any, Callable, Iterable, Tuple
+import bisect
+import threading
+
+# Seconds; spans a cache hit up to a slow multi-call turn
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and three additions under a lock"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(float(bound))})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds counters/histograms and scrape-time gauge callbacks; render() emits Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._gauges = []
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Any], kind: str = "gauge"):
+        """collect() returns a number or a list of (labels dict, value); it only runs on scrape.
+        kind="counter" exposes a monotonic value kept elsewhere (e.g. a component's stats())."""
+        self._gauges.append((name, help_text, collect, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help_text, collect, kind in self._gauges:
+            try:
+                samples = collect()
+            except Exception as e:
+                print(f"[metrics] Gauge {name} failed: {e}")
+                continue
+            if not isinstance(samples, list):
+                samples = [({}, samples)]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class AgentMetrics:
+    """Prometheus metrics for the web server: /chat traffic, pipeline stages, LLM calls and store sizes.
+
+    Request and stage observations are cheap in-memory updates; queue
+    depth, thread count and Chroma collection sizes are only read when
+    /metrics is scraped.
+    """
+
+    def __init__(self, agent=None, call_metrics=None, limiter=None, singleflight=None):
+        # None while the agent is still warming up; see attach()
+        self.agent = agent
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter("agent_chat_requests_total", "Chat requests by endpoint and status", ("endpoint", "status"))
+        self.request_latency = self.registry.histogram("agent_chat_request_seconds", "Chat request latency", ("endpoint",))
+        self.stage_latency = self.registry.histogram("agent_stage_seconds", "Agent pipeline stage latency", ("stage",))
+        self.llm_calls = self.registry.counter("agent_llm_calls_total", "LLM calls by model and function", ("model", "function", "cached"))
+        self.llm_errors = self.registry.counter("agent_llm_errors_total", "Failed LLM calls by model", ("model",))
+        self.llm_tokens = self.registry.counter("agent_llm_tokens_total", "LLM tokens by model and direction", ("model", "type"))
+        self.llm_latency = self.registry.histogram("agent_llm_call_seconds", "LLM call latency (uncached calls)", ("model",))
+        self.llm_queue_wait = self.registry.histogram("agent_llm_queue_wait_seconds", "Time LLM calls waited for the rate limiter", ("model",))
+        if limiter is not None:
+            self.registry.gauge("agent_llm_limiter_queue_depth", "LLM calls waiting for admission by lane", lambda: [({"lane": lane}, s["queue_depth"]) for lane, s in limiter.stats()["lanes"].items()])
+            self.registry.gauge("agent_llm_limiter_in_flight", "Admitted LLM calls in flight by lane", lambda: [({"lane": lane}, s["in_flight"]) for lane, s in limiter.stats()["lanes"].items()])
+        if singleflight is not None:
+            self.registry.gauge("agent_llm_deduplicated_total", "LLM calls answered by an identical in-flight request", lambda: singleflight.stats()["deduplicated"], kind="counter")
+        self.registry.gauge("agent_background_queue_depth", "Background jobs by state", self._queue_depth)
+        self.registry.gauge("agent_background_workers", "Live background worker threads", self._background_workers)
+        self.registry.gauge("agent_ready", "1 once the agent has warmed up", lambda: int(self.agent is not None))
+        self.registry.gauge("agent_threads", "Live Python threads in the process", threading.active_count)
+        self.registry.gauge("agent_chroma_collection_size", "Entries per Chroma collection", self._collection_sizes)
+        self._call_metrics = call_metrics
+        if call_metrics is not None:
+            # Held weakly by call_metrics; close() detaches explicitly
+            call_metrics.add_listener(self._on_llm_call)
+
+    def close(self):
+        """Stop counting LLM calls (the call metrics are process-wide and outlive any one app)"""
+        if self._call_metrics is not None:
+            self._call_metrics.remove_listener(self._on_llm_call)
+            self._call_metrics = None
+
+    def _on_llm_call(self, record: Dict[str, Any]):
+        self.llm_calls.inc(model=record["model"], function=record["function"], cached=str(record["cached"]).lower())
+        if record["error"]:
+            self.llm_errors.inc(model=record["model"])
+        if record["prompt_tokens"]:
+            self.llm_tokens.inc(record["prompt_tokens"], model=record["model"], type="prompt")
+        if record["completion_tokens"]:
+            self.llm_tokens.inc(record["completion_tokens"], model=record["model"], type="completion")
+        if not record["cached"]:
+            self.llm_latency.observe(record["latency"], model=record["model"])
+            self.llm_queue_wait.observe(record.get("queue_wait", 0.0), model=record["model"])
+
+    def attach(self, agent):
+        self.agent = agent
+
+    def _background_workers(self) -> List[Tuple[Dict[str, str], int]]:
+        if self.agent is None:
+            return []
+        return [({}, self.agent.background.stats()["workers"])]
+
+    def _queue_depth(self) -> List[Tuple[Dict[str, str], int]]:
+        if self.agent is None:
+            return []
+        stats = self.agent.background.stats()
+        return [({"state": "pending"}, stats["pending"]), ({"state": "running"}, stats["running"])]
+
+    def _collection_sizes(self) -> List[Tuple[Dict[str, str], int]]:
+        samples = []
+        if self.agent is None:
+            return samples
+        for store in (self.agent.memory, self.agent.episodic, self.agent.docs):
+            collection = getattr(store, "collection", None)
+            if collection is not None:
+                samples.append(({"collection": collection.name}, collection.count()))
+        return samples
+
+    def observe_request(self, endpoint: str, seconds: float, status: int):
+        self.requests.inc(endpoint=endpoint, status=status)
+        self.request_latency.observe(seconds, endpoint=endpoint)
+
+    def observe_turn(self, result: Dict[str, Any]):
+        for stage, seconds in (result.get("timings") or {}).items():
+            self.stage_latency.observe(seconds, stage=stage)
+
+    def render(self) -> str:
+        return self.registry.render()
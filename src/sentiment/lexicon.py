@@ -0,0 +1,79 @@
+from typing import Dict, Any
+import math
+import re
+
+# Small bundled valence lexicon (-3..3), VADER-style. Kept in code so the
+# pre-filter needs no downloads.
+LEXICON = {
+    # positive
+    "thanks": 2.0, "thank": 2.0, "thx": 1.5, "ty": 1.5, "appreciate": 2.2, "appreciated": 2.2,
+    "great": 3.0, "good": 1.9, "nice": 1.8, "cool": 1.3, "awesome": 3.1, "amazing": 2.8,
+    "excellent": 2.7, "perfect": 2.7, "fantastic": 2.6, "wonderful": 2.7, "love": 3.2, "loved": 2.9,
+    "like": 1.5, "liked": 1.5, "happy": 2.7, "glad": 2.0, "pleased": 1.9, "helpful": 1.8,
+    "useful": 1.9, "works": 1.0, "worked": 1.0, "fixed": 1.2, "solved": 1.6, "brilliant": 2.8,
+    "best": 3.2, "better": 1.9, "enjoy": 2.2, "enjoyed": 2.3, "fine": 0.8, "ok": 0.9, "okay": 0.9,
+    "yes": 1.2, "yay": 2.4, "sweet": 2.0, "welcome": 2.0, "correct": 1.3, "right": 0.5,
+    "impressive": 2.3, "easy": 1.9, "fast": 1.0, "clear": 1.2, "please": 1.3, "hello": 0.8, "hi": 0.6,
+    # negative
+    "bad": -2.5, "terrible": -2.9, "horrible": -2.8, "awful": -2.9, "worst": -3.1, "worse": -2.1,
+    "hate": -2.7, "hated": -3.2, "angry": -2.3, "annoyed": -1.9, "annoying": -2.1, "furious": -3.0,
+    "frustrated": -2.1, "frustrating": -2.4, "upset": -1.6, "sad": -2.1, "disappointed": -2.3,
+    "disappointing": -2.2, "useless": -2.6, "broken": -2.1, "broke": -1.8, "fail": -2.5,
+    "failed": -2.3, "failing": -2.4, "failure": -2.6, "error": -1.4, "errors": -1.4, "bug": -1.5,
+    "buggy": -2.0, "wrong": -2.1, "stupid": -2.4, "slow": -1.2, "crash": -2.0, "crashed": -2.1,
+    "problem": -1.7, "problems": -1.7, "issue": -0.8, "issues": -0.8, "ridiculous": -2.1,
+    "unacceptable": -2.5, "ugh": -1.8, "damn": -1.6, "wtf": -2.8, "sucks": -1.5, "suck": -1.5,
+    "scam": -2.9, "ripoff": -2.5, "refund": -1.0, "complaint": -1.9, "confusing": -1.3,
+    "confused": -1.3, "never": -0.5, "no": -1.2, "cancel": -1.2, "worried": -1.6, "afraid": -1.9,
+    "disaster": -3.1, "pathetic": -2.7, "waste": -1.8, "lost": -1.3, "stuck": -1.3
+}
+
+NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+             "cannot", "cant", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "aint",
+             "wont", "wouldnt", "shouldnt", "couldnt", "hardly", "barely"}
+BOOSTERS = {"very": 0.29, "really": 0.29, "so": 0.29, "extremely": 0.29, "totally": 0.29,
+            "absolutely": 0.29, "completely": 0.29, "incredibly": 0.29, "super": 0.29,
+            "slightly": -0.29, "somewhat": -0.29, "kinda": -0.29, "barely": -0.29}
+# Greetings and acknowledgements without lexicon valence; the only
+# sentiment-free messages the pre-filter may call NEUTRAL on its own
+ACKNOWLEDGEMENTS = {"hey", "yo", "morning", "evening", "sure", "alright", "noted", "understood", "got", "it",
+                    "k", "kk", "yep", "yup", "bye", "goodbye", "cheers", "cya", "see", "you", "later"}
+NEGATION_SCALAR = -0.74
+NEGATION_WINDOW = 3
+
+_TOKEN = re.compile(r"[a-z']+")
+
+
+def score_text(text: str) -> Dict[str, Any]:
+    """Return {"compound": -1..1, "hits": n, "negative_hits": n, "negations": n, "words": n, "acknowledgement": bool} for text"""
+    tokens = [t.replace("'", "") for t in _TOKEN.findall(text.lower())]
+    total = 0.0
+    hits = 0
+    negative_hits = 0
+    negations = 0
+    for i, token in enumerate(tokens):
+        if token in NEGATIONS:
+            negations += 1
+            # "no"/"never" only carry their own valence when they stand alone
+            if i + 1 < len(tokens):
+                continue
+        valence = LEXICON.get(token)
+        if valence is None:
+            continue
+        hits += 1
+        for j in range(max(0, i - NEGATION_WINDOW), i):
+            prev = tokens[j]
+            if prev in BOOSTERS:
+                boost = BOOSTERS[prev]
+                valence += boost if valence > 0 else -boost
+            if prev in NEGATIONS:
+                valence *= NEGATION_SCALAR
+        if valence < 0:
+            negative_hits += 1
+        total += valence
+    exclamations = min(text.count("!"), 4)
+    if total:
+        total += math.copysign(0.292 * exclamations, total)
+    compound = total / math.sqrt(total * total + 15) if total else 0.0
+    return {"compound": compound, "hits": hits, "negative_hits": negative_hits, "negations": negations, "words": len(tokens),
+            "acknowledgement": bool(tokens) and all(t in ACKNOWLEDGEMENTS for t in tokens)}
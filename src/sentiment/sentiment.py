@@ -1,6 +1,10 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+import asyncio
+import threading
+from pydantic import BaseModel
 from ..functions.sentiment_functions import get_sentiment_function
+from ..llm_client.model_router import get_model_router, route_scope
+from .lexicon import score_text
 
 class SentimentOutput(BaseModel):
     label: str
@@ -12,20 +16,113 @@ class SentimentOutput(BaseModel):
 
 
 class SentimentAnalyzer:
-    def __init__(self, ollama_client):
+    """LLM-based sentiment analysis behind an optional local lexicon pre-filter.
+
+    The pre-filter answers clearly positive messages and bare greetings or
+    acknowledgements locally. Anything with a negative word, a negation,
+    no sentiment-bearing words at all, a compound below negative_threshold,
+    or more than max_local_words words still goes to the LLM, so the
+    pre-filter never returns NEGATIVE and never hides an angry message
+    that the lexicon does not know.
+
+    analyze_lexicon() is different: it is the agent's fallback when the LLM
+    fails or its circuit breaker is open, and its NEGATIVE verdicts can
+    score 0.8 or more and so trigger escalation on their own.
+    """
+
+    def __init__(self, ollama_client, async_client=None, prefilter: bool = True, positive_threshold: float = 0.2,
+                 negative_threshold: float = 0.0, max_local_words: int = 25, neutral_score: float = 0.7, router=None):
         if not ollama_client:
             raise ValueError("SentimentAnalyzer requires an ollama_client instance.")
         self.ollama = ollama_client
-        print("[sentiment] using LLM-based sentiment analysis")
+        self.async_ollama = async_client
+        self.router = router or get_model_router()
+        self.prefilter = prefilter
+        self.positive_threshold = positive_threshold
+        self.negative_threshold = negative_threshold
+        self.max_local_words = max_local_words
+        self.neutral_score = neutral_score
+        self._lock = threading.Lock()
+        self.local_answers = 0
+        self.llm_calls = 0
+        print(f"[sentiment] using LLM-based sentiment analysis (lexicon pre-filter: {'on' if prefilter else 'off'})")
 
-    def analyze(self, text: str) -> SentimentOutput:
-        print(f"[sentiment] Analyzing: {text[:50]}")
-        messages = [
+    def _local_verdict(self, text: str) -> Optional[SentimentOutput]:
+        if not self.prefilter:
+            return None
+        scored = score_text(text)
+        compound = scored["compound"]
+        if scored["words"] > self.max_local_words or scored["negations"] or scored["negative_hits"] or compound < self.negative_threshold:
+            return None
+        if scored["hits"] == 0:
+            if not scored["acknowledgement"]:
+                # "I will sue you": no lexicon words is not evidence of neutrality
+                return None
+            verdict = SentimentOutput(label="NEUTRAL", score=self.neutral_score, reasoning="Lexicon pre-filter: greeting or acknowledgement")
+        elif compound >= self.positive_threshold:
+            verdict = SentimentOutput(label="POSITIVE", score=round(0.5 + compound / 2, 3), reasoning=f"Lexicon pre-filter: compound {compound:.2f}")
+        else:
+            return None
+        with self._lock:
+            self.local_answers += 1
+        return verdict
+
+    def analyze_lexicon(self, text: str) -> SentimentOutput:
+        """Lexicon-only verdict (any label); used when the LLM is unavailable"""
+        compound = score_text(text)["compound"]
+        if compound >= self.positive_threshold:
+            label = "POSITIVE"
+        elif compound <= -self.positive_threshold:
+            label = "NEGATIVE"
+        else:
+            return SentimentOutput(label="NEUTRAL", score=0.5, reasoning=f"Lexicon fallback: compound {compound:.2f}")
+        return SentimentOutput(label=label, score=round(0.5 + abs(compound) / 2, 3), reasoning=f"Lexicon fallback: compound {compound:.2f}")
+
+    def _count_llm_call(self):
+        with self._lock:
+            self.llm_calls += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.local_answers + self.llm_calls
+            return {
+                "llm_calls_avoided": self.local_answers,
+                "llm_calls": self.llm_calls,
+                "avoided_rate": self.local_answers / total if total else 0.0
+            }
+
+    def _build_messages(self, text: str) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": "You are a sentiment analysis expert."},
             {"role": "user", "content": f"Analyze the sentiment of this text: '{text}'"}
         ]
 
-        result = self.ollama.chat(messages, model="gpt-4o-mini", functions=[get_sentiment_function()])
+    def analyze(self, text: str) -> SentimentOutput:
+        local = self._local_verdict(text)
+        if local:
+            return local
+        print(f"[sentiment] Analyzing: {text[:50]}")
+        self._count_llm_call()
+        route = self.router.select("sentiment")
+        with route_scope(route):
+            result = self.ollama.chat(self._build_messages(text), model=route.model, functions=[get_sentiment_function()])
+        return self._parse_result(result)
+
+    async def analyze_async(self, text: str) -> SentimentOutput:
+        """Async variant of analyze; falls back to a worker thread without an async client"""
+        if not self.async_ollama:
+            return await asyncio.to_thread(self.analyze, text)
+        local = self._local_verdict(text)
+        if local:
+            return local
+        print(f"[sentiment] Analyzing (async): {text[:50]}")
+        self._count_llm_call()
+        route = self.router.select("sentiment")
+        with route_scope(route):
+            result = await self.async_ollama.chat(self._build_messages(text), model=route.model, functions=[get_sentiment_function()])
+        return self._parse_result(result)
+
+    def _parse_result(self, result: Dict[str, Any]) -> SentimentOutput:
         print(f"[sentiment] Result keys: {list(result.keys())}")
 
         if "function_name" in result:
@@ -0,0 +1,219 @@
+"""Production server: preforked worker processes sharing one listening socket.
+
+The parent binds the port, forks --workers children and restarts any that
+die. Each worker builds its own app with create_app() after the fork, so it
+owns its agent, LLM clients, store handles and background queue, and serves
+requests on threads (a request mostly waits on the LLM). Throughput then
+scales with cores instead of one interpreter.
+
+State shared between workers is coordinated rather than copied:
+  - Chroma: embedded clients cannot share a directory across processes, so
+    with more than one worker a local Chroma server is started on ./memory
+    (or CHROMA_HOST is used when set) and every worker connects to it.
+  - learnings.json, conversation_log.json, user_profile.json and
+    short_term.json: atomic writes under a cross-process file lock, reloaded
+    by the other workers when they change.
+  - Background jobs: one durable queue per worker slot, so a restarted
+    worker resumes the jobs of the one it replaces.
+
+On SIGTERM a worker stops accepting connections, lets requests already in
+progress (streams included) finish for up to WEB_SHUTDOWN_GRACE seconds and
+only then drains its background queue and exits, so restarts and rolling
+deploys do not cut off live replies.
+
+    python src/serve.py --workers 4 --port 5000
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import shutil
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+CHROMA_STARTUP_TIMEOUT = 30
+# Seconds a stopping worker waits for in-flight requests before exiting anyway
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("WEB_SHUTDOWN_GRACE", "30"))
+
+
+class InFlightRequests:
+    """WSGI middleware counting requests whose response has not been fully sent.
+
+    Werkzeug's request threads are daemons that server_close() does not
+    join, so a worker waits on this count before it exits.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self._cond = threading.Condition()
+
+    def __call__(self, environ, start_response):
+        from werkzeug.wsgi import ClosingIterator
+        with self._cond:
+            self.count += 1
+        try:
+            # Streamed responses count until the server closes the iterator
+            return ClosingIterator(self.app(environ, start_response), self._finished)
+        except BaseException:
+            self._finished()
+            raise
+
+    def _finished(self):
+        with self._cond:
+            self.count -= 1
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """True once no request is in flight, False if timeout passes first"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.count == 0, timeout)
+
+
+def start_chroma_server(path: str, port: int) -> subprocess.Popen:
+    """Run `chroma run` on path and wait until it answers; the workers reach it through CHROMA_HOST"""
+    import chromadb
+    if not shutil.which("chroma"):
+        raise RuntimeError("Several workers need a shared Chroma server: install the chroma CLI or set CHROMA_HOST")
+    process = subprocess.Popen(["chroma", "run", "--path", path, "--host", "127.0.0.1", "--port", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + CHROMA_STARTUP_TIMEOUT
+    while True:
+        try:
+            chromadb.HttpClient(host="127.0.0.1", port=port).heartbeat()
+            break
+        except Exception:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"Chroma server on port {port} did not start")
+            time.sleep(0.2)
+    os.environ["CHROMA_HOST"] = "127.0.0.1"
+    os.environ["CHROMA_PORT"] = str(port)
+    print(f"[serve] Chroma server for {path} on 127.0.0.1:{port}")
+    return process
+
+
+def run_worker(slot: int, listener: socket.socket, host: str, port: int):
+    """Body of a forked worker; returns once stopped by SIGTERM/SIGINT and drained"""
+    # Per-slot durable queue: a replacement worker picks up where this one stopped
+    queue_path = os.getenv("BACKGROUND_QUEUE_PATH", "./memory/background_jobs.sqlite3")
+    root, ext = os.path.splitext(queue_path)
+    os.environ["BACKGROUND_QUEUE_PATH"] = f"{root}.worker{slot}{ext}"
+
+    server = None
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        if server is None:
+            # Still building the app: nothing is being served yet
+            sys.exit(0)
+        if not stopping.is_set():
+            stopping.set()
+            # shutdown() blocks until serve_forever returns, and this handler runs inside it
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    from werkzeug.serving import make_server
+    from src.web import create_app
+    in_flight = InFlightRequests(create_app())
+    server = make_server(host, port, in_flight, threaded=True, fd=listener.fileno())
+    print(f"[serve] Worker {slot} (pid {os.getpid()}) ready")
+    server.serve_forever()
+    server.server_close()
+    if in_flight.count:
+        print(f"[serve] Worker {slot} finishing {in_flight.count} in-flight requests")
+    if not in_flight.wait_idle(SHUTDOWN_GRACE_SECONDS):
+        print(f"[serve] Worker {slot} exiting with {in_flight.count} requests still running after {SHUTDOWN_GRACE_SECONDS}s")
+
+
+def spawn(slot: int, listener: socket.socket, host: str, port: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(slot, listener, host, port)
+        except SystemExit as e:
+            code = e.code or 0
+        except BaseException as e:
+            print(f"[serve] Worker {slot} crashed: {type(e).__name__}: {e}")
+            code = 1
+        finally:
+            # Run atexit handlers (background queue flush) but never return into the parent's loop
+            import atexit
+            atexit._run_exitfuncs()
+            os._exit(code)
+    return pid
+
+
+def serve(host: str, port: int, workers: int, chroma_server: str, chroma_port: int):
+    chroma = None
+    if workers > 1 and not os.getenv("CHROMA_HOST") and chroma_server != "off":
+        chroma = start_chroma_server(os.path.abspath("./memory"), chroma_port)
+
+    listener = socket.create_server((host, port), backlog=2048)
+    listener.set_inheritable(True)
+    print(f"[serve] Listening on http://{host}:{port} with {workers} workers")
+
+    children = {}
+    stopping = False
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for slot in range(workers):
+        children[spawn(slot, listener, host, port)] = slot
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        print(f"[serve] Worker {slot} (pid {pid}) exited with status {status}, restarting")
+        time.sleep(1)
+        children[spawn(slot, listener, host, port)] = slot
+
+    listener.close()
+    if chroma:
+        chroma.terminate()
+        chroma.wait(timeout=10)
+    print("[serve] Stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agent with preforked worker processes")
+    parser.add_argument("--host", default=os.getenv("WEB_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEB_PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--chroma-server", choices=["auto", "off"], default="auto",
+                        help="start a shared Chroma server when running several workers without CHROMA_HOST")
+    parser.add_argument("--chroma-port", type=int, default=int(os.getenv("CHROMA_PORT", "8000")))
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): a single threaded process
+        from src.web import create_app
+        create_app().run(host=args.host, port=args.port, threaded=True)
+        return
+    serve(args.host, args.port, max(1, args.workers), args.chroma_server, args.chroma_port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+from typing import Dict, Any, Callable, Optional
+import atexit
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from ..llm_client.call_metrics import stage_scope
+
+
+class BackgroundExecutor:
+    """Bounded worker pool over a durable SQLite job queue.
+
+    Jobs are (kind, JSON payload) pairs handled by functions registered per
+    kind, so pending work survives a restart and is picked up again once
+    its handler is registered. A job submitted with a coalesce_key that
+    matches a still-pending job is folded into it (via the kind's merge
+    function, or by replacing the payload) instead of queuing another run.
+
+    Several objects may register the same kind on one executor (two agents
+    in a process share the default one): each passes an owner from
+    claim_owner(), and its jobs only ever run on its own handler.
+
+    Several processes may share one queue file (WSGI workers): a job is
+    claimed atomically by exactly one of them, and a running job is only
+    put back in the queue once the process that claimed it has died.
+    """
+
+    def __init__(self, path: str = "./memory/background_jobs.sqlite3", max_workers: int = 2, max_pending: int = 1000, max_attempts: int = 3):
+        self.path = os.path.abspath(path)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        # (kind, owner) -> (handler, merge)
+        self._handlers = {}
+        self._owner_counts = {}
+        self._cond = threading.Condition()
+        self._workers = []
+        self._running = 0
+        self._stopping = False
+        self._counters = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0, "failed": 0, "retried": 0}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # host:pid of this process, recorded on the jobs it claims
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL,
+            coalesce_key TEXT, status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL, owner TEXT NOT NULL DEFAULT '', worker TEXT)""")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+        if "owner" not in columns:
+            # Queues written before jobs had owners
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        if "worker" not in columns:
+            # ...or recorded which process was running them
+            self._db.execute("ALTER TABLE jobs ADD COLUMN worker TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, id)")
+        self._db.commit()
+        self._requeue_orphans()
+        atexit.register(self.shutdown)
+
+    def _requeue_orphans(self):
+        """Put jobs whose claiming process died back in the queue; jobs a live sibling process is running stay its own"""
+        host = socket.gethostname()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            orphans = []
+            for job_id, worker in self._db.execute("SELECT id, worker FROM jobs WHERE status = 'running'").fetchall():
+                worker_host, _, pid = (worker or "").rpartition(":")
+                if worker == self.worker_id or not worker_host:
+                    # Left by an earlier process that had our pid, or by one that predates worker tags
+                    orphans.append(job_id)
+                elif worker_host == host and pid.isdigit() and not _process_alive(int(pid)):
+                    orphans.append(job_id)
+            self._db.executemany("UPDATE jobs SET status = 'pending', worker = NULL WHERE id = ?", [(job_id,) for job_id in orphans])
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        atexit.register(self.shutdown)
+
+    def claim_owner(self, name: str) -> str:
+        """An owner tag for jobs of one object: name for the first caller in this process, then name#2, name#3...
+
+        Objects built in the same order after a restart get the same tags
+        back and so pick up the jobs their predecessors left pending.
+        """
+        with self._cond:
+            self._owner_counts[name] = self._owner_counts.get(name, 0) + 1
+            count = self._owner_counts[name]
+        return name if count == 1 else f"{name}#{count}"
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any], merge: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None,
+                 owner: str = ""):
+        """Register the handler for owner's jobs of a kind; merge(old, new) combines coalesced payloads"""
+        with self._cond:
+            current = self._handlers.get((kind, owner))
+            if current is not None and current[0] != handler:
+                # Would silently run another object's jobs; use claim_owner() for a tag of your own
+                raise ValueError(f"Background job kind '{kind}' already has a handler for owner '{owner}'")
+            self._handlers[(kind, owner)] = (handler, merge)
+            if owner and "#" not in owner:
+                # Jobs queued before jobs had owners go to the first owner of their kind
+                self._db.execute("UPDATE jobs SET owner = ? WHERE kind = ? AND owner = ''", (owner, kind))
+                self._db.commit()
+            self._ensure_workers()
+            self._cond.notify_all()
+
+    def submit(self, kind: str, payload: Dict[str, Any] = None, coalesce_key: str = None, owner: str = "") -> bool:
+        """Queue a job for owner's handler. Returns False when the queue is full (backpressure)."""
+        payload = payload or {}
+        with self._cond:
+            if self._stopping:
+                return False
+            # One write transaction, so another process cannot claim the job we are folding into
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = None
+                if coalesce_key:
+                    row = self._db.execute("SELECT id, payload FROM jobs WHERE coalesce_key = ? AND owner = ? AND status = 'pending' ORDER BY id LIMIT 1",
+                                           (coalesce_key, owner)).fetchone()
+                full = row is None and self._pending_count() >= self.max_pending
+                if row:
+                    merge = self._handlers.get((kind, owner), (None, None))[1]
+                    merged = merge(json.loads(row[1]), payload) if merge else payload
+                    self._db.execute("UPDATE jobs SET payload = ? WHERE id = ?", (json.dumps(merged), row[0]))
+                elif not full:
+                    self._db.execute("INSERT INTO jobs (kind, payload, coalesce_key, created_at, owner) VALUES (?, ?, ?, ?, ?)",
+                                     (kind, json.dumps(payload), coalesce_key, time.time(), owner))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+            if row:
+                self._counters["coalesced"] += 1
+                return True
+            if full:
+                self._counters["rejected"] += 1
+                print(f"[background] Queue full, rejected {kind}")
+                return False
+            self._counters["submitted"] += 1
+            self._ensure_workers()
+            self._cond.notify()
+            return True
+
+    def _pending_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+
+    def _ensure_workers(self):
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_workers and not self._stopping:
+            worker = threading.Thread(target=self._work, name=f"background-worker-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _registered(self):
+        """SQL condition and parameters matching jobs that have a registered handler"""
+        if not self._handlers:
+            return "0", []
+        return " OR ".join(["(kind = ? AND owner = ?)"] * len(self._handlers)), [v for key in self._handlers for v in key]
+
+    def _claim(self):
+        if not self._handlers:
+            return None
+        condition, params = self._registered()
+        # Select and mark in one statement under the write lock: sibling processes never claim the same job
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(f"""UPDATE jobs SET status = 'running', worker = ? WHERE id = (
+                SELECT id FROM jobs WHERE status = 'pending' AND ({condition}) ORDER BY id LIMIT 1)
+                RETURNING id, kind, owner, payload, attempts""", [self.worker_id, *params]).fetchone()
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        if row:
+            self._running += 1
+        return row
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._claim()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait(timeout=1.0)
+                    job = self._claim()
+                handler = self._handlers[(job[1], job[2])][0]
+
+            job_id, kind, _, payload, attempts = job
+            try:
+                with stage_scope(f"background:{kind}"):
+                    handler(json.loads(payload))
+                error = None
+            except Exception as e:
+                error = e
+                print(f"[background] {kind} failed: {e}")
+
+            with self._cond:
+                self._running -= 1
+                if error is None:
+                    self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                    self._counters["completed"] += 1
+                elif attempts + 1 < self.max_attempts:
+                    self._db.execute("UPDATE jobs SET status = 'pending', attempts = ?, worker = NULL WHERE id = ?", (attempts + 1, job_id))
+                    self._counters["retried"] += 1
+                else:
+                    self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                    self._counters["failed"] += 1
+                self._db.commit()
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every job with a registered handler has run; returns False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                condition, params = self._registered()
+                left = self._db.execute(f"SELECT COUNT(*) FROM jobs WHERE {condition}", params).fetchone()[0]
+                if left == 0:
+                    return True
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=min(remaining, 0.5) if remaining is not None else 0.5)
+
+    def shutdown(self, flush: bool = True, timeout: float = 10.0):
+        """Drain the queue (bounded by timeout), then stop the workers; unfinished jobs stay on disk"""
+        if self._stopping:
+            return
+        if flush:
+            self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = self._pending_count()
+            oldest = self._db.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'pending'").fetchone()[0]
+            return {
+                **self._counters,
+                "pending": pending,
+                "running": self._running,
+                "workers": len([w for w in self._workers if w.is_alive()]),
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "oldest_pending_age": time.time() - oldest if oldest else 0.0
+            }
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        pass
+    return True
+
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+
+def get_background_executor() -> BackgroundExecutor:
+    """Process-wide executor shared by the memory, learning and analyzer stores"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = BackgroundExecutor(
+                path=os.getenv("BACKGROUND_QUEUE_PATH", "./memory/background_jobs.sqlite3"),
+                max_workers=int(os.getenv("BACKGROUND_WORKERS", "2"))
+            )
+        return _default_executor
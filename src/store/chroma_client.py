@@ -0,0 +1,22 @@
+import importlib.util
+import os
+
+# chromadb takes most of a second to import; look it up now, import it when a store opens
+CHROMA_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+
+
+def get_chroma_client(path: str):
+    """Chroma client for a store persisting under path.
+
+    Embedded PersistentClients keep their index in process memory, so
+    several worker processes must not open the same directory. With
+    CHROMA_HOST set, every store in every worker talks to that shared Chroma
+    server instead (path is then ignored; collection names are distinct).
+    """
+    import chromadb
+    from chromadb.config import Settings
+    settings = Settings(anonymized_telemetry=False)
+    host = os.getenv("CHROMA_HOST")
+    if host:
+        return chromadb.HttpClient(host=host, port=int(os.getenv("CHROMA_PORT", "8000")), settings=settings)
+    return chromadb.PersistentClient(path=path, settings=settings)
@@ -0,0 +1,94 @@
+from typing import List, Dict, Any, Tuple
+import re
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\S+")
+
+
+def _spans(text: str, pattern: re.Pattern, start: int, end: int) -> List[Tuple[int, int]]:
+    """Non-blank pieces of text[start:end] between matches of pattern, as absolute offsets"""
+    spans, cursor = [], start
+    for match in pattern.finditer(text, start, end):
+        spans.append((cursor, match.start()))
+        cursor = match.end()
+    spans.append((cursor, end))
+    result = []
+    for a, b in spans:
+        piece = text[a:b]
+        stripped = piece.strip()
+        if stripped:
+            a += len(piece) - len(piece.lstrip())
+            result.append((a, a + len(stripped)))
+    return result
+
+
+def _segments(text: str, chunk_size: int) -> List[Tuple[int, int, bool]]:
+    """Sentences (or word windows / hard cuts when a sentence is too long) as (start, end, starts_paragraph)"""
+    segments = []
+    for p_start, p_end in _spans(text, _PARAGRAPH_BREAK, 0, len(text)):
+        first = True
+        for s_start, s_end in _spans(text, _SENTENCE_END, p_start, p_end):
+            pieces = [(s_start, s_end)]
+            if s_end - s_start > chunk_size:
+                pieces = []
+                words = [(m.start(), m.end()) for m in _WORD.finditer(text, s_start, s_end)]
+                w_start, w_end = words[0]
+                for a, b in words[1:]:
+                    if b - w_start > chunk_size:
+                        pieces.append((w_start, w_end))
+                        w_start = a
+                    w_end = b
+                pieces.append((w_start, w_end))
+                # A single "word" longer than chunk_size (e.g. base64) is cut hard
+                pieces = [(a + i, min(a + i + chunk_size, b)) for a, b in pieces for i in range(0, b - a, chunk_size)]
+            for a, b in pieces:
+                segments.append((a, b, first))
+                first = False
+    return segments
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 150) -> List[Dict[str, Any]]:
+    """Split text into chunks of at most chunk_size characters, preferring paragraph breaks.
+
+    Chunks are built from whole sentences; a chunk ends at the last
+    paragraph break once it is at least half full. Consecutive chunks
+    share up to overlap characters of trailing sentences so a passage cut
+    at a boundary is still whole in one of them. Each chunk is a
+    contiguous span: text[start:end] == chunk["text"]. chunk_size <= 0
+    returns the whole (stripped) text as one chunk.
+    """
+    if not text.strip():
+        return []
+    if chunk_size <= 0:
+        start = len(text) - len(text.lstrip())
+        end = len(text.rstrip())
+        return [{"index": 0, "text": text[start:end], "start": start, "end": end}]
+
+    overlap = max(0, min(overlap, chunk_size // 2))
+    segments = _segments(text, chunk_size)
+    chunks = []
+    i = 0
+    while i < len(segments):
+        start = segments[i][0]
+        j = i
+        while j + 1 < len(segments) and segments[j + 1][1] - start <= chunk_size:
+            j += 1
+        if j + 1 < len(segments):
+            # Prefer ending at a paragraph break when that keeps the chunk at least half full
+            for p in range(j, i, -1):
+                if segments[p + 1][2] and segments[p][1] - start >= chunk_size // 2:
+                    j = p
+                    break
+        end = segments[j][1]
+        chunks.append({"index": len(chunks), "text": text[start:end], "start": start, "end": end})
+        if j + 1 >= len(segments):
+            break
+        # Next chunk starts at the earliest trailing sentence within overlap that still lets it move forward
+        nxt = j + 1
+        for k in range(i + 1, j + 1):
+            if end - segments[k][0] <= overlap and segments[j + 1][1] - segments[k][0] <= chunk_size:
+                nxt = k
+                break
+        i = nxt
+    return chunks
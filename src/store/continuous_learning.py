@@ -1,26 +1,39 @@
 from typing import Dict, Any, List
 import threading
+from .background_executor import BackgroundExecutor, get_background_executor
+from ..llm_client.prompt_builder import PromptBuilder
 
 
 class ContinuousLearning:
-    def __init__(self, ollama_client, learning_store):
+    def __init__(self, ollama_client, learning_store, executor: BackgroundExecutor = None):
         self.ollama = ollama_client
         self.learning = learning_store
         self.conversation_buffer = []
+        self._lock = threading.Lock()
+        self.executor = executor or get_background_executor()
+        self.owner = self.executor.claim_owner(f"learning:{getattr(learning_store, 'learning_dir', '')}")
+        self.executor.register("learning.extract", self._extract_learning, owner=self.owner)
 
     def process_message(self, user_msg: str, agent_response: str):
-        self.conversation_buffer.append({"user": user_msg, "agent": agent_response})
+        with self._lock:
+            self.conversation_buffer.append({"user": user_msg, "agent": agent_response})
+            # Extraction only ever looks at the last five messages
+            del self.conversation_buffer[:-5]
+            recent = list(self.conversation_buffer) if len(self.conversation_buffer) >= 3 else None
         
-        if len(self.conversation_buffer) >= 3:
-            threading.Thread(target=self._extract_learning, daemon=True).start()
+        if recent:
+            self.executor.submit("learning.extract", {"recent": recent}, coalesce_key="learning.extract", owner=self.owner)
 
-    def _extract_learning(self):
-        recent = self.conversation_buffer[-5:]
+    def _extract_learning(self, job: Dict[str, Any] = None):
+        if not (job or {}).get("recent"):
+            with self._lock:
+                job = {"recent": list(self.conversation_buffer)}
+        recent = job["recent"]
         
-        messages = [
-            {"role": "system", "content": "Extract teachable patterns from conversation. Identify if user is teaching you something (facts, procedures, preferences)."},
-            {"role": "user", "content": str(recent)}
-        ]
+        messages, report = PromptBuilder("learning_extract").build(
+            "Extract teachable patterns from conversation. Identify if user is teaching you something (facts, procedures, preferences).",
+            {"interactions": recent}, shrinkable={"interactions": "tail"})
+        print(f"[learning] learning_extract prompt {report['tokens']}/{report['budget']} tokens, dropped {report['dropped_tokens']}")
         
         functions = [{
             "name": "extract_teaching",
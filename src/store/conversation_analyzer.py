@@ -1,13 +1,16 @@
 from typing import Dict, Any, List
 import json
 import os
-import time
 import threading
+import time
 from datetime import datetime
+from .background_executor import BackgroundExecutor, get_background_executor
+from .file_utils import atomic_write_json, file_lock, file_signature
+from ..llm_client.prompt_builder import PromptBuilder
 
 
 class ConversationAnalyzer:
-    def __init__(self, ollama_client, persist_dir: str = "./memory"):
+    def __init__(self, ollama_client, persist_dir: str = "./memory", executor: BackgroundExecutor = None):
         self.ollama = ollama_client
         self.persist_dir = persist_dir
         self.conversation_log_path = os.path.join(persist_dir, "conversation_log.json")
@@ -18,56 +21,85 @@ class ConversationAnalyzer:
         self.last_analysis_time = time.time()
         self.analysis_interval = 3600  # 1 hour
         self.message_threshold = 100
+        # Separate locks: logging a turn never waits for a profile write and vice versa.
+        # Other worker processes are coordinated through file_lock and reloads when a file changes.
+        self._log_lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._log_signature = None
+        self._profile_signature = None
         os.makedirs(persist_dir, exist_ok=True)
         self._load_data()
+        self.executor = executor or get_background_executor()
+        self.owner = self.executor.claim_owner(f"analyzer:{os.path.abspath(persist_dir)}")
+        self.executor.register("analyzer.profile", self._run_analysis, owner=self.owner)
 
     def _load_data(self):
-        if os.path.exists(self.conversation_log_path):
+        self._load_conversations()
+        self._load_profile()
+
+    def _load_conversations(self):
+        self._log_signature = file_signature(self.conversation_log_path)
+        if self._log_signature:
             with open(self.conversation_log_path, 'r') as f:
                 data = json.load(f)
                 self.conversations = data.get("conversations", [])
                 self.message_count = data.get("message_count", 0)
-        
-        if os.path.exists(self.profile_path):
+
+    def _load_profile(self):
+        self._profile_signature = file_signature(self.profile_path)
+        if self._profile_signature:
             with open(self.profile_path, 'r') as f:
                 self.user_profile = json.load(f)
 
     def _save_conversations(self):
-        with open(self.conversation_log_path, 'w') as f:
-            json.dump({
-                "conversations": self.conversations[-500:],
-                "message_count": self.message_count
-            }, f)
+        # Callers hold self._log_lock and file_lock(self.conversation_log_path); only the persisted window is kept in memory too
+        self.conversations = self.conversations[-500:]
+        atomic_write_json(self.conversation_log_path, {
+            "conversations": self.conversations,
+            "message_count": self.message_count
+        })
+        self._log_signature = file_signature(self.conversation_log_path)
 
     def _save_profile(self):
-        with open(self.profile_path, 'w') as f:
-            json.dump(self.user_profile, f, indent=2)
+        # Callers hold self._profile_lock and file_lock(self.profile_path)
+        atomic_write_json(self.profile_path, self.user_profile, indent=2)
+        self._profile_signature = file_signature(self.profile_path)
 
     def log_conversation(self, user_msg: str, agent_msg: str, sentiment: Dict[str, Any]):
-        self.conversations.append({
-            "user": user_msg,
-            "agent": agent_msg,
-            "sentiment": sentiment,
-            "timestamp": datetime.now().isoformat()
-        })
-        self.message_count += 1
-        self._save_conversations()
-        
-        current_time = time.time()
-        time_elapsed = current_time - self.last_analysis_time
+        with self._log_lock, file_lock(self.conversation_log_path):
+            if file_signature(self.conversation_log_path) != self._log_signature:
+                self._load_conversations()
+            self.conversations.append({
+                "user": user_msg,
+                "agent": agent_msg,
+                "sentiment": dict(sentiment or {}),
+                "timestamp": datetime.now().isoformat()
+            })
+            self.message_count += 1
+            self._save_conversations()
+            
+            current_time = time.time()
+            time_elapsed = current_time - self.last_analysis_time
+            due = self.message_count >= self.message_threshold or time_elapsed >= self.analysis_interval
+            if due:
+                self.last_analysis_time = current_time
+                self.message_count = 0
         
-        if self.message_count >= self.message_threshold or time_elapsed >= self.analysis_interval:
-            threading.Thread(target=self._run_analysis, daemon=True).start()
-            self.last_analysis_time = current_time
-            self.message_count = 0
+        if due:
+            self.executor.submit("analyzer.profile", coalesce_key="analyzer.profile", owner=self.owner)
 
-    def _run_analysis(self):
-        recent = self.conversations[-100:] if len(self.conversations) > 100 else self.conversations
+    def _run_analysis(self, job: Dict[str, Any] = None):
+        with self._log_lock:
+            if file_signature(self.conversation_log_path) != self._log_signature:
+                self._load_conversations()
+            recent = self.conversations[-100:]
         
-        messages = [
-            {"role": "system", "content": "Analyze conversation history to extract user interests, topics, preferences, and behavioral patterns."},
-            {"role": "user", "content": json.dumps([{"user": c["user"], "sentiment": c["sentiment"]} for c in recent])}
-        ]
+        # Compact entries (label only) and keep the newest messages when over budget
+        conversations = [{"user": c["user"], "sentiment": (c.get("sentiment") or {}).get("label", "NEUTRAL")} for c in recent]
+        messages, report = PromptBuilder("profile_analysis").build(
+            "Analyze conversation history to extract user interests, topics, preferences, and behavioral patterns.",
+            {"conversations": conversations}, shrinkable={"conversations": "tail"})
+        print(f"[analyzer] Prompt {report['tokens']}/{report['budget']} tokens, dropped {report['dropped_tokens']}")
         
         functions = [{
             "name": "analyze_user_profile",
@@ -90,7 +122,7 @@ class ConversationAnalyzer:
         
         if "function_name" in result:
             args = result["arguments"]
-            self.user_profile = {
+            profile = {
                 "primary_interests": args.get("primary_interests", []),
                 "frequent_topics": args.get("frequent_topics", []),
                 "communication_style": args.get("communication_style", ""),
@@ -101,21 +133,28 @@ class ConversationAnalyzer:
                 "last_updated": datetime.now().isoformat(),
                 "total_messages_analyzed": len(recent)
             }
-            self._save_profile()
+            with self._profile_lock, file_lock(self.profile_path):
+                # Readers hold a reference to the old dict, which is never mutated
+                self.user_profile = profile
+                self._save_profile()
 
     def get_user_profile(self) -> Dict[str, Any]:
-        return self.user_profile
+        with self._profile_lock:
+            if file_signature(self.profile_path) != self._profile_signature:
+                self._load_profile()
+            return dict(self.user_profile)
 
     def get_profile_context(self) -> str:
-        if not self.user_profile:
+        profile = self.get_user_profile()
+        if not profile:
             return ""
         
         context = []
-        if self.user_profile.get("primary_interests"):
-            context.append(f"User interests: {', '.join(self.user_profile['primary_interests'][:3])}")
-        if self.user_profile.get("expertise_areas"):
-            context.append(f"Expertise: {', '.join(self.user_profile['expertise_areas'][:3])}")
-        if self.user_profile.get("communication_style"):
-            context.append(f"Style: {self.user_profile['communication_style']}")
+        if profile.get("primary_interests"):
+            context.append(f"User interests: {', '.join(profile['primary_interests'][:3])}")
+        if profile.get("expertise_areas"):
+            context.append(f"Expertise: {', '.join(profile['expertise_areas'][:3])}")
+        if profile.get("communication_style"):
+            context.append(f"Style: {profile['communication_style']}")
         
         return " | ".join(context)
@@ -1,86 +1,380 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+import collections
+import json
+import multiprocessing
 import os
-import glob
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMA_AVAILABLE = True
-except Exception:
-    CHROMA_AVAILABLE = False
+import pickle
+import threading
+import time
+from .chroma_client import CHROMA_AVAILABLE, get_chroma_client
+from .file_utils import atomic_write_json, file_lock
+from .keyword_index import KeywordIndex
+from .loaders import discover, init_worker, prepare_file
+
+# Chunks per collection.upsert(); each call embeds its whole batch at once
+INDEX_BATCH_SIZE = int(os.getenv("DOC_INDEX_BATCH_SIZE", "256"))
+# Seconds between manifest checkpoints while a long index runs
+CHECKPOINT_SECONDS = 5.0
+SEARCH_MODES = ("hybrid", "vector", "keyword")
 
 class DocumentStore:
-    def __init__(self, docs_dir: str = "./docs"):
+    def __init__(self, docs_dir: str = "./docs", embedding_function=None, index: bool = True, chunk_size: int = None, chunk_overlap: int = None):
+        """index=False opens the collection without scanning docs_dir; call index() later (e.g. from a warm-up thread).
+
+        Files are indexed as chunks of at most chunk_size characters sharing
+        chunk_overlap characters (DOC_CHUNK_SIZE / DOC_CHUNK_OVERLAP); a
+        chunk_size of 0 indexes every file whole.
+        """
         self.docs_dir = os.path.abspath(docs_dir)
+        self.chunk_size = chunk_size if chunk_size is not None else int(os.getenv("DOC_CHUNK_SIZE", "1000"))
+        self.chunk_overlap = chunk_overlap if chunk_overlap is not None else int(os.getenv("DOC_CHUNK_OVERLAP", "150"))
         os.makedirs(self.docs_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.docs_dir, ".index_manifest.json")
+        self._index_lock = threading.Lock()
+        self.search_mode = os.getenv("DOC_SEARCH_MODE", "hybrid").lower()
+        # Reciprocal rank fusion: a hit ranked r by a retriever adds weight / (rrf_k + r)
+        self.rrf_k = float(os.getenv("DOC_RRF_K", "60"))
+        self.vector_weight = float(os.getenv("DOC_VECTOR_WEIGHT", "1.0"))
+        self.keyword_weight = float(os.getenv("DOC_KEYWORD_WEIGHT", "1.0"))
         
         if CHROMA_AVAILABLE:
-            self.client = chromadb.PersistentClient(
-                path=os.path.join(self.docs_dir, ".chroma"),
-                settings=Settings(anonymized_telemetry=False)
-            )
+            self.client = get_chroma_client(os.path.join(self.docs_dir, ".chroma"))
+            from .embeddings import get_embedding_function
+            embedding_function = embedding_function or get_embedding_function()
+            self.embedding_function = embedding_function
             self.collection = self.client.get_or_create_collection(
                 name="documents",
-                metadata={"hnsw:space": "cosine"}
+                metadata={"hnsw:space": "cosine"},
+                **({"embedding_function": embedding_function} if embedding_function else {})
             )
-            self._load_and_index()
-            print(f"[docs] Using ChromaDB with semantic search - indexed {self.collection.count()} documents")
+            self.keywords = KeywordIndex(os.path.join(self.docs_dir, ".keyword_index.sqlite3"))
+            print(f"[docs] Using ChromaDB with {self.search_mode} search")
+            if index:
+                self.index()
         else:
             self.client = None
             self.collection = None
+            self.embedding_function = None
+            self.keywords = None
             print('[docs] ChromaDB not available - DocumentStore disabled')
 
-    def _load_and_index(self):
+    def index(self, workers: int = 1, batch_size: int = None, progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, int]:
+        """Bring the collection in line with docs_dir: embed new and edited files, drop deleted ones.
+
+        Every .txt/.md/.html/.jsonl file under docs_dir is considered. The
+        manifest remembers mtime, size, content hash and chunk count per
+        file, so unchanged files cost one stat() and a touched but identical
+        file is never re-embedded. workers > 1 reads, parses and chunks files
+        in a process pool; embedding and upserts happen here in batches of
+        batch_size chunks. The manifest is checkpointed as batches land, so
+        an interrupted run resumes where it stopped. progress(stats) is
+        called after every batch. Safe to call repeatedly (the watcher does)
+        and from several worker processes. The keyword index receives the
+        same writes and is rebuilt from the collection if the two disagree.
+        """
+        if not self.collection:
+            return {}
+        with self._index_lock, file_lock(self.manifest_path):
+            try:
+                self._sync_keywords()
+                counts = self._load_and_index(max(1, workers), batch_size or INDEX_BATCH_SIZE, progress)
+            except Exception as e:
+                print(f"[docs] Error indexing documents: {e}")
+                return {}
+        if counts["added"] or counts["updated"] or counts["removed"]:
+            print(f"[docs] Indexed {counts['added']} new, {counts['updated']} changed, {counts['removed']} removed files "
+                  f"({counts['unchanged']} unchanged, {counts['chunks']} chunks embedded)")
+        return counts
+
+    def _sync_keywords(self, page_size: int = 1000):
+        """Rebuild the keyword index from the collection when their chunk counts differ (new, deleted or half-written index)"""
+        total = self.collection.count()
+        if self.keywords.count() == total:
+            return
+        print(f"[docs] Rebuilding keyword index from {total} chunks")
+        self.keywords.clear()
+        for offset in range(0, total, page_size):
+            page = self.collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            self.keywords.upsert(page["ids"], page["documents"], page["metadatas"])
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.collection.count():
+            # Fresh or wiped collection: whatever a manifest says, everything needs embedding
+            return {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f).get("files", {})
+        # Indexed before the manifest existed: list what is there (metadata only) so stale files can be removed
+        files = {}
+        for metadata in self.collection.get(include=["metadatas"])["metadatas"]:
+            files.setdefault(metadata.get("source", ""), {"chunks": None})
+        return files
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]):
+        atomic_write_json(self.manifest_path, {"version": 1, "files": manifest})
+
+    def _worker_embedder(self):
+        """The collection's embedding function if it can be shipped to worker processes, else None (the parent embeds)"""
+        embedder = self.embedding_function
         try:
-            files = glob.glob(os.path.join(self.docs_dir, "*.txt"))
-            existing_ids = set(self.collection.get()['ids'])
-            
-            for f in files:
-                if not os.path.abspath(f).startswith(self.docs_dir):
+            if embedder is None:
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                embedder = DefaultEmbeddingFunction()
+            pickle.dumps(embedder)
+            return embedder
+        except Exception:
+            return None
+
+    def _prepared(self, todo: List[tuple], workers: int) -> Iterator[Dict[str, Any]]:
+        """prepare_file results in order; a bounded window of files is in flight in the pool"""
+        if workers <= 1 or len(todo) < 2:
+            for args in todo:
+                yield prepare_file(*args)
+            return
+        # spawn: the parent may be running threads (warm-up, background jobs, watcher).
+        # Workers parse and embed, so the parent only writes to Chroma
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_worker, initargs=(self._worker_embedder(),)) as pool:
+            in_flight = collections.deque()
+            for args in todo:
+                in_flight.append(pool.submit(prepare_file, *args))
+                if len(in_flight) >= workers * 8:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def _load_and_index(self, workers: int, batch_size: int, progress: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, int]:
+        manifest = self._load_manifest()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "errors": 0, "chunks": 0}
+        settings = [self.chunk_size, self.chunk_overlap]
+        seen, todo = set(), []
+        for path, name in discover(self.docs_dir):
+            seen.add(name)
+            entry = manifest.get(name)
+            current = entry is not None and entry.get("settings") == settings
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if current and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                counts["unchanged"] += 1
+                continue
+            todo.append((path, name, self.chunk_size, self.chunk_overlap, entry.get("sha256") if current else None))
+
+        started = time.perf_counter()
+        batch = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+        # Files whose chunks sit in the unflushed batch; they enter the manifest once it lands
+        pending = []
+        last_checkpoint = started
+        done = 0
+
+        def flush():
+            nonlocal last_checkpoint
+            self._add_batch(batch)
+            for name, entry, kind in pending:
+                manifest[name] = entry
+                counts[kind] += 1
+            pending.clear()
+            if time.perf_counter() - last_checkpoint >= CHECKPOINT_SECONDS:
+                self._save_manifest(manifest)
+                last_checkpoint = time.perf_counter()
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress({"files_done": done, "files_total": len(todo), "chunks": counts["chunks"], "elapsed": round(elapsed, 2),
+                          "files_per_second": round(done / elapsed, 1) if elapsed else 0.0,
+                          "chunks_per_second": round(counts["chunks"] / elapsed, 1) if elapsed else 0.0})
+
+        try:
+            for result in self._prepared(todo, workers):
+                done += 1
+                name = result["name"]
+                if "error" in result:
+                    print(f"[docs] Error loading {result['path']}: {result['error']}")
+                    counts["errors"] += 1
                     continue
-                
-                doc_id = f"DOC-{os.path.basename(f)}"
-                if doc_id in existing_ids:
+                entry = manifest.get(name)
+                if result["chunks"] is None:
+                    # Touched or copied over with the same content
+                    entry.update(mtime_ns=result["mtime_ns"], size=result["size"])
+                    counts["unchanged"] += 1
                     continue
-                
-                try:
-                    with open(f, "r", encoding="utf-8") as fh:
-                        content = fh.read()
-                    
-                    if content.strip():
-                        self.collection.add(
-                            documents=[content],
-                            metadatas=[{"source": os.path.basename(f), "path": f}],
-                            ids=[doc_id]
-                        )
-                except (IOError, OSError) as e:
-                    print(f"[docs] Error loading {f}: {e}")
-        except Exception as e:
-            print(f"[docs] Error indexing documents: {e}")
 
-    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+                chunks = result["chunks"]
+                doc_id = f"DOC-{name}"
+                if entry and entry.get("chunks") is not None:
+                    # Upserted ids replace the old chunks in place; only surplus ones need deleting
+                    stale = [f"{doc_id}#{i}" for i in range(len(chunks), entry["chunks"])]
+                    if stale:
+                        self.collection.delete(ids=stale)
+                        self.keywords.delete(ids=stale)
+                elif entry:
+                    # Unknown layout from before the manifest (whole-file id or chunks)
+                    self.collection.delete(where={"source": name})
+                    self.keywords.delete(source=name)
+                for i, chunk in enumerate(chunks):
+                    batch["ids"].append(f"{doc_id}#{i}")
+                    batch["documents"].append(chunk["text"])
+                    batch["embeddings"].append(chunk.get("embedding"))
+                    batch["metadatas"].append(dict(chunk["metadata"], source=name, path=result["path"], chunk=i, chunks=len(chunks)))
+                pending.append((name, {"mtime_ns": result["mtime_ns"], "size": result["size"], "sha256": result["sha256"],
+                                       "chunks": len(chunks), "settings": settings}, "updated" if entry else "added"))
+                counts["chunks"] += len(chunks)
+                if len(batch["ids"]) >= batch_size:
+                    flush()
+            flush()
+
+            for name in [n for n in manifest if n not in seen]:
+                entry = manifest.pop(name)
+                if entry.get("chunks") is not None:
+                    ids = [f"DOC-{name}#{i}" for i in range(entry["chunks"])]
+                    if ids:
+                        self.collection.delete(ids=ids)
+                        self.keywords.delete(ids=ids)
+                else:
+                    self.collection.delete(where={"source": name})
+                    self.keywords.delete(source=name)
+                counts["removed"] += 1
+        finally:
+            # Interrupted runs keep every file whose batch landed; the rest is redone on the next run
+            self._save_manifest(manifest)
+        return counts
+
+    def _add_batch(self, batch: Dict[str, list]):
+        # One embedding call and one write per batch instead of per file; a file's chunks may overflow batch_size
+        if batch["ids"]:
+            max_batch = self.client.get_max_batch_size()
+            embedded = all(e is not None for e in batch["embeddings"])
+            for i in range(0, len(batch["ids"]), max_batch):
+                part = slice(i, i + max_batch)
+                self.collection.upsert(ids=batch["ids"][part], documents=batch["documents"][part], metadatas=batch["metadatas"][part],
+                                       **({"embeddings": batch["embeddings"][part]} if embedded else {}))
+            # After the collection write, so a crash in between leaves the counts unequal and triggers a rebuild
+            self.keywords.upsert(batch["ids"], batch["documents"], batch["metadatas"])
+            for values in batch.values():
+                values.clear()
+
+    def search(self, query: str, k: int = 3, mode: str = None) -> List[Dict[str, Any]]:
+        """The k best chunks for query.
+
+        mode (default DOC_SEARCH_MODE) is "vector" (cosine similarity of
+        embeddings), "keyword" (BM25 over the on-disk keyword index, which
+        finds exact identifiers and error codes) or "hybrid": both lists
+        fused by reciprocal rank with DOC_VECTOR_WEIGHT / DOC_KEYWORD_WEIGHT.
+        Hybrid scores are scaled so a hit ranked first by both is 1.0.
+        """
         if not CHROMA_AVAILABLE or not self.collection:
             return []
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            print(f"[docs] Unknown search mode '{mode}', using hybrid")
+            mode = "hybrid"
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=k
-            )
-            
-            documents = []
-            if results['ids'] and results['ids'][0]:
-                for i in range(len(results['ids'][0])):
-                    doc = results['documents'][0][i]
-                    metadata = results['metadatas'][0][i]
-                    distance = results['distances'][0][i] if results['distances'] else 0
-                    
-                    documents.append({
-                        "source": metadata.get('source', 'unknown'),
-                        "text": doc[:300] + ("..." if len(doc) > 300 else ""),
-                        "score": 1 - distance
-                    })
-            
-            return documents
+            if mode == "vector":
+                return self._vector_search(query, k)
+            if mode == "keyword":
+                hits = self._keyword_search(query, k)
+                # BM25 is unbounded; relative to the best hit keeps scores in 0..1
+                top = hits[0]["score"] if hits and hits[0]["score"] > 0 else 1.0
+                for hit in hits:
+                    hit["score"] = hit["score"] / top
+                return hits
+            return self._hybrid_search(query, k)
         except Exception as e:
             print(f"[docs] Search error: {e}")
             return []
+
+    @staticmethod
+    def _hit(doc: str, metadata: Dict[str, Any], score: float) -> Dict[str, Any]:
+        # The matching chunk itself, located in its source file
+        hit = {
+            "source": metadata.get('source', 'unknown'),
+            "text": doc,
+            "score": score,
+            "chunk": metadata.get('chunk', 0),
+            "start": metadata.get('start', 0),
+            "end": metadata.get('end', len(doc))
+        }
+        for key in ('title', 'record'):
+            if key in metadata:
+                hit[key] = metadata[key]
+        return hit
+
+    def _vector_search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        results = self.collection.query(
+            query_texts=[query],
+            n_results=k
+        )
+        
+        documents = []
+        if results['ids'] and results['ids'][0]:
+            for i in range(len(results['ids'][0])):
+                distance = results['distances'][0][i] if results['distances'] else 0
+                hit = self._hit(results['documents'][0][i], results['metadatas'][0][i], 1 - distance)
+                hit["id"] = results['ids'][0][i]
+                documents.append(hit)
+        return documents
+
+    def _keyword_search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        documents = []
+        for chunk_id, score, doc, metadata in self.keywords.search(query, k):
+            hit = self._hit(doc, metadata, score)
+            hit["id"] = chunk_id
+            documents.append(hit)
+        return documents
+
+    def _hybrid_search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        # Deeper candidate lists than k, so a chunk ranked modestly by both retrievers can still win
+        depth = max(k * 4, 20)
+        fused = {}
+        for name, weight, hits in (("vector", self.vector_weight, self._vector_search(query, depth) if self.vector_weight > 0 else []),
+                                   ("keyword", self.keyword_weight, self._keyword_search(query, depth) if self.keyword_weight > 0 else [])):
+            for rank, hit in enumerate(hits, 1):
+                entry = fused.setdefault(hit["id"], dict(hit, score=0.0, matched=[]))
+                entry["score"] += weight / (self.rrf_k + rank)
+                entry["matched"].append(name)
+        best = (max(self.vector_weight, 0) + max(self.keyword_weight, 0)) / (self.rrf_k + 1) or 1.0
+        documents = sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)[:k]
+        for hit in documents:
+            hit["score"] = hit["score"] / best
+        return documents
+
+
+class DocumentWatcher:
+    """Re-indexes docs_dir in the background by polling it every interval seconds.
+
+    Polling costs one stat() per file when nothing changed, needs no
+    platform-specific notification API and also notices edits made on
+    network or bind-mounted volumes. Searches are never blocked: index()
+    runs on the watcher thread and upserts a changed file's chunks in place.
+    """
+
+    def __init__(self, store: DocumentStore, interval: float = None):
+        self.store = store
+        self.interval = interval if interval is not None else float(os.getenv("DOC_WATCH_INTERVAL", "0"))
+        self.runs = 0
+        self.last_counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "DocumentWatcher":
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="docs-watcher", daemon=True)
+            self._thread.start()
+            print(f"[docs] Watching {self.store.docs_dir} every {self.interval}s")
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_counts = self.store.index()
+                self.runs += 1
+            except Exception as e:
+                print(f"[docs] Watcher error: {e}")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,66 @@
+from typing import List, Dict, Any, Optional
+import hashlib
+import os
+import re
+try:
+    import numpy as np
+    from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+    from chromadb.utils.embedding_functions import register_embedding_function
+    CHROMA_AVAILABLE = True
+except Exception:
+    CHROMA_AVAILABLE = False
+
+_WORD = re.compile(r"\w+")
+
+
+def _hash_features(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    # Unigrams plus bigrams so word order carries a little signal
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+if CHROMA_AVAILABLE:
+    @register_embedding_function
+    class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+        """Deterministic, offline embedding (signed feature hashing of words and bigrams).
+
+        Not semantically strong, but needs no model download or network, so
+        benchmarks and tests get reproducible vectors of a realistic size.
+        """
+
+        def __init__(self, dim: int = 384):
+            self.dim = dim
+
+        def __call__(self, input: Documents) -> Embeddings:
+            vectors = []
+            for text in input:
+                vector = np.zeros(self.dim, dtype=np.float32)
+                for feature in _hash_features(text):
+                    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                    value = int.from_bytes(digest, "little")
+                    vector[value % self.dim] += 1.0 if (value >> 63) else -1.0
+                norm = np.linalg.norm(vector)
+                # Empty text: a fixed unit vector keeps cosine distance defined
+                vectors.append(vector / norm if norm else np.eye(1, self.dim, dtype=np.float32)[0])
+            return vectors
+
+        @staticmethod
+        def name() -> str:
+            return "hashing"
+
+        def default_space(self) -> str:
+            return "cosine"
+
+        @staticmethod
+        def build_from_config(config: Dict[str, Any]) -> "HashingEmbeddingFunction":
+            return HashingEmbeddingFunction(dim=config.get("dim", 384))
+
+        def get_config(self) -> Dict[str, Any]:
+            return {"dim": self.dim}
+
+
+def get_embedding_function() -> Optional[Any]:
+    """EMBEDDING_FUNCTION=hash selects HashingEmbeddingFunction; None keeps Chroma's default model"""
+    if CHROMA_AVAILABLE and os.getenv("EMBEDDING_FUNCTION", "default").lower() == "hash":
+        return HashingEmbeddingFunction(dim=int(os.getenv("EMBEDDING_DIM", "384")))
+    return None
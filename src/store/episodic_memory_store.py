@@ -3,8 +3,7 @@ import json
 import time
 import uuid
 from datetime import datetime
-import chromadb
-from chromadb.config import Settings
+from .chroma_client import get_chroma_client
 
 
 class EpisodicMemory:
@@ -38,10 +37,13 @@ class EpisodicMemory:
 
 
 class EpisodicMemoryStore:
-    def __init__(self, ollama_client, persist_directory: str = "./memory"):
+    def __init__(self, ollama_client, persist_directory: str = "./memory", embedding_function=None):
         self.ollama = ollama_client
-        self.client = chromadb.PersistentClient(path=persist_directory, settings=Settings(anonymized_telemetry=False))
-        self.collection = self.client.get_or_create_collection(name="episodic_memories", metadata={"hnsw:space": "cosine"})
+        self.client = get_chroma_client(persist_directory)
+        from .embeddings import get_embedding_function
+        embedding_function = embedding_function or get_embedding_function()
+        self.collection = self.client.get_or_create_collection(name="episodic_memories", metadata={"hnsw:space": "cosine"},
+                                                               **({"embedding_function": embedding_function} if embedding_function else {}))
         self.decay_rate = 0.95
 
     def _compute_importance(self, what: str, emotional_context: Dict[str, Any], recency: float) -> float:
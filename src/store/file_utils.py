@@ -0,0 +1,60 @@
+from typing import Any, Optional, Tuple
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs):
+    """Write JSON to a temp file in the same directory, fsync it and rename it over path.
+
+    Readers (other threads or worker processes) see either the old or the
+    new file, never a partially written one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, size) of path, or None when it does not exist; atomic_write_json always changes it"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock on path + ".lock" shared by every worker process.
+
+    Held around read-modify-write cycles so two workers cannot both load
+    the same version and overwrite each other's update. A no-op where
+    fcntl is unavailable (single-process use only).
+    """
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    with open(path + ".lock", 'a') as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
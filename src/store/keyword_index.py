@@ -0,0 +1,124 @@
+from typing import List, Dict, Any, Iterable, Tuple
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+# Hyphens and underscores stay inside tokens so ERR-4021, foo_bar or
+# SKU-99-X are looked up whole instead of as common fragments
+TOKENIZER = "unicode61 tokenchars '-_'"
+_QUERY_TOKEN = re.compile(r"[\w][\w\-]*")
+# Longer queries add little lexical signal and slow the OR match
+MAX_QUERY_TOKENS = 32
+# bm25() costs a few microseconds per matching row, so the rarest query terms
+# are kept until their rows add up to this; common words barely move BM25 anyway
+MAX_QUERY_POSTINGS = int(os.getenv("DOC_KEYWORD_MAX_POSTINGS", "4000"))
+
+
+class KeywordIndex:
+    """BM25 inverted index of document chunks in SQLite FTS5, next to the Chroma collection.
+
+    Rows are keyed by the same chunk ids as the collection and carry the
+    chunk text and metadata, so keyword-only lookups never touch Chroma.
+    DocumentStore writes here whenever it writes to the collection and
+    rebuilds the index when the two disagree. WAL mode lets every worker
+    process read while one of them re-indexes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS chunks (rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, source TEXT, text TEXT NOT NULL, metadata TEXT);
+            CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(text, content='chunks', content_rowid='rowid', tokenize="{TOKENIZER}");
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+                INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_vocab USING fts5vocab(chunks_fts, 'row');
+        """)
+        self._db.commit()
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        rows = [(i, m.get("source", ""), d, json.dumps(m)) for i, d, m in zip(ids, documents, metadatas)]
+        with self._lock:
+            self._db.executemany("INSERT INTO chunks (id, source, text, metadata) VALUES (?, ?, ?, ?) "
+                                 "ON CONFLICT(id) DO UPDATE SET source = excluded.source, text = excluded.text, metadata = excluded.metadata", rows)
+            self._db.commit()
+
+    def delete(self, ids: Iterable[str] = (), source: str = None):
+        with self._lock:
+            if source is not None:
+                self._db.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self._db.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+            self._db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    @staticmethod
+    def query_tokens(query: str) -> List[str]:
+        """Lowercased tokens without diacritics, as unicode61 stores them ("Café" -> "cafe")"""
+        folded = "".join(c for c in unicodedata.normalize("NFKD", query.lower()) if not unicodedata.combining(c))
+        return list(dict.fromkeys(_QUERY_TOKEN.findall(folded)))[:MAX_QUERY_TOKENS]
+
+    @staticmethod
+    def match_expression(tokens) -> str:
+        """FTS5 MATCH string: every token quoted (no operator injection), OR-ed so BM25 ranks partial matches"""
+        if isinstance(tokens, str):
+            tokens = KeywordIndex.query_tokens(tokens)
+        return " OR ".join('"' + t.replace('"', '""') + '"' for t in tokens)
+
+    def _selective_tokens(self, tokens: List[str]) -> List[str]:
+        """The rarest tokens whose document frequencies fit MAX_QUERY_POSTINGS (always at least one), in query order.
+
+        Tokens missing from the vocabulary cost nothing to match and are kept.
+        """
+        if len(tokens) < 2 or (self._db.execute("SELECT MAX(rowid) FROM chunks").fetchone()[0] or 0) <= MAX_QUERY_POSTINGS:
+            return tokens
+        frequency = dict(self._db.execute(f"SELECT term, doc FROM chunks_vocab WHERE term IN ({','.join('?' * len(tokens))})", tokens).fetchall())
+        keep, postings = {t for t in tokens if t not in frequency}, 0
+        for token in sorted((t for t in tokens if t in frequency), key=frequency.get):
+            if postings and postings + frequency[token] > MAX_QUERY_POSTINGS:
+                break
+            keep.add(token)
+            postings += frequency[token]
+        return [t for t in tokens if t in keep]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float, str, Dict[str, Any]]]:
+        """(id, bm25 score, text, metadata) of the k best chunks; higher scores are better"""
+        tokens = self.query_tokens(query)
+        if not tokens:
+            return []
+        with self._lock:
+            expression = self.match_expression(self._selective_tokens(tokens))
+            # The inner query lets FTS5 do the top-k itself; rank is its built-in bm25()
+            rows = self._db.execute(
+                "SELECT c.id, f.rank, c.text, c.metadata FROM (SELECT rowid, rank FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?) f "
+                "JOIN chunks c ON c.rowid = f.rowid ORDER BY f.rank", (expression, k)).fetchall()
+        # bm25() is negated so that ascending order is best-first
+        return [(row[0], -row[1], row[2], json.loads(row[3] or "{}")) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,152 @@
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from html.parser import HTMLParser
+import hashlib
+import json
+import os
+import re
+from .chunking import chunk_text
+
+_FRONT_MATTER = re.compile(r"\A---\n.*?\n---\n", re.S)
+_HEADING = re.compile(r"^#\s+(.+)$", re.M)
+# Set in ingestion worker processes by init_worker(); embeds chunks next to parsing
+_worker_embedder = None
+# Field names tried, in order, for the text / id / title of a .jsonl record
+JSONL_TEXT_FIELDS = ("text", "content", "body")
+JSONL_ID_FIELDS = ("id", "_id", "doc_id")
+
+
+def load_text(raw: str) -> List[Dict[str, Any]]:
+    return [{"text": raw}]
+
+
+def load_markdown(raw: str) -> List[Dict[str, Any]]:
+    """Markdown is indexed as written (it reads fine); front matter is blanked and the first heading kept as title"""
+    match = _FRONT_MATTER.match(raw)
+    if match:
+        # Same length, so chunk offsets still point into the file
+        raw = re.sub(r"[^\n]", " ", match.group(0)) + raw[match.end():]
+    heading = _HEADING.search(raw)
+    return [{"text": raw, "title": heading.group(1).strip() if heading else ""}]
+
+
+class _HTMLText(HTMLParser):
+    BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "pre", "blockquote", "table", "ul", "ol"}
+    SKIP = {"script", "style", "noscript", "template", "head"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ""
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCK:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCK:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def load_html(raw: str) -> List[Dict[str, Any]]:
+    """Visible text with block elements as paragraph breaks (offsets refer to this text, not the markup)"""
+    parser = _HTMLText()
+    parser.feed(raw)
+    parser.close()
+    text = re.sub(r"[ \t\r\f\v]+", " ", "".join(parser.parts))
+    text = re.sub(r" ?\n[\s]*\n\s*", "\n\n", text).strip()
+    return [{"text": text, "title": parser.title.strip()}]
+
+
+def load_jsonl(raw: str) -> List[Dict[str, Any]]:
+    """One document per line; records without a text field or with invalid JSON are skipped"""
+    records = []
+    for line_no, line in enumerate(raw.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        text = next((record[f] for f in JSONL_TEXT_FIELDS if isinstance(record.get(f), str)), None)
+        if text is None:
+            continue
+        key = next((str(record[f]) for f in JSONL_ID_FIELDS if record.get(f) is not None), str(line_no))
+        records.append({"text": text, "title": str(record.get("title") or ""), "record": key})
+    return records
+
+
+LOADERS = {".txt": load_text, ".md": load_markdown, ".markdown": load_markdown, ".html": load_html, ".htm": load_html, ".jsonl": load_jsonl}
+
+
+def discover(root: str) -> Iterator[Tuple[str, str]]:
+    """(absolute path, path relative to root) of every loadable file under root, skipping hidden files and directories"""
+    root = os.path.abspath(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith(".") or os.path.splitext(filename)[1].lower() not in LOADERS:
+                continue
+            path = os.path.join(dirpath, filename)
+            yield path, os.path.relpath(path, root)
+
+
+def init_worker(embedding_function=None):
+    global _worker_embedder
+    _worker_embedder = embedding_function
+
+
+def prepare_file(path: str, name: str, chunk_size: int, chunk_overlap: int, known_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """Read, hash, parse and chunk one file; runs in ingestion worker processes.
+
+    Returns the file's stat and sha256, plus its chunks unless the content
+    matches known_sha256. Chunks are numbered across all records of the
+    file so ids stay "DOC-<name>#<n>". In a worker set up by init_worker()
+    each chunk also carries its embedding.
+    """
+    result = {"name": name, "path": path}
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+        result.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=hashlib.sha256(raw).hexdigest())
+        if result["sha256"] == known_sha256:
+            result["chunks"] = None
+            return result
+        records = LOADERS[os.path.splitext(path)[1].lower()](raw.decode("utf-8"))
+    except (IOError, OSError, UnicodeDecodeError, KeyError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    chunks = []
+    for record in records:
+        for chunk in chunk_text(record["text"], chunk_size, chunk_overlap):
+            metadata = {"start": chunk["start"], "end": chunk["end"]}
+            if record.get("title"):
+                metadata["title"] = record["title"]
+            if "record" in record:
+                metadata["record"] = record["record"]
+            chunks.append({"text": chunk["text"], "metadata": metadata})
+    if _worker_embedder is not None and chunks:
+        for chunk, embedding in zip(chunks, _worker_embedder([c["text"] for c in chunks])):
+            chunk["embedding"] = [float(v) for v in embedding]
+    result["chunks"] = chunks
+    return result
@@ -1,26 +1,21 @@
 from typing import List, Dict, Any
 import os
 import datetime
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMA_AVAILABLE = True
-except Exception:
-    CHROMA_AVAILABLE = False
+from .chroma_client import CHROMA_AVAILABLE, get_chroma_client
 
 class MemoryStore:
-    def __init__(self, memory_dir: str = "./memory"):
+    def __init__(self, memory_dir: str = "./memory", embedding_function=None):
         self.memory_dir = os.path.abspath(memory_dir)
         os.makedirs(self.memory_dir, exist_ok=True)
         
         if CHROMA_AVAILABLE:
-            self.client = chromadb.PersistentClient(
-                path=self.memory_dir,
-                settings=Settings(anonymized_telemetry=False)
-            )
+            self.client = get_chroma_client(self.memory_dir)
+            from .embeddings import get_embedding_function
+            embedding_function = embedding_function or get_embedding_function()
             self.collection = self.client.get_or_create_collection(
                 name="memories",
-                metadata={"hnsw:space": "cosine"}
+                metadata={"hnsw:space": "cosine"},
+                **({"embedding_function": embedding_function} if embedding_function else {})
             )
             print("[memory] Using ChromaDB with semantic search")
         else:
@@ -3,10 +3,13 @@ import json
 import os
 import threading
 from datetime import datetime
+from .background_executor import BackgroundExecutor, get_background_executor
+from .file_utils import atomic_write_json, file_lock, file_signature
+from ..llm_client.prompt_builder import PromptBuilder
 
 
 class MemoryTypes:
-    def __init__(self, ollama_client, episodic_store, learning_store, persist_dir: str = "./memory"):
+    def __init__(self, ollama_client, episodic_store, learning_store, persist_dir: str = "./memory", executor: BackgroundExecutor = None):
         self.ollama = ollama_client
         self.episodic = episodic_store
         self.learning = learning_store
@@ -14,33 +17,60 @@ class MemoryTypes:
         self.short_term_path = os.path.join(persist_dir, "short_term.json")
         self.conversation_buffer = []
         self.short_term_summary = ""
+        # Guards conversation_buffer, short_term_summary and short_term.json; the summary
+        # written by another worker process is picked up when the file changes
+        self._lock = threading.Lock()
+        self._signature = None
         os.makedirs(persist_dir, exist_ok=True)
         self._load_short_term()
+        self.executor = executor or get_background_executor()
+        self.owner = self.executor.claim_owner(f"memory:{os.path.abspath(persist_dir)}")
+        self.executor.register("memory.short_term", self._process_short_term, owner=self.owner)
+        self.executor.register("memory.long_term", self._process_long_term, merge=self._merge_long_term, owner=self.owner)
 
-    def _load_short_term(self):
-        if os.path.exists(self.short_term_path):
+    def _load_short_term(self, summary_only: bool = False):
+        self._signature = file_signature(self.short_term_path)
+        if self._signature:
             with open(self.short_term_path, 'r') as f:
                 data = json.load(f)
-                self.conversation_buffer = data.get("buffer", [])
+                if not summary_only:
+                    self.conversation_buffer = data.get("buffer", [])
                 self.short_term_summary = data.get("summary", "")
 
     def _save_short_term(self):
-        with open(self.short_term_path, 'w') as f:
-            json.dump({"buffer": self.conversation_buffer[-10:], "summary": self.short_term_summary}, f)
+        # Callers hold self._lock and file_lock(self.short_term_path)
+        atomic_write_json(self.short_term_path, {"buffer": self.conversation_buffer[-10:], "summary": self.short_term_summary})
+        self._signature = file_signature(self.short_term_path)
 
     def add_interaction(self, user_msg: str, agent_msg: str, sentiment: Dict[str, Any], explicit_remember: bool = False):
-        self.conversation_buffer.append({"user": user_msg, "agent": agent_msg, "timestamp": datetime.now().isoformat(), "sentiment": sentiment})
+        with self._lock:
+            self.conversation_buffer.append({"user": user_msg, "agent": agent_msg, "timestamp": datetime.now().isoformat(), "sentiment": dict(sentiment or {})})
+            # Jobs only ever look at the last few interactions
+            del self.conversation_buffer[:-10]
+            recent = self.conversation_buffer[-5:] if len(self.conversation_buffer) >= 5 else None
         
-        if len(self.conversation_buffer) >= 5:
-            threading.Thread(target=self._process_short_term, daemon=True).start()
-            threading.Thread(target=self._process_long_term, args=(explicit_remember,), daemon=True).start()
+        if recent:
+            # A pending summary is simply refreshed with the newest window
+            self.executor.submit("memory.short_term", {"recent": recent}, coalesce_key="memory.short_term", owner=self.owner)
+            self.executor.submit("memory.long_term", {"recent": recent, "explicit_remember": explicit_remember}, coalesce_key="memory.long_term", owner=self.owner)
 
-    def _process_short_term(self):
-        recent = self.conversation_buffer[-5:]
-        messages = [
-            {"role": "system", "content": "Summarize the last 5 interactions in 2-3 sentences. Focus on key topics and user needs."},
-            {"role": "user", "content": json.dumps([{"user": m["user"], "agent": m["agent"]} for m in recent])}
-        ]
+    @staticmethod
+    def _merge_long_term(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        # Keep every interaction the pending extraction has not seen yet
+        seen = {m["timestamp"] for m in new["recent"]}
+        recent = [m for m in old["recent"] if m["timestamp"] not in seen] + new["recent"]
+        return {"recent": recent[-20:], "explicit_remember": old["explicit_remember"] or new["explicit_remember"]}
+
+    def _recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.conversation_buffer[-5:]
+
+    def _process_short_term(self, job: Dict[str, Any] = None):
+        recent = (job or {}).get("recent") or self._recent()
+        messages, report = PromptBuilder("short_term_summary").build(
+            "Summarize the recent interactions in 2-3 sentences. Focus on key topics and user needs.",
+            {"interactions": [{"user": m["user"], "agent": m["agent"]} for m in recent]}, shrinkable={"interactions": "tail"})
+        print(f"[memory] short_term_summary prompt {report['tokens']}/{report['budget']} tokens, dropped {report['dropped_tokens']}")
         
         functions = [{
             "name": "summarize_conversation",
@@ -56,15 +86,18 @@ class MemoryTypes:
         
         result = self.ollama.chat(messages, functions=functions)
         if "function_name" in result:
-            self.short_term_summary = result["arguments"]["summary"]
-            self._save_short_term()
+            with self._lock, file_lock(self.short_term_path):
+                self.short_term_summary = result["arguments"]["summary"]
+                self._save_short_term()
 
-    def _process_long_term(self, explicit_remember: bool):
-        recent = self.conversation_buffer[-5:]
-        messages = [
-            {"role": "system", "content": "Extract important information worth remembering long-term. Rate importance 0-1."},
-            {"role": "user", "content": json.dumps([{"user": m["user"], "agent": m["agent"], "sentiment": m["sentiment"]} for m in recent])}
-        ]
+    def _process_long_term(self, job: Dict[str, Any] = None):
+        job = job or {}
+        recent = job.get("recent") or self._recent()
+        explicit_remember = job.get("explicit_remember", False)
+        messages, report = PromptBuilder("long_term_extract").build(
+            "Extract important information worth remembering long-term. Rate importance 0-1.",
+            {"interactions": [{"user": m["user"], "agent": m["agent"], "sentiment": m["sentiment"].get("label")} for m in recent]}, shrinkable={"interactions": "tail"})
+        print(f"[memory] long_term_extract prompt {report['tokens']}/{report['budget']} tokens, dropped {report['dropped_tokens']}")
         
         functions = [{
             "name": "extract_important",
@@ -93,7 +126,10 @@ class MemoryTypes:
                     self.episodic.add_memory(fact, emotional_context=avg_sentiment)
 
     def get_short_term_context(self) -> str:
-        return self.short_term_summary
+        with self._lock:
+            if file_signature(self.short_term_path) != self._signature:
+                self._load_short_term(summary_only=True)
+            return self.short_term_summary
 
     def get_procedural_memory(self, query: str) -> List[Dict[str, Any]]:
         return self.learning.search_learnings(query)
@@ -4,6 +4,29 @@ import random
 import re
 
 class Tools:
+    VALIDATION_PATTERNS = {
+        "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+        "url": r'^https?://[^\s]+$',
+        "phone": r'^[+]?[(]?[0-9]{1,4}[)]?[-\s.]?[(]?[0-9]{1,4}[)]?[-\s.]?[0-9]{1,9}$',
+        "ip": r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$'
+    }
+
+    # Tool name -> formatter that turns its output into a final reply without an LLM call
+    RESPONSE_TEMPLATES = {
+        "calculator": "format_calculation",
+        "get_datetime": "format_datetime",
+        "generate_id": "format_generated_id",
+        "validate_data": "format_validation",
+        "text_analysis": "format_text_analysis",
+        "string_transform": "format_string_transform",
+        "list_operations": "format_list_operation",
+        "memory_stats": "format_memory_stats",
+        "learning_stats": "format_learning_stats",
+        "recall": "format_memories",
+        "list_memories": "format_memories",
+        "search_docs": "format_search_results"
+    }
+
     @staticmethod
     def calculator(expr: str) -> Dict[str, Any]:
         """Advanced calculator with validation and detailed feedback"""
@@ -109,12 +132,7 @@ class Tools:
     @staticmethod
     def validate_data(data: str, data_type: str = "email") -> Dict[str, Any]:
         """Validate various data formats"""
-        patterns = {
-            "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            "url": r'^https?://[^\s]+$',
-            "phone": r'^[+]?[(]?[0-9]{1,4}[)]?[-\s.]?[(]?[0-9]{1,4}[)]?[-\s.]?[0-9]{1,9}$',
-            "ip": r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$'
-        }
+        patterns = Tools.VALIDATION_PATTERNS
         pattern = patterns.get(data_type)
         if not pattern:
             return {"error": f"Unknown data type: {data_type}", "available_types": list(patterns.keys())}
@@ -151,7 +169,8 @@ class Tools:
         out = [f"Found {len(hits)} relevant document(s):\n"]
         for i, h in enumerate(hits, 1):
             relevance = "High" if h['score'] > 0.5 else "Medium" if h['score'] > 0.2 else "Low"
-            out.append(f"{i}. [{relevance} Relevance] {h['source']} (score: {h['score']:.3f})\n{h['text']}\n")
+            location = f", chars {h['start']}-{h['end']}" if 'start' in h else ""
+            out.append(f"{i}. [{relevance} Relevance] {h['source']}{location} (score: {h['score']:.3f})\n{h['text']}\n")
         return "\n---\n".join(out)
 
     @staticmethod
@@ -165,3 +184,85 @@ class Tools:
             relevance = "High" if score > 0.5 else "Medium" if score > 0.2 else "Low" if score > 0 else "Exact"
             out.append(f"{i}. [{relevance}] {m['content'][:200]}\nCategory: {m.get('category', 'general')} | Tags: {', '.join(m.get('tags', []))} | Accessed: {m.get('access_count', 0)} times\n")
         return "\n---\n".join(out)
+
+    @staticmethod
+    def format_calculation(result: Dict[str, Any]) -> str:
+        """Format calculator output"""
+        if "error" in result:
+            suggestion = f" {result['suggestion']}." if result.get("suggestion") else ""
+            return f"I couldn't calculate that: {result['error']}.{suggestion}"
+        return f"{result['expression']} = **{result['result']}**"
+
+    @staticmethod
+    def format_datetime(result: Dict[str, Any]) -> str:
+        """Format current date/time output"""
+        return f"It's {result['day']}, {result['formatted']} ({result['timezone']})."
+
+    @staticmethod
+    def format_generated_id(result: Dict[str, Any]) -> str:
+        """Format generated identifier"""
+        return f"Here's your new ID: `{result['id']}`"
+
+    @staticmethod
+    def format_validation(result: Dict[str, Any]) -> str:
+        """Format data validation output"""
+        if "error" in result:
+            return f"{result['error']}. Supported types: {', '.join(result.get('available_types', []))}."
+        verdict = "is a valid" if result["valid"] else "is not a valid"
+        return f"`{result['data']}` {verdict} {result['type']}."
+
+    @staticmethod
+    def format_text_analysis(result: Dict[str, Any]) -> str:
+        """Format text metrics"""
+        return (f"The text has {result['word_count']} words ({result['unique_words']} unique), "
+                f"{result['char_count']} characters and {result['sentence_count']} sentence(s). "
+                f"Average word length: {result['avg_word_length']:.1f}.")
+
+    @staticmethod
+    def format_string_transform(result: Dict[str, Any]) -> str:
+        """Format string transformation output"""
+        return f"{result['operation']}: {result['result']}"
+
+    @staticmethod
+    def format_list_operation(result: Dict[str, Any]) -> str:
+        """Format list operation output"""
+        if "error" in result:
+            return f"I couldn't do that: {result['error']}."
+        parts = [f"{key}: {value}" for key, value in result.items() if key not in ("items", "original")]
+        text = ", ".join(parts)
+        # Only the first letter: capitalize() would lowercase the user's items
+        return text[:1].upper() + text[1:] + "."
+
+    @staticmethod
+    def format_memory_stats(result: Dict[str, Any]) -> str:
+        """Format memory statistics"""
+        if not result.get("total"):
+            return "I don't have any stored memories yet."
+        out = [f"I have {result['total']} stored memory(ies)."]
+        if result.get("categories"):
+            out.append("Categories: " + ", ".join(f"{cat} ({n})" for cat, n in result["categories"].items()))
+        if result.get("most_accessed"):
+            out.append("Most accessed: " + "; ".join(m["content"] for m in result["most_accessed"]))
+        return "\n".join(out)
+
+    @staticmethod
+    def format_learning_stats(result: Dict[str, Any]) -> str:
+        """Format learning statistics"""
+        if not result.get("total"):
+            return "I haven't learned any procedures yet."
+        out = [f"I know {result['total']} procedure(s)."]
+        if result.get("most_used"):
+            out.append("Most used: " + ", ".join(f"{l['name']} ({l['executions']}x)" for l in result["most_used"]))
+        return "\n".join(out)
+
+    @staticmethod
+    def render_response(tool: str, result: Any) -> Optional[str]:
+        """Render a tool result with its response template, or None when the tool has none"""
+        template = Tools.RESPONSE_TEMPLATES.get(tool)
+        if not template or result is None:
+            return None
+        try:
+            return getattr(Tools, template)(result)
+        except (KeyError, TypeError, AttributeError):
+            # Unexpected result shape: let the LLM phrase it instead
+            return None
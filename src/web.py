@@ -2,45 +2,31 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template, request, jsonify
-from src.llm_client.ollama_client import OllamaClient
-from src.sentiment.sentiment import SentimentAnalyzer
-from src.store.document_store import DocumentStore
-from src.store.memory_store import MemoryStore
-from src.store.learning_store import LearningStore
+import json
+import time
+# Before the imports below, so the first-request log covers the whole cold start
+IMPORTED_AT = time.perf_counter()
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from src.llm_client.call_metrics import get_call_metrics
+from src.llm_client.rate_limiter import get_rate_limiter
+from src.llm_client.singleflight import get_singleflight
 from src.agent.agent import ReasoningAgent
+from src.bootstrap import AgentWarmup, build_agent
+from src.metrics import AgentMetrics
 
-app = Flask(__name__)
-
-ollama = OllamaClient(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
-sentiment = SentimentAnalyzer(ollama_client=ollama)
-docs = DocumentStore(docs_dir="./docs")
-memory = MemoryStore(memory_dir="./memory")
-learning = LearningStore(learning_dir="./learnings")
-agent = ReasoningAgent(ollama, docs, sentiment, memory, learning)
-
-@app.route('/')
-def index():
-    return render_template('chat.html')
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    data = request.json
-    user_message = data.get('message', '')
-    if not user_message:
-        return jsonify({'error': 'No message provided'}), 400
-    
-    result = agent.handle(user_message)
-    
-    # Print logs to console
+# How long a request arriving during warm-up waits for the agent before a 503
+WARMUP_WAIT_SECONDS = float(os.getenv("WARMUP_WAIT_SECONDS", "30"))
+
+def _print_logs(result):
     print("\n" + "="*60)
     for log in result.get('logs', []):
         print(log)
     print("="*60 + "\n")
-    
+
+def _format_result(result):
     sentiment_data = result.get('sentiment') or result.get('meta', {}).get('sentiment', {})
     
-    return jsonify({
+    return {
         'reply': result.get('final', 'No response'),
         'logs': result.get('logs', []),
         'debug': {
@@ -49,12 +35,148 @@ def chat():
             'sentiment_score': sentiment_data.get('score', 0),
             'tool': result.get('tool_out', {}).get('tool', 'escalate'),
             'reasoning': result.get('agent_output', {}).get('reasoning', 'escalated'),
-            'intent_analysis': result.get('intent_analysis', {})
+            'intent_analysis': result.get('intent_analysis', {}),
+            'llm': result.get('meta', {}).get('llm', {}).get('by_stage', {}),
+            'timings': result.get('timings', {})
         }
-    })
+    }
+
+def create_app(agent: ReasoningAgent = None, factory=build_agent) -> Flask:
+    """Build the Flask app around agent (by default factory() builds one in the background).
+
+    Production servers call this once per worker process, after fork, so
+    every worker owns its agent, store handles and metrics, e.g.
+    CHROMA_HOST=... gunicorn -w 4 -k gthread --threads 16 "src.web:create_app()"
+    or python src/serve.py --workers 4. Several workers need CHROMA_HOST
+    (a persistent Chroma directory is single-process); they may share the
+    background job queue, which hands each job to one worker. The app is
+    returned before the stores are open; /readyz turns 200 once the agent
+    is usable.
+    """
+    metrics = AgentMetrics(agent, get_call_metrics(), get_rate_limiter(), get_singleflight())
+    warmup = AgentWarmup(factory, agent=agent, on_ready=metrics.attach).start()
+    first_request = {}
+    app = Flask(__name__)
+    app.extensions['agent_warmup'] = warmup
+    app.extensions['agent_metrics'] = metrics
+
+    def not_ready():
+        status = warmup.status()
+        error = f"Agent failed to start: {status['error']}" if status['error'] else 'Agent is warming up'
+        return jsonify({'error': error, 'warmup': status}), 503, {'Retry-After': '1'}
+
+    def served_first(endpoint):
+        if not first_request:
+            first_request['seconds'] = round(time.perf_counter() - IMPORTED_AT, 3)
+            print(f"[web] First {endpoint} request served {first_request['seconds']}s after import")
+
+    @app.route('/healthz', methods=['GET'])
+    def healthz():
+        """Liveness: the process is up and serving HTTP"""
+        return jsonify({'status': 'ok'})
+
+    @app.route('/readyz', methods=['GET'])
+    def readyz():
+        """Readiness: 200 once the agent's stores are open, 503 while warming up or after a failed start"""
+        body = dict(warmup.status(), first_request_seconds=first_request.get('seconds'))
+        return jsonify(body), 200 if warmup.ready else 503
+
+    @app.route('/')
+    def index():
+        return render_template('chat.html')
+
+    @app.route('/chat', methods=['POST'])
+    def chat():
+        start = time.perf_counter()
+        data = request.json
+        user_message = data.get('message', '')
+        if not user_message:
+            metrics.observe_request('/chat', time.perf_counter() - start, 400)
+            return jsonify({'error': 'No message provided'}), 400
+        agent = warmup.wait(WARMUP_WAIT_SECONDS)
+        if agent is None:
+            metrics.observe_request('/chat', time.perf_counter() - start, 503)
+            return not_ready()
+
+        try:
+            result = agent.handle(user_message)
+        except Exception:
+            metrics.observe_request('/chat', time.perf_counter() - start, 500)
+            raise
+        metrics.observe_turn(result)
+        metrics.observe_request('/chat', time.perf_counter() - start, 200)
+        served_first('/chat')
+
+        # Print logs to console
+        _print_logs(result)
+
+        return jsonify(_format_result(result))
+
+    @app.route('/chat/stream', methods=['POST'])
+    def chat_stream():
+        """Server-Sent Events: stage events (intent, sentiment, tool), then synthesis tokens, then done"""
+        start = time.perf_counter()
+        data = request.json
+        user_message = data.get('message', '')
+        if not user_message:
+            metrics.observe_request('/chat/stream', time.perf_counter() - start, 400)
+            return jsonify({'error': 'No message provided'}), 400
+        agent = warmup.wait(WARMUP_WAIT_SECONDS)
+        if agent is None:
+            metrics.observe_request('/chat/stream', time.perf_counter() - start, 503)
+            return not_ready()
+
+        def generate():
+            status = 500
+            try:
+                for item in agent.handle_stream(user_message):
+                    payload = item['data']
+                    if item['event'] == 'done':
+                        _print_logs(payload)
+                        metrics.observe_turn(payload)
+                        payload = _format_result(payload)
+                        status = 200
+                        served_first('/chat/stream')
+                    yield f"event: {item['event']}\ndata: {json.dumps(payload)}\n\n"
+            finally:
+                # Latency covers the whole stream, not just time to first byte
+                metrics.observe_request('/chat/stream', time.perf_counter() - start, status)
+
+        return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Prometheus text exposition of request, stage, LLM, background queue and store metrics"""
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/background/stats', methods=['GET'])
+    def background_stats():
+        """Queue depth, coalescing and rejection counters of the shared background executor"""
+        if not warmup.ready:
+            return not_ready()
+        return jsonify(warmup.agent.background.stats())
+
+    @app.route('/llm/stats', methods=['GET'])
+    def llm_stats():
+        """Latency percentiles, tokens and cost of recent LLM calls, grouped by stage (or ?group_by=route|model|function)"""
+        group_by = request.args.get('group_by', 'stage')
+        if group_by not in ('stage', 'route', 'model', 'function'):
+            return jsonify({'error': f'Unknown group_by: {group_by}'}), 400
+        return jsonify(get_call_metrics().summary(group_by))
+
+    @app.route('/llm/routes', methods=['GET'])
+    def llm_routes():
+        """Model routing decisions per route with the latency and cost of the calls they produced"""
+        if not warmup.ready:
+            return not_ready()
+        agent = warmup.agent
+        return jsonify({'models': agent.router.routes['models'], 'routes': agent.router.stats()})
+
+    return app
 
 if __name__ == '__main__':
     print("\n🚀 Starting Ollama Reasoning Agent Web UI")
     print("📍 Open http://localhost:5000 in your browser\n")
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
-    app.run(host='0.0.0.0', port=5000, debug=debug_mode)
+    # Development server; see src/serve.py for the multi-worker production mode
+    create_app().run(host='0.0.0.0', port=5000, debug=debug_mode, threaded=True)
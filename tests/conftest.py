@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+SCRIPTED = {
+    "analyze_intent": {"primary_intent": "calculate", "action_required": "compute expression", "urgency": "low", "complexity": "simple", "confidence": 0.9, "reasoning": "math"},
+    "analyze_sentiment": {"label": "NEUTRAL", "score": 0.6, "reasoning": "plain request"},
+    "select_tool": {"intent": "calculator", "tool_arguments": {"expr": "2+2"}, "reasoning": "arithmetic"},
+}
+SCRIPTED["triage_message"] = {"intent_analysis": SCRIPTED["analyze_intent"], "sentiment": SCRIPTED["analyze_sentiment"], "tool_selection": SCRIPTED["select_tool"]}
+
+
+def _scripted(messages, functions, responses):
+    if functions:
+        name = functions[0]["name"]
+        if name in responses:
+            return {"function_name": name, "arguments": dict(responses[name])}
+        return {"content": "no script"}
+    return "scripted reply"
+
+
+class FakeOllama:
+    """Sync stand-in for OllamaClient that returns scripted function calls"""
+
+    def __init__(self, delay: float = 0.0, responses=None):
+        self.model = "fake-model"
+        self.delay = delay
+        self.responses = dict(SCRIPTED, **(responses or {}))
+        self.calls = []
+
+    def chat(self, messages, model=None, functions=None, stream=False):
+        self.calls.append(functions[0]["name"] if functions else "text")
+        time.sleep(self.delay)
+        if stream:
+            return iter(["scripted", " ", "reply"])
+        return _scripted(messages, functions, self.responses)
+
+
+class FakeAsyncOllama(FakeOllama):
+    """Async stand-in for AsyncOllamaClient"""
+
+    async def chat(self, messages, model=None, functions=None, stream=False):
+        self.calls.append(functions[0]["name"] if functions else "text")
+        await asyncio.sleep(self.delay)
+        if stream:
+            return self._stream()
+        return _scripted(messages, functions, self.responses)
+
+    async def _stream(self):
+        for delta in ["scripted", " ", "reply"]:
+            yield delta
+
+
+class FakeEpisodic:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def retrieve_memories(self, query, n_results=5, min_importance=0.0):
+        time.sleep(self.delay)
+        return []
+
+    def add_memory(self, what, where="", who="", emotional_context=None):
+        return "fake-id"
+
+
+class FakeMemory:
+    def get_stats(self):
+        return {"total": 0, "categories": {}, "tags": {}}
+
+
+@pytest.fixture
+def make_agent(tmp_path, monkeypatch):
+    """Build a ReasoningAgent wired to fakes, persisting under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    from src.agent.agent import ReasoningAgent
+    from src.sentiment.sentiment import SentimentAnalyzer
+    from src.store.learning_store import LearningStore
+    from src.store.background_executor import BackgroundExecutor
+
+    executors = []
+
+    def _make(ollama=None, async_ollama=None, episodic=None, **kwargs):
+        ollama = ollama or FakeOllama()
+        sentiment = SentimentAnalyzer(ollama_client=ollama, async_client=async_ollama)
+        learning = LearningStore(learning_dir=str(tmp_path / "learnings"))
+        if "background" not in kwargs:
+            kwargs["background"] = BackgroundExecutor(path=str(tmp_path / "background_jobs.sqlite3"))
+            executors.append(kwargs["background"])
+        return ReasoningAgent(ollama, None, sentiment, FakeMemory(), learning, episodic or FakeEpisodic(), async_ollama=async_ollama, **kwargs)
+
+    yield _make
+    for executor in executors:
+        executor.shutdown(flush=False, timeout=1.0)
@@ -0,0 +1,143 @@
+"""Local OpenAI-compatible chat completions server for offline tests and benchmarks.
+
+Function calls are answered from a script (function name -> arguments),
+plain completions with a fixed text. latency is either seconds for every
+request or a dict keyed by function name ("text" for plain completions,
+"default" for the rest). Per-request behaviour (delay, HTTP status) can be
+queued with enqueue() to simulate slow or failing backends.
+
+Run standalone with: python tests/fake_openai_server.py --port 8089 --latency 0.05
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import threading
+import time
+
+
+class FakeOpenAIServer:
+    def __init__(self, responses=None, latency=0.0, text: str = "scripted reply", port: int = 0):
+        self.responses = dict(responses or {})
+        self.latency = latency
+        self.text = text
+        self.port = port
+        self.requests = []
+        self._script = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enqueue(self, status: int = 200, delay: float = None):
+        """Queue behaviour for the next unscripted request (FIFO)"""
+        with self._lock:
+            self._script.append((status, delay))
+
+    def _next(self):
+        with self._lock:
+            return self._script.pop(0) if self._script else (200, None)
+
+    def _latency(self, body) -> float:
+        if not isinstance(self.latency, dict):
+            return self.latency
+        functions = body.get("functions") or []
+        name = functions[0]["name"] if functions else "text"
+        return self.latency.get(name, self.latency.get("default", 0.0))
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    server.requests.append(body)
+                status, delay = server._next()
+                time.sleep(server._latency(body) if delay is None else delay)
+                if status != 200:
+                    return self._send(status, {"error": {"message": f"scripted {status}", "type": "server_error"}})
+                if body.get("stream"):
+                    return self._stream(body)
+                self._send(200, server._completion(body))
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _stream(self, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                words = server.text.split(" ")
+                deltas = [w + " " for w in words[:-1]] + words[-1:]
+                chunks = [{"choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]} for delta in deltas]
+                chunks.append({"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": len(chunks), "total_tokens": 10 + len(chunks)}})
+                try:
+                    for chunk in chunks:
+                        chunk.update({"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model")})
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+    def _completion(self, body):
+        functions = body.get("functions") or []
+        message = {"role": "assistant", "content": self.text}
+        if functions:
+            call = body.get("function_call")
+            name = call["name"] if isinstance(call, dict) else functions[0]["name"]
+            message = {"role": "assistant", "content": None,
+                       "function_call": {"name": name, "arguments": json.dumps(self.responses.get(name, {}))}}
+        return {
+            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": body.get("model"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "function_call" if functions else "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        }
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve scripted OpenAI-compatible chat completions")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--script", help="JSON file mapping function name -> arguments")
+    args = parser.parse_args()
+    responses = json.load(open(args.script)) if args.script else {}
+    fake = FakeOpenAIServer(responses, latency=args.latency, port=args.port).start()
+    print(f"Fake OpenAI server on {fake.base_url} (set OPENAI_BASE_URL to this)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
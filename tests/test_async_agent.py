@@ -0,0 +1,102 @@
+import time
+import asyncio
+
+from conftest import FakeOllama, FakeAsyncOllama, FakeEpisodic
+from src.intent_analyser.fast_router import FastRouter
+from src.tools import Tools
+
+
+def test_handle_sync_wrapper(make_agent):
+    agent = make_agent()
+    out = agent.handle("what is 2+2")
+    assert out["tool_out"]["tool"] == "calculator"
+    assert out["tool_out"]["result"]["result"] == 4
+    assert out["final"] == "2+2 = **4**"
+    assert out["sentiment"]["label"] == "NEUTRAL"
+    assert out["meta"]["llm"]["total"] == {}
+
+
+def test_pre_stages_run_concurrently(make_agent):
+    async_ollama = FakeAsyncOllama(delay=0.3)
+    agent = make_agent(async_ollama=async_ollama, episodic=FakeEpisodic(delay=0.3))
+    agent.sentiment.prefilter = False
+    start = time.perf_counter()
+    out = asyncio.run(agent.handle_async("add two and two for me"))
+    elapsed = time.perf_counter() - start
+    # intent + sentiment + retrieval overlap, then tool selection; calculator output is templated
+    assert elapsed < 0.9
+    assert set(async_ollama.calls) == {"analyze_intent", "analyze_sentiment", "select_tool"}
+    assert out["intent_analysis"]["primary_intent"] == "calculate"
+
+
+def test_negative_sentiment_escalates(make_agent):
+    ollama = FakeOllama(responses={"analyze_sentiment": {"label": "NEGATIVE", "score": 0.95, "reasoning": "angry"}})
+    out = make_agent(ollama=ollama).handle("this is terrible")
+    assert out["final"].startswith("Escalating")
+    assert "select_tool" not in ollama.calls
+
+
+def test_handle_stream_events(make_agent):
+    for async_ollama in (None, FakeAsyncOllama()):
+        agent = make_agent(async_ollama=async_ollama, response_policy={"calculator": "llm"})
+        events = list(agent.handle_stream("add two and two for me"))
+        names = [e["event"] for e in events]
+        assert names[:3] == ["intent", "sentiment", "tool"]
+        assert names[-1] == "done"
+        tokens = "".join(e["data"] for e in events if e["event"] == "token")
+        assert tokens == "scripted reply"
+        assert events[-1]["data"]["final"] == "scripted reply"
+
+
+def test_fused_mode_single_round_trip(make_agent):
+    ollama = FakeOllama()
+    out = make_agent(ollama=ollama, pipeline_mode="fused").handle("add two and two for me")
+    assert ollama.calls == ["triage_message"]
+    assert out["tool_out"]["result"]["result"] == 4
+    assert out["intent_analysis"]["primary_intent"] == "calculate"
+
+
+def test_fused_mode_keeps_escalation_gate(make_agent):
+    negative = {"label": "negative", "score": 0.9, "reasoning": "furious"}
+    ollama = FakeOllama(responses={"triage_message": {"intent_analysis": {"primary_intent": "complain"}, "sentiment": negative, "tool_selection": {}}})
+    out = make_agent(ollama=ollama, pipeline_mode="fused").handle("this is terrible")
+    assert out["final"].startswith("Escalating")
+    assert out["meta"]["sentiment"]["label"] == "NEGATIVE"
+    assert "llm" in out["meta"]
+
+
+def test_fast_path_skips_llm_routing(make_agent):
+    ollama = FakeOllama()
+    agent = make_agent(ollama=ollama)
+    agent.handle("explain this to me")
+    before = len(ollama.calls)
+    out = agent.handle("what is 2+2*7?")
+    assert "analyze_intent" not in ollama.calls[before:] and "select_tool" not in ollama.calls[before:]
+    assert out["tool_out"]["result"]["result"] == 16
+    assert out["fast_path"]["rule"] == "arithmetic"
+    stats = agent.fast_router.stats()
+    assert stats["hits"] == 1 and stats["turns"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_fast_router_rules_are_anchored():
+    router = FastRouter()
+    for message in ["Can you verify my account bob@x.com was deleted?", "remember my email is a@b.com, it is valid", "2024-01-15", "555-1234"]:
+        assert router.route(message) is None
+    assert router.route("please verify the email Bob@X.com")["arguments"] == {"data": "Bob@X.com", "data_type": "email"}
+    assert router.route("is 10.0.0.1 a valid ip?")["rule"] == "validate_ip"
+    assert router.route("what is 10-3")["arguments"] == {"expr": "10-3"}
+
+
+def test_list_template_keeps_item_case():
+    reply = Tools.format_list_operation(Tools.list_operations(["Banana", "Apple", "cherry"], "sort"))
+    assert reply == "Sorted: ['Apple', 'Banana', 'cherry']."
+
+
+def test_response_policy_can_force_llm_synthesis(make_agent):
+    ollama = FakeOllama()
+    templated = make_agent(ollama=ollama).handle("add two and two for me")
+    assert "text" not in ollama.calls
+    assert "LLM synthesis skipped" in " ".join(templated["logs"])
+    forced = make_agent(ollama=ollama, response_policy={"calculator": "llm"}).handle("add two and two for me")
+    assert forced["final"] == "scripted reply"
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import pytest
+
+from src.store.background_executor import BackgroundExecutor
+
+
+def test_pending_jobs_coalesce(tmp_path):
+    executor = BackgroundExecutor(path=str(tmp_path / "jobs.sqlite3"), max_workers=2)
+    gate = threading.Event()
+    seen = []
+    executor.register("block", lambda job: gate.wait(5))
+    executor.register("summarize", lambda job: seen.append(job["n"]))
+    # Occupy both workers so the summaries queue up behind them
+    executor.submit("block")
+    executor.submit("block")
+    for n in range(10):
+        executor.submit("summarize", {"n": n}, coalesce_key="summary")
+    gate.set()
+    assert executor.flush(timeout=5)
+    stats = executor.stats()
+    assert seen == [9]
+    assert stats["coalesced"] == 9
+    assert stats["pending"] == 0
+    executor.shutdown()
+
+
+def test_jobs_survive_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first = BackgroundExecutor(path=path)
+    # No handler registered, so the job stays queued on disk
+    first.submit("extract", {"text": "remember me"})
+    first.shutdown(flush=False)
+
+    second = BackgroundExecutor(path=path)
+    seen = []
+    second.register("extract", lambda job: seen.append(job["text"]))
+    assert second.flush(timeout=5)
+    assert seen == ["remember me"]
+    second.shutdown()
+
+
+def test_bounded_workers_and_backpressure(tmp_path):
+    executor = BackgroundExecutor(path=str(tmp_path / "jobs.sqlite3"), max_workers=2, max_pending=3)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(job):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+
+    accepted = [executor.submit("work", {"i": i}) for i in range(5)]
+    assert accepted.count(False) == 2
+    assert executor.stats()["rejected"] == 2
+
+    executor.register("work", work)
+    assert executor.flush(timeout=5)
+    assert max(peak) <= 2
+    assert executor.stats()["completed"] == 3
+    executor.shutdown()
+
+
+def test_failed_jobs_retry_then_drop(tmp_path):
+    executor = BackgroundExecutor(path=str(tmp_path / "jobs.sqlite3"), max_attempts=2)
+    calls = []
+
+    def boom(job):
+        calls.append(1)
+        raise RuntimeError("nope")
+
+    executor.register("boom", boom)
+    executor.submit("boom")
+    assert executor.flush(timeout=5)
+    stats = executor.stats()
+    assert len(calls) == 2
+    assert stats["retried"] == 1 and stats["failed"] == 1
+    executor.shutdown()
+
+
+def test_owners_sharing_an_executor_run_their_own_jobs(tmp_path):
+    executor = BackgroundExecutor(path=str(tmp_path / "jobs.sqlite3"))
+    seen = {"a": [], "b": []}
+    owners = {}
+    for name in ("a", "b"):
+        owners[name] = executor.claim_owner("memory:/shared")
+        executor.register("extract", seen[name].append, owner=owners[name])
+    assert owners == {"a": "memory:/shared", "b": "memory:/shared#2"}
+    with pytest.raises(ValueError, match="already has a handler"):
+        executor.register("extract", [].append, owner=owners["a"])
+    executor.submit("extract", {"n": 1}, coalesce_key="extract", owner=owners["a"])
+    executor.submit("extract", {"n": 2}, coalesce_key="extract", owner=owners["b"])
+    assert executor.flush(timeout=5)
+    assert seen == {"a": [{"n": 1}], "b": [{"n": 2}]}
+    executor.shutdown(flush=False)
+
+
+def test_second_agent_on_the_default_executor(make_agent, monkeypatch, tmp_path):
+    from src.store import background_executor
+    monkeypatch.setattr(background_executor, "_default_executor", BackgroundExecutor(path=str(tmp_path / "shared.sqlite3")))
+    first = make_agent(background=None)
+    second = make_agent(background=None)
+    assert first.background is second.background
+    assert first.memory_types.owner != second.memory_types.owner
+    first.background.shutdown(flush=False)
+
+
+def test_processes_sharing_a_queue_claim_each_job_once(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    seen = []
+    lock = threading.Lock()
+
+    def handle(job):
+        with lock:
+            seen.append(job["n"])
+
+    executors = [BackgroundExecutor(path=path, max_workers=4) for _ in range(2)]
+    for n in range(50):
+        executors[n % 2].submit("extract", {"n": n})
+    for executor in executors:
+        executor.register("extract", handle)
+    assert all(executor.flush(timeout=10) for executor in executors)
+    assert sorted(seen) == list(range(50))
+    for executor in executors:
+        executor.shutdown(flush=False)
+
+
+def test_only_jobs_of_dead_processes_are_requeued(tmp_path):
+    import socket
+    import subprocess
+    import sys
+    path = str(tmp_path / "jobs.sqlite3")
+    first = BackgroundExecutor(path=path)
+    first.submit("extract", {"n": 1})
+    first.submit("extract", {"n": 2})
+    first.shutdown(flush=False)
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    host = socket.gethostname()
+    first._db.execute("UPDATE jobs SET status = 'running', worker = ? WHERE payload = ?", (f"{host}:{os.getppid()}", '{"n": 1}'))
+    first._db.execute("UPDATE jobs SET status = 'running', worker = ? WHERE payload = ?", (f"{host}:{dead.pid}", '{"n": 2}'))
+    first._db.commit()
+
+    second = BackgroundExecutor(path=path)
+    rows = dict(second._db.execute("SELECT payload, status FROM jobs").fetchall())
+    assert rows == {'{"n": 1}': "running", '{"n": 2}': "pending"}
+    second.shutdown(flush=False)
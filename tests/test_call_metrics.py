@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.agent.pipeline import Pipeline, Stage
+from src.llm_client.call_metrics import CallMetrics, current_turn, stage_scope, summarize
+from src.llm_client.ollama_client import OllamaClient
+
+
+class UsageCompletions:
+    def create(self, **kwargs):
+        call = SimpleNamespace(name=kwargs["functions"][0]["name"], arguments=json.dumps({"ok": True}))
+        message = SimpleNamespace(function_call=call, content=None)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=100)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def _client(monkeypatch, metrics):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    client = OllamaClient(model="gpt-4o-mini", metrics=metrics)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=UsageCompletions()))
+    return client
+
+
+def test_calls_are_recorded_with_stage_and_tokens(monkeypatch):
+    metrics = CallMetrics()
+    client = _client(monkeypatch, metrics)
+    with stage_scope("intent"):
+        client.chat([{"role": "user", "content": "hi"}], functions=[{"name": "analyze_intent", "parameters": {}}])
+    client.chat([{"role": "user", "content": "hi"}], functions=[{"name": "rate_importance", "parameters": {}}])
+
+    records = metrics.records()
+    assert [r["stage"] for r in records] == ["intent", None]
+    assert records[0]["function"] == "analyze_intent"
+    assert records[0]["prompt_tokens"] == 1000 and records[0]["completion_tokens"] == 100
+    assert records[0]["cost"] > 0
+
+    by_stage = metrics.summary("stage")
+    assert by_stage["intent"]["calls"] == 1
+    assert by_stage["unknown"]["prompt_tokens"] == 1000
+
+
+def test_pipeline_attributes_calls_to_stages_and_turn(monkeypatch):
+    metrics = CallMetrics()
+    client = _client(monkeypatch, metrics)
+
+    def classify(logs):
+        client.chat([{"role": "user", "content": "x"}], functions=[{"name": "analyze_sentiment", "parameters": {}}])
+        return {"label": "ok"}
+
+    async def run():
+        calls = []
+        current_turn.set(calls)
+        await Pipeline([Stage("sentiment", classify, outputs=["label"])]).run({}, [])
+        return calls
+
+    calls = asyncio.run(run())
+    assert [c["stage"] for c in calls] == ["sentiment"]
+    assert metrics.records(stage="sentiment")
+
+
+def test_percentiles_and_ring_buffer():
+    metrics = CallMetrics(capacity=100)
+    for i in range(1, 201):
+        metrics.record("gpt-4o", "select_tool", i / 1000)
+    assert len(metrics.records()) == 100
+    total = summarize(metrics.records(), None)
+    assert total["calls"] == 100
+    assert total["p50"] == 0.15
+    assert total["p95"] == 0.195
+    assert total["p99"] == 0.199
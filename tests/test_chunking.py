@@ -0,0 +1,99 @@
+import os
+import time
+
+from src.store.chunking import chunk_text
+from src.store.document_store import DocumentStore, DocumentWatcher
+from src.store.embeddings import HashingEmbeddingFunction
+
+TEXT = "\n\n".join(
+    " ".join(f"Paragraph {p} sentence {s} mentions topic{p}x{s}." for s in range(6)) for p in range(20)
+)
+
+
+def test_chunks_are_bounded_contiguous_spans():
+    chunks = chunk_text(TEXT, chunk_size=300, overlap=80)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk["text"]) <= 300
+        assert TEXT[chunk["start"]:chunk["end"]] == chunk["text"]
+    assert [c["index"] for c in chunks] == list(range(len(chunks)))
+    assert chunks[0]["start"] == 0 and chunks[-1]["end"] == len(TEXT)
+
+
+def test_chunks_overlap_and_prefer_paragraph_breaks():
+    chunks = chunk_text(TEXT, chunk_size=300, overlap=80)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert nxt["start"] > prev["start"]
+        assert prev["end"] - nxt["start"] <= 80
+    # Most chunks end where a paragraph ends
+    ends_at_break = sum(TEXT[c["end"]:c["end"] + 2] in ("\n\n", "") for c in chunks)
+    assert ends_at_break >= len(chunks) // 2
+
+
+def test_oversized_words_and_whole_file_mode():
+    chunks = chunk_text("x" * 2500, chunk_size=1000, overlap=100)
+    assert [(c["start"], c["end"]) for c in chunks] == [(0, 1000), (1000, 2000), (2000, 2500)]
+    assert chunk_text("  whole file  ", chunk_size=0) == [{"index": 0, "text": "whole file", "start": 2, "end": 12}]
+    assert chunk_text("   \n\n ", chunk_size=100) == []
+
+
+def test_search_returns_matching_chunk_with_offsets(tmp_path):
+    (tmp_path / "notes.txt").write_text(TEXT)
+    store = DocumentStore(str(tmp_path), embedding_function=HashingEmbeddingFunction(), chunk_size=300, chunk_overlap=80)
+    hit = store.search("topic13x2 topic13x3", k=1)[0]
+    assert hit["source"] == "notes.txt"
+    assert "topic13x2" in hit["text"]
+    assert TEXT[hit["start"]:hit["end"]] == hit["text"]
+    # Reopening does not index the file twice
+    count = store.collection.count()
+    assert DocumentStore(str(tmp_path), embedding_function=HashingEmbeddingFunction(), chunk_size=300, chunk_overlap=80).collection.count() == count
+
+
+def _store(path, **kwargs):
+    return DocumentStore(str(path), embedding_function=HashingEmbeddingFunction(), chunk_size=300, chunk_overlap=80, **kwargs)
+
+
+def test_incremental_index_reembeds_only_changed_files(tmp_path):
+    (tmp_path / "a.txt").write_text(TEXT)
+    (tmp_path / "b.txt").write_text("Bananas are yellow.\n\nThey grow in bunches.")
+    store = _store(tmp_path, index=False)
+    assert store.index() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "errors": 0, "chunks": store.collection.count()}
+
+    # Touching without changing content costs a hash, not an embedding
+    os.utime(tmp_path / "a.txt", ns=(1, 1))
+    (tmp_path / "b.txt").write_text("Cherries are red.")
+    counts = store.index()
+    assert (counts["updated"], counts["unchanged"], counts["chunks"]) == (1, 1, 1)
+    assert store.search("cherries red", k=1)[0]["text"] == "Cherries are red."
+    assert not store.collection.get(where={"source": "b.txt"}, include=["documents"])["documents"][1:]
+
+    (tmp_path / "b.txt").unlink()
+    assert store.index()["removed"] == 1
+    assert store.collection.get(where={"source": "b.txt"}, include=[])["ids"] == []
+    # A fresh handle reads the manifest and finds nothing to do
+    assert _store(tmp_path, index=False).index()["unchanged"] == 1
+
+
+def test_files_indexed_before_the_manifest_are_migrated(tmp_path):
+    (tmp_path / "a.txt").write_text("Apples are green.")
+    (tmp_path / "gone.txt").write_text("This file was deleted.")
+    store = _store(tmp_path, index=False)
+    store.collection.add(ids=["DOC-a.txt", "DOC-gone.txt"], documents=["Apples are green.", "This file was deleted."],
+                         metadatas=[{"source": "a.txt"}, {"source": "gone.txt"}])
+    (tmp_path / "gone.txt").unlink()
+    counts = store.index()
+    assert (counts["updated"], counts["removed"]) == (1, 1)
+    assert store.collection.get(include=[])["ids"] == ["DOC-a.txt#0"]
+
+
+def test_watcher_picks_up_new_files(tmp_path):
+    store = _store(tmp_path)
+    watcher = DocumentWatcher(store, interval=0.05).start()
+    try:
+        (tmp_path / "new.txt").write_text("Dragonfruit is pink.")
+        deadline = time.time() + 5
+        while not store.search("dragonfruit pink", k=1) and time.time() < deadline:
+            time.sleep(0.05)
+        assert store.search("dragonfruit pink", k=1)[0]["source"] == "new.txt"
+    finally:
+        watcher.stop()
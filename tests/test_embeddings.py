@@ -0,0 +1,19 @@
+from src.store.embeddings import HashingEmbeddingFunction
+
+
+def test_hashing_embedding_is_deterministic_and_normalized():
+    ef = HashingEmbeddingFunction(dim=64)
+    first, second, empty = ef(["the cat sat on the mat", "the cat sat on the mat", ""])
+    assert len(first) == 64
+    assert list(first) == list(second)
+    assert abs(sum(v * v for v in first) - 1.0) < 1e-5
+    assert abs(sum(v * v for v in empty) - 1.0) < 1e-5
+    assert HashingEmbeddingFunction.build_from_config(ef.get_config()).dim == 64
+
+
+def test_similar_text_is_closer_than_unrelated_text():
+    ef = HashingEmbeddingFunction()
+    base, near, far = ef(["my cat likes fish", "my cat likes tuna fish", "quarterly revenue report"])
+    dot = lambda a, b: float(sum(x * y for x, y in zip(a, b)))
+    assert dot(base, near) > dot(base, far)
+
@@ -0,0 +1,18 @@
+import time
+
+from fake_openai_server import FakeOpenAIServer
+from src.llm_client.ollama_client import OllamaClient
+
+
+def test_fake_server_latency_per_function(monkeypatch):
+    with FakeOpenAIServer({"analyze_intent": {"primary_intent": "greet"}}, latency={"analyze_intent": 0.2, "default": 0.0}) as fake:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        client = OllamaClient(model="gpt-4o-mini")
+        start = time.perf_counter()
+        client.chat([{"role": "user", "content": "hi"}])
+        text_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        result = client.chat([{"role": "user", "content": "hi"}], functions=[{"name": "analyze_intent", "parameters": {}}])
+        assert time.perf_counter() - start >= 0.2 > text_elapsed
+        assert result["arguments"] == {"primary_intent": "greet"}
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from src.ingest import ingest
+from src.store.document_store import DocumentStore
+from src.store.embeddings import HashingEmbeddingFunction
+from src.store.loaders import discover, load_html, load_jsonl, load_markdown
+
+
+def test_loaders_extract_text_titles_and_records():
+    html = load_html("<html><head><title>Guide</title><style>p{}</style></head><body><h1>Intro</h1><p>First  part.</p>"
+                     "<script>var x = 1;</script><p>Second &amp; last.</p></body></html>")[0]
+    assert html == {"text": "Intro\n\nFirst part.\n\nSecond & last.", "title": "Guide"}
+
+    raw = "---\ntags: [a]\n---\n# Setup\n\nInstall it."
+    md = load_markdown(raw)[0]
+    assert md["title"] == "Setup" and len(md["text"]) == len(raw) and md["text"].strip().startswith("# Setup")
+
+    lines = [json.dumps({"id": 7, "title": "Seven", "text": "lucky"}), "not json", json.dumps({"content": "no id"}), json.dumps({"other": 1})]
+    assert load_jsonl("\n".join(lines)) == [{"text": "lucky", "title": "Seven", "record": "7"}, {"text": "no id", "title": "", "record": "3"}]
+
+
+def test_discover_is_recursive_and_skips_hidden(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / ".chroma").mkdir()
+    for name in ("top.txt", "a/page.html", "a/b/notes.md", "a/b/data.jsonl", "a/image.png", ".hidden.txt", ".chroma/x.txt"):
+        (tmp_path / name).write_text("x")
+    assert [name for _, name in discover(str(tmp_path))] == ["top.txt", "a/page.html", "a/b/data.jsonl", "a/b/notes.md"]
+
+
+def _corpus(root, files=12):
+    (root / "sub").mkdir()
+    for i in range(files):
+        (root / f"doc{i}.txt").write_text("\n\n".join(f"File {i} paragraph {p} talks about item{i}x{p}." for p in range(8)))
+    (root / "sub" / "faq.jsonl").write_text("\n".join(json.dumps({"id": f"q{i}", "text": f"Question {i} is about widget{i}."}) for i in range(5)))
+    (root / "sub" / "page.html").write_text("<p>The gizmo manual.</p>")
+
+
+def test_parallel_ingest_indexes_every_format(tmp_path):
+    _corpus(tmp_path)
+    result = ingest(str(tmp_path), workers=2, batch_size=16, embedding_function=HashingEmbeddingFunction())
+    assert (result["added"], result["errors"], result["workers"]) == (14, 0, 2)
+    store = DocumentStore(str(tmp_path), embedding_function=HashingEmbeddingFunction(), index=False)
+    assert store.collection.count() == result["chunks"]
+    hit = store.search("question 3 widget3", k=1)[0]
+    assert (hit["source"], hit["record"], hit["text"]) == ("sub/faq.jsonl", "q3", "Question 3 is about widget3.")
+    # Embeddings computed in the workers match the ones the parent would compute
+    assert store.search("The gizmo manual.", k=1)[0]["score"] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_interrupted_ingest_resumes(tmp_path, monkeypatch):
+    _corpus(tmp_path)
+    monkeypatch.setattr("src.store.document_store.CHECKPOINT_SECONDS", 3600)
+    store = DocumentStore(str(tmp_path), embedding_function=HashingEmbeddingFunction(), index=False, chunk_size=120, chunk_overlap=20)
+
+    def interrupt(stats):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        store.index(batch_size=8, progress=interrupt)
+    resumed = store.index(batch_size=8)
+    assert 0 < resumed["added"] < 14
+    assert store.index()["unchanged"] == 14
+    with open(store.manifest_path) as f:
+        manifest = json.load(f)["files"]
+    assert sum(entry["chunks"] for entry in manifest.values()) == store.collection.count()
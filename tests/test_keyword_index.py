@@ -0,0 +1,74 @@
+import src.store.keyword_index as keyword_index
+from src.store.document_store import DocumentStore
+from src.store.embeddings import HashingEmbeddingFunction
+from src.store.keyword_index import KeywordIndex
+
+FILLER = "\n\n".join(f"The service restarted after the deploy on day {d} and the queue drained normally." for d in range(30))
+
+
+def _store(path, **kwargs):
+    return DocumentStore(str(path), embedding_function=HashingEmbeddingFunction(), chunk_size=300, chunk_overlap=0, **kwargs)
+
+
+def _corpus(path):
+    (path / "runbook.txt").write_text(FILLER + "\n\nIf the worker logs ERR-40213 the license key SKU_77-X expired; rotate it." + "\n\n" + FILLER)
+    for i in range(5):
+        (path / f"notes{i}.txt").write_text(FILLER)
+
+
+def test_identifiers_are_found_by_keyword_and_hybrid_search(tmp_path):
+    _corpus(tmp_path)
+    store = _store(tmp_path)
+    assert store.keywords.count() == store.collection.count()
+    for mode in ("keyword", "hybrid"):
+        hit = store.search("what does err-40213 mean", k=1, mode=mode)[0]
+        assert hit["source"] == "runbook.txt" and "ERR-40213" in hit["text"]
+        assert 0 < hit["score"] <= 1.0
+    assert "keyword" in store.search("SKU_77-X", k=1, mode="hybrid")[0]["matched"]
+    assert all(h["score"] <= 1.0 for h in store.search("deploy queue", k=5, mode="vector"))
+
+
+def test_keyword_index_follows_edits_and_deletes(tmp_path):
+    _corpus(tmp_path)
+    store = _store(tmp_path)
+    (tmp_path / "runbook.txt").write_text("Short runbook: ERR-55555 means the disk is full.")
+    (tmp_path / "notes0.txt").unlink()
+    store.index()
+    assert store.keywords.count() == store.collection.count()
+    assert store.search("ERR-40213", mode="keyword") == []
+    assert store.search("ERR-55555", k=1, mode="keyword")[0]["source"] == "runbook.txt"
+    assert not any(h["source"] == "notes0.txt" for h in store.search("deploy", k=50, mode="keyword"))
+
+
+def test_keyword_index_is_rebuilt_when_out_of_sync(tmp_path):
+    _corpus(tmp_path)
+    store = _store(tmp_path)
+    store.keywords.clear()
+    assert store.search("ERR-40213", mode="keyword") == []
+    _store(tmp_path)
+    assert store.keywords.count() == store.collection.count()
+    assert store.search("ERR-40213", k=1, mode="keyword")[0]["source"] == "runbook.txt"
+
+
+def test_query_syntax_is_never_interpreted(tmp_path):
+    index = KeywordIndex(str(tmp_path / "kw.sqlite3"))
+    index.upsert(["a", "b"], ["alpha NOT beta", "gamma \"quoted\" delta*"], [{"source": "x"}, {"source": "y"}])
+    assert KeywordIndex.match_expression('NOT "alpha" OR (beta* NEAR') == '"not" OR "alpha" OR "or" OR "beta" OR "near"'
+    assert [r[0] for r in index.search('alpha" OR "x')] == ["a"]
+    assert index.search("*) :") == []
+    index.delete(source="x")
+    assert index.count() == 1
+    index.close()
+
+
+def test_common_terms_are_pruned_from_large_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "MAX_QUERY_POSTINGS", 10)
+    index = KeywordIndex(str(tmp_path / "kw.sqlite3"))
+    index.upsert([f"c{i}" for i in range(40)], [f"common words in chunk {i}" + (" rare-token" if i == 7 else "") for i in range(40)],
+                 [{"source": "x"}] * 40)
+    assert index._selective_tokens(["common", "rare-token", "missing"]) == ["rare-token", "missing"]
+    assert [r[0] for r in index.search("common rare-token", k=3)] == ["c7"]
+    assert len(index.search("common words", k=50)) == 40
+    index.upsert(["cafe"], ["menu of the Café Noir"], [{"source": "y"}])
+    assert [r[0] for r in index.search("common café", k=3)] == ["cafe"]
+    index.close()
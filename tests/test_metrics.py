@@ -0,0 +1,62 @@
+import gc
+
+from conftest import FakeOllama
+from src.llm_client.call_metrics import CallMetrics
+from src.metrics import AgentMetrics, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0))
+    latency.observe(0.05, stage="intent")
+    latency.observe(0.5, stage="intent")
+    latency.observe(5.0, stage="intent")
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="intent",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="intent",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="intent",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="intent"} 3' in text
+
+
+def test_agent_metrics_exposition(make_agent):
+    agent = make_agent()
+    calls = CallMetrics()
+    metrics = AgentMetrics(agent, calls)
+
+    result = agent.handle("add two and two for me")
+    metrics.observe_turn(result)
+    metrics.observe_request("/chat", 0.2, 200)
+    calls.record("gpt-4o", "select_tool", 0.3, usage=type("Usage", (), {"prompt_tokens": 120, "completion_tokens": 30})())
+    calls.record("gpt-4o", "select_tool", 0.1, error="boom")
+
+    text = metrics.render()
+    assert 'agent_chat_requests_total{endpoint="/chat",status="200"} 1' in text
+    assert 'agent_stage_seconds_count{stage="tool_select"} 1' in text
+    assert 'agent_llm_calls_total{model="gpt-4o",function="select_tool",cached="false"} 2' in text
+    assert 'agent_llm_errors_total{model="gpt-4o"} 1' in text
+    assert 'agent_llm_tokens_total{model="gpt-4o",type="prompt"} 120' in text
+    assert 'agent_background_queue_depth{state="pending"}' in text
+    assert "agent_threads " in text
+
+
+def test_listeners_are_dropped_with_their_metrics():
+    calls = CallMetrics()
+    closed, collected = AgentMetrics(None, calls), AgentMetrics(None, calls)
+    closed.close()
+    del collected
+    gc.collect()
+    calls.record("gpt-4o", "select_tool", 0.1)
+    assert 'agent_llm_calls_total{' not in closed.render()
+    assert calls._listeners == []
+
+
+def test_escalated_turns_record_stage_timings(make_agent):
+    negative = {"label": "negative", "score": 0.9, "reasoning": "furious"}
+    ollama = FakeOllama(responses={"analyze_sentiment": negative})
+    agent = make_agent(ollama=ollama)
+    metrics = AgentMetrics(agent, CallMetrics())
+    result = agent.handle("this is terrible, I hate it")
+    assert result["final"].startswith("Escalating")
+    assert {"sentiment", "gate"} <= set(result["timings"])
+    metrics.observe_turn(result)
+    assert 'agent_stage_seconds_count{stage="gate"} 1' in metrics.render()
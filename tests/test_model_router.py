@@ -0,0 +1,63 @@
+import json
+
+from src.llm_client.call_metrics import CallMetrics
+from src.llm_client.model_router import ModelRouter, route_scope
+
+
+SIMPLE = {"complexity": "simple", "urgency": "low"}
+COMPLEX = {"complexity": "complex", "urgency": "high"}
+
+
+def test_simple_turns_stay_on_the_small_model():
+    router = ModelRouter(metrics=CallMetrics())
+    assert router.select("intent").model == "gpt-4o-mini"
+    assert router.select("tool_select", SIMPLE).model == "gpt-4o-mini"
+    assert router.select("synthesis", SIMPLE, tool="calculator", payload_tokens=200).model == "gpt-4o-mini"
+
+
+def test_complexity_payload_and_tool_escalate_to_the_large_model():
+    router = ModelRouter(metrics=CallMetrics())
+    assert router.select("tool_select", COMPLEX).key == "tool_select:complex"
+    assert router.select("synthesis", SIMPLE, payload_tokens=2000).key == "synthesis:large_payload"
+    route = router.select("synthesis", {"complexity": "moderate"}, tool="search_docs")
+    assert route.key == "synthesis:retrieval" and route.model == "gpt-4o"
+    assert router.select("synthesis", {"complexity": "moderate"}, tool="calculator").model == "gpt-4o-mini"
+
+
+def test_routes_from_file_and_env(tmp_path, monkeypatch):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps({"stages": {"intent": [{"name": "urgent", "when": {"urgency": ["high"]}, "model": "large"}]}}))
+    monkeypatch.setenv("MODEL_ROUTES_PATH", str(path))
+    monkeypatch.setenv("MODEL_LARGE", "big-model")
+    router = ModelRouter.from_env()
+    assert router.select("intent", COMPLEX).model == "big-model"
+    # No rule matched: fall back to the small model
+    assert router.select("intent", SIMPLE).key == "intent:fallback"
+    # Stages not in the file keep the defaults
+    assert router.select("tool_select", COMPLEX).model == "big-model"
+
+
+def test_stats_join_decisions_with_call_metrics():
+    metrics = CallMetrics()
+    router = ModelRouter(metrics=metrics)
+    route = router.select("synthesis", COMPLEX)
+    with route_scope(route):
+        metrics.record(route.model, None, 0.8)
+    metrics.record("gpt-4o-mini", None, 0.1)
+    router.select("synthesis", SIMPLE)
+
+    stats = router.stats()
+    assert stats["synthesis:complex"]["decisions"] == 1
+    assert stats["synthesis:complex"]["calls"] == 1 and stats["synthesis:complex"]["p50"] == 0.8
+    assert stats["synthesis:default"] == {"decisions": 1}
+    assert metrics.summary("route")["synthesis:complex"]["calls"] == 1
+
+
+def test_agent_logs_routed_models(make_agent):
+    agent = make_agent(router=ModelRouter(metrics=CallMetrics()))
+    agent.pipeline_mode = "staged"
+    agent.fast_router = None
+    agent.response_policy["calculator"] = "llm"
+    out = agent.handle("please work out two plus two")
+    assert "[MODEL] tool_select:default -> gpt-4o-mini" in out["logs"]
+    assert "[MODEL] synthesis:default -> gpt-4o-mini" in out["logs"]
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import FakeOllama
+from src.agent.pipeline import Pipeline, Stage, PipelineHalt
+
+
+def test_independent_stages_run_concurrently():
+    async def a(logs):
+        await asyncio.sleep(0.2)
+        return {"a": 1}
+
+    def b(logs):
+        time.sleep(0.2)
+        return {"b": 2}
+
+    def total(a, b, logs):
+        logs.append(f"sum={a + b}")
+        return {"total": a + b}
+
+    pipeline = Pipeline([Stage("a", a, outputs=["a"]), Stage("b", b, outputs=["b"]), Stage("total", total, inputs=["a", "b"], outputs=["total"])])
+    logs = []
+    start = time.perf_counter()
+    context, timings = asyncio.run(pipeline.run({}, logs))
+    assert time.perf_counter() - start < 0.35
+    assert context["total"] == 3
+    assert set(timings) == {"a", "b", "total"}
+    assert "sum=3" in logs and any(l.startswith("[TIMING] total") for l in logs)
+
+
+def test_fallback_and_halt():
+    def broken(logs):
+        raise RuntimeError("boom")
+
+    def fallback(error, logs, **inputs):
+        logs.append(f"fallback: {error}")
+        return {"x": 0}
+
+    def gate(x, logs):
+        raise PipelineHalt({"final": f"halted at {x}"})
+
+    def never(logs, **_):
+        raise AssertionError("must not run")
+
+    pipeline = Pipeline([Stage("broken", broken, outputs=["x"], fallback=fallback), Stage("gate", gate, inputs=["x"], outputs=["ok"]), Stage("after", never, inputs=["ok"])])
+    logs = []
+    with pytest.raises(PipelineHalt) as halt:
+        asyncio.run(pipeline.run({}, logs))
+    assert halt.value.result == {"final": "halted at 0"}
+    assert "fallback: boom" in logs
+
+
+def test_unsatisfiable_and_duplicate_outputs_rejected():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda logs: {}, outputs=["x"]), Stage("b", lambda logs: {}, outputs=["x"])])
+    with pytest.raises(ValueError):
+        asyncio.run(Pipeline([Stage("a", lambda y, logs: {}, inputs=["y"])]).run({}, []))
+
+
+def test_failed_triage_falls_back_to_staged(make_agent):
+    ollama = FakeOllama(responses={"triage_message": None})
+    ollama.responses.pop("triage_message")
+    out = make_agent(ollama=ollama, pipeline_mode="fused").handle("add two and two for me")
+    assert ollama.calls[:1] == ["triage_message"]
+    assert "analyze_intent" in ollama.calls and "select_tool" in ollama.calls
+    assert out["tool_out"]["tool"] == "calculator"
+    assert set(out["timings"]) >= {"triage", "gate", "tool_select", "tool_run", "synthesis", "post_processing"}
@@ -0,0 +1,38 @@
+import json
+
+from src.llm_client.prompt_builder import PromptBuilder, count_tokens, fit_value
+
+
+def test_small_payload_is_sent_compact_and_untouched():
+    messages, report = PromptBuilder("synthesis", budget=500).build("system", {"tool_output": {"result": 4}}, shrinkable={"tool_output": "head"})
+    assert messages[1]["content"] == '{"tool_output":{"result":4}}'
+    assert report["dropped_tokens"] == 0
+    assert report["truncated"] == []
+
+
+def test_large_tool_output_is_trimmed_to_budget():
+    memories = [{"id": f"MEM-{i}", "content": "the user likes hiking in the alps " * 5} for i in range(100)]
+    payload = {"user_message": "what do you know about me", "tool_output": {"tool": "list_memories", "result": memories}}
+    messages, report = PromptBuilder("synthesis", budget=600).build("system", payload, shrinkable={"tool_output": "head"}, context="User profile: hiker")
+    assert report["tokens"] <= 600
+    assert report["dropped_tokens"] > 1000
+    assert report["truncated"] == ["tool_output"]
+    body = json.loads(messages[1]["content"])
+    assert body["user_message"] == "what do you know about me"
+    assert body["tool_output"]["result"][0]["id"] == "MEM-0"
+    assert "User profile: hiker" in messages[0]["content"]
+
+
+def test_truncation_is_deterministic_and_keeps_tail():
+    conversations = [{"user": f"message {i}"} for i in range(300)]
+    first, tokens = fit_value(conversations, 200, keep="tail")
+    second, _ = fit_value(conversations, 200, keep="tail")
+    assert first == second
+    assert tokens <= 200
+    assert first[-1] == {"user": "message 299"}
+    assert "omitted" in first[0]
+
+
+def test_count_tokens_is_monotonic():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") < count_tokens("hello world, and goodbye to all of it")
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openai_server import FakeOpenAIServer
+from src.llm_client.call_metrics import CallMetrics
+from src.llm_client.ollama_client import OllamaClient
+from src.llm_client.rate_limiter import LLMRateLimiter
+from src.llm_client.resilience import ResiliencePolicy
+
+
+def _waiter(limiter, lane, order):
+    def run():
+        ticket = limiter.acquire(lane)
+        order.append(lane)
+        limiter.release(ticket)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_foreground_is_admitted_before_background():
+    limiter = LLMRateLimiter(max_concurrency=1, requests_per_second=0, tokens_per_minute=0)
+    held = limiter.acquire("foreground")
+    order = []
+    background = _waiter(limiter, "background", order)
+    time.sleep(0.05)
+    foreground = _waiter(limiter, "foreground", order)
+    time.sleep(0.05)
+    assert limiter.stats()["lanes"]["background"]["queue_depth"] == 1
+    limiter.release(held)
+    background.join(2)
+    foreground.join(2)
+    assert order == ["foreground", "background"]
+
+
+def test_background_lane_is_capped():
+    limiter = LLMRateLimiter(max_concurrency=4, background_concurrency=1, requests_per_second=0, tokens_per_minute=0)
+    first = limiter.acquire("background")
+    order = []
+    waiting = _waiter(limiter, "background", order)
+    time.sleep(0.05)
+    assert order == []
+    # Foreground capacity is untouched by the queued background work
+    limiter.release(limiter.acquire("foreground"))
+    limiter.release(first)
+    waiting.join(2)
+    assert order == ["background"]
+
+
+def test_requests_per_second_and_tokens_per_minute():
+    limiter = LLMRateLimiter(max_concurrency=100, requests_per_second=20, tokens_per_minute=0)
+    start = time.monotonic()
+    for _ in range(25):
+        limiter.release(limiter.acquire())
+    assert time.monotonic() - start >= 0.2
+
+    limiter = LLMRateLimiter(max_concurrency=100, requests_per_second=0, tokens_per_minute=6000)
+    limiter.release(limiter.acquire(tokens=6000), actual_tokens=6000)
+    start = time.monotonic()
+    limiter.release(limiter.acquire(tokens=50))
+    assert time.monotonic() - start >= 0.4
+    assert limiter.stats()["lanes"]["foreground"]["queued"] == 1
+
+
+def test_async_acquire_records_queue_wait():
+    limiter = LLMRateLimiter(max_concurrency=1, requests_per_second=0, tokens_per_minute=0)
+
+    async def worker():
+        ticket = await limiter.acquire_async()
+        await asyncio.sleep(0.05)
+        limiter.release(ticket)
+
+    async def run():
+        await asyncio.gather(*(worker() for _ in range(3)))
+
+    asyncio.run(run())
+    stats = limiter.stats()["lanes"]["foreground"]
+    assert stats["admitted"] == 3 and stats["queued"] == 2
+    assert stats["p95_wait"] >= 0.05
+
+
+def test_client_calls_share_the_limiter(monkeypatch):
+    with FakeOpenAIServer(responses={"select_tool": {"intent": "calculator"}}, latency=0.1) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        metrics = CallMetrics()
+        limiter = LLMRateLimiter(max_concurrency=1, requests_per_second=0, tokens_per_minute=0)
+        client = OllamaClient(metrics=metrics, limiter=limiter, resilience=ResiliencePolicy(hedge_delay=None))
+        functions = [{"name": "select_tool", "parameters": {"type": "object", "properties": {}}}]
+        with ThreadPoolExecutor(3) as pool:
+            list(pool.map(lambda i: client.chat([{"role": "user", "content": f"q{i}"}], functions=functions), range(3)))
+        waits = sorted(r["queue_wait"] for r in metrics.records())
+        assert waits[-1] >= 0.15
+        assert limiter.stats()["lanes"]["foreground"]["in_flight"] == 0
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fake_openai_server import FakeOpenAIServer
+from src.llm_client.call_metrics import CallMetrics
+from src.llm_client.ollama_client import OllamaClient, AsyncOllamaClient
+from src.llm_client.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+INTENT = [{"name": "analyze_intent", "parameters": {"type": "object", "properties": {}}}]
+SELECT = [{"name": "select_tool", "parameters": {"type": "object", "properties": {}}}]
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeOpenAIServer(responses={"analyze_intent": {"primary_intent": "greet"}, "select_tool": {"intent": "calculator"}}) as fake:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        yield fake
+
+
+def _policy(**kwargs):
+    defaults = {"base_delay": 0.01, "max_delay": 0.05, "hedge_delay": None, "breaker": CircuitBreaker(failure_threshold=3, reset_timeout=0.2)}
+    return ResiliencePolicy(**{**defaults, **kwargs})
+
+
+def test_transient_errors_are_retried(server):
+    server.enqueue(status=502)
+    server.enqueue(status=503)
+    policy = _policy()
+    client = OllamaClient(resilience=policy, metrics=CallMetrics())
+    result = client.chat(MESSAGES, functions=SELECT)
+    assert result["arguments"] == {"intent": "calculator"}
+    assert len(server.requests) == 3
+    assert policy.stats()["retries"] == 2
+
+
+def test_client_errors_are_not_retried(server):
+    server.enqueue(status=400)
+    policy = _policy()
+    client = OllamaClient(resilience=policy, metrics=CallMetrics())
+    with pytest.raises(Exception, match="OpenAI API error"):
+        client.chat(MESSAGES, functions=SELECT)
+    assert len(server.requests) == 1
+    assert policy.breaker.state == "closed"
+
+
+def test_per_call_timeout(server):
+    server.enqueue(delay=1.0)
+    policy = _policy(timeout=0.2, max_retries=0)
+    client = OllamaClient(resilience=policy, metrics=CallMetrics())
+    start = time.perf_counter()
+    with pytest.raises(Exception):
+        client.chat(MESSAGES, functions=SELECT)
+    assert time.perf_counter() - start < 0.9
+    assert policy.stats()["timeouts"] == 1
+
+
+def test_hedged_classification_call_cuts_tail(server):
+    server.enqueue(delay=1.5)
+    policy = _policy(hedge_delay=0.1)
+    client = OllamaClient(resilience=policy, metrics=CallMetrics())
+    start = time.perf_counter()
+    result = client.chat(MESSAGES, functions=INTENT)
+    assert time.perf_counter() - start < 1.0
+    assert result["arguments"] == {"primary_intent": "greet"}
+    assert policy.stats()["hedges"] == 1 and policy.stats()["hedge_wins"] == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers(server):
+    for _ in range(3):
+        server.enqueue(status=500)
+    policy = _policy(max_retries=0)
+    client = OllamaClient(resilience=policy, metrics=CallMetrics())
+    for _ in range(3):
+        with pytest.raises(Exception):
+            client.chat(MESSAGES, functions=SELECT)
+    assert policy.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.chat(MESSAGES, functions=SELECT)
+    assert len(server.requests) == 3
+
+    time.sleep(0.25)
+    assert client.chat(MESSAGES, functions=SELECT)["arguments"] == {"intent": "calculator"}
+    assert policy.breaker.state == "closed"
+
+
+def test_async_client_retries_and_hedges(server):
+    server.enqueue(status=502)
+    server.enqueue(delay=1.5)
+    policy = _policy(hedge_delay=0.1)
+    client = AsyncOllamaClient(resilience=policy, metrics=CallMetrics())
+
+    async def run():
+        return await client.chat(MESSAGES, functions=INTENT)
+
+    start = time.perf_counter()
+    result = asyncio.run(run())
+    assert time.perf_counter() - start < 1.0
+    assert result["arguments"] == {"primary_intent": "greet"}
+    stats = policy.stats()
+    assert stats["retries"] == 1 and stats["hedges"] == 1
+
+
+def test_streaming_against_fake_server(server):
+    metrics = CallMetrics()
+    client = OllamaClient(resilience=_policy(), metrics=metrics)
+    assert "".join(client.chat(MESSAGES, stream=True)) == "scripted reply"
+    assert metrics.records()[-1]["completion_tokens"] == 2
+
+
+def test_open_circuit_falls_back_to_local_sentiment(server, make_agent):
+    policy = _policy()
+    for _ in range(3):
+        policy.breaker.record_failure()
+    ollama = OllamaClient(resilience=policy, metrics=CallMetrics())
+    agent = make_agent(ollama=ollama)
+    out = agent.handle("this is terrible, add two and two")
+    # No request reaches the backend, yet the escalation gate still works
+    assert server.requests == []
+    assert out["final"].startswith("Escalating")
+    assert out["meta"]["sentiment"]["reasoning"].startswith("Lexicon fallback")
+
+
+def test_hedge_delay_is_not_spent_queueing(monkeypatch):
+    import concurrent.futures
+    from src.llm_client import resilience
+    # A saturated hedge pool must not hold back primaries or make them look slow
+    busy = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    busy.submit(release.wait, 5)
+    monkeypatch.setattr(resilience, "_hedge_pool", busy)
+    policy = _policy(hedge_delay=0.2)
+    try:
+        assert policy._hedged(lambda timeout: "answer", 1.0) == "answer"
+        assert policy.stats()["hedges"] == 0
+    finally:
+        release.set()
+        busy.shutdown()
@@ -0,0 +1,67 @@
+import json
+import time
+from types import SimpleNamespace
+
+from src.llm_client.ollama_client import OllamaClient
+from src.llm_client.response_cache import ResponseCache
+from src.functions.intent_functions import get_intent_function
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if kwargs.get("functions"):
+            call = SimpleNamespace(name=kwargs["functions"][0]["name"], arguments=json.dumps({"primary_intent": "greet"}))
+            message = SimpleNamespace(function_call=call, content=None)
+        else:
+            message = SimpleNamespace(function_call=None, content=f"reply {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _client(monkeypatch, cache):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    client = OllamaClient(cache=cache)
+    completions = FakeCompletions()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_function_calls_are_cached_across_tiers(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    client, completions = _client(monkeypatch, ResponseCache(path=path))
+    messages = [{"role": "user", "content": "hello   there"}]
+    first = client.chat(messages, functions=[get_intent_function()])
+    second = client.chat([{"role": "user", "content": "hello there"}], functions=[get_intent_function()])
+    assert first == second
+    assert completions.calls == 1
+    assert client.cache.stats()["memory_hits"] == 1
+
+    # A fresh process only has the SQLite tier
+    client2, completions2 = _client(monkeypatch, ResponseCache(path=path))
+    client2.chat(messages, functions=[get_intent_function()])
+    assert completions2.calls == 0
+    assert client2.cache.stats()["disk_hits"] == 1
+
+
+def test_text_completions_are_opt_in(tmp_path, monkeypatch):
+    client, completions = _client(monkeypatch, ResponseCache(path=str(tmp_path / "c.sqlite3")))
+    messages = [{"role": "user", "content": "write something"}]
+    assert client.chat(messages) != client.chat(messages)
+    assert client.chat(messages, cache=True) == client.chat(messages, cache=True)
+    assert completions.calls == 3
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "c.sqlite3"), ttl=0.05, max_memory_entries=2, max_disk_entries=3)
+    for i in range(5):
+        cache.put(f"k{i}", {"n": i})
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["evictions"] == 3 + 2
+    assert cache.get("k4") == {"n": 4}
+    time.sleep(0.06)
+    assert cache.get("k4") is None
+    assert cache.stats()["expired"] == 1
@@ -0,0 +1,29 @@
+from conftest import FakeOllama
+from src.sentiment.sentiment import SentimentAnalyzer
+
+
+def test_clear_messages_answered_locally():
+    ollama = FakeOllama()
+    analyzer = SentimentAnalyzer(ollama_client=ollama)
+    assert analyzer.analyze("ok thanks").label == "POSITIVE"
+    assert analyzer.analyze("sure, got it").label == "NEUTRAL"
+    assert ollama.calls == []
+    assert analyzer.stats()["llm_calls_avoided"] == 2
+
+
+def test_negative_negated_and_uncertain_go_to_llm():
+    ollama = FakeOllama()
+    analyzer = SentimentAnalyzer(ollama_client=ollama)
+    texts = ["this is terrible, I hate it", "not bad", "hi", "I will sue you", "what time is it",
+             "you people charged my card twice and I want my money back today",
+             "great, the site is down again and I lost a whole day of work"]
+    for text in texts:
+        analyzer.analyze(text)
+    assert ollama.calls == ["analyze_sentiment"] * len(texts)
+    assert analyzer.stats() == {"llm_calls_avoided": 0, "llm_calls": len(texts), "avoided_rate": 0.0}
+
+
+def test_prefilter_can_be_disabled():
+    ollama = FakeOllama()
+    SentimentAnalyzer(ollama_client=ollama, prefilter=False).analyze("ok thanks")
+    assert ollama.calls == ["analyze_sentiment"]
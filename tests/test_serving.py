@@ -0,0 +1,116 @@
+import threading
+
+from src import web
+from src.store.learning_store import LearningStore
+
+
+def test_create_app_serves_its_own_agent(make_agent):
+    agent = make_agent()
+    app = web.create_app(agent)
+    assert app.extensions["agent_warmup"].wait(0) is agent
+    client = app.test_client()
+    resp = client.post("/chat", json={"message": "add two and two for me"})
+    assert resp.status_code == 200
+    assert resp.get_json()["reply"]
+    # A second app gets a separate agent and metrics
+    other = web.create_app(make_agent())
+    assert other.extensions["agent_metrics"] is not app.extensions["agent_metrics"]
+
+
+def test_readiness_follows_background_warmup(make_agent, monkeypatch):
+    monkeypatch.setattr(web, "WARMUP_WAIT_SECONDS", 0.05)
+    release = threading.Event()
+    agent = make_agent()
+
+    def slow_factory(index_docs=True):
+        release.wait(5)
+        return agent
+
+    app = web.create_app(factory=slow_factory)
+    client = app.test_client()
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/readyz").status_code == 503
+    resp = client.post("/chat", json={"message": "add two and two for me"})
+    assert resp.status_code == 503 and resp.headers["Retry-After"]
+
+    release.set()
+    assert app.extensions["agent_warmup"].wait(5) is agent
+    assert client.post("/chat", json={"message": "add two and two for me"}).status_code == 200
+    ready = client.get("/readyz")
+    assert ready.status_code == 200
+    assert ready.get_json()["first_request_seconds"] is not None
+
+
+def test_failed_warmup_is_reported(monkeypatch):
+    def broken_factory(index_docs=True):
+        raise RuntimeError("no stores")
+
+    app = web.create_app(factory=broken_factory)
+    app.extensions["agent_warmup"].wait(5)
+    resp = app.test_client().get("/readyz")
+    assert resp.status_code == 503
+    assert "no stores" in resp.get_json()["error"]
+
+
+
+def test_indexing_failure_keeps_the_agent_ready(make_agent):
+    agent = make_agent()
+
+    class BrokenDocs:
+        def index(self):
+            raise OSError("docs unreadable")
+
+    agent.docs = BrokenDocs()
+    app = web.create_app(factory=lambda index_docs=True: agent)
+    warmup = app.extensions["agent_warmup"]
+    assert warmup.wait(5) is agent
+    warmup._thread.join(5)
+    resp = app.test_client().get("/readyz")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["state"] == "ready_index_failed" and "docs unreadable" in body["index_error"]
+    assert body["error"] is None
+
+def test_learning_store_picks_up_other_process_writes(tmp_path):
+    # Two handles on one directory stand in for two worker processes
+    first = LearningStore(learning_dir=str(tmp_path))
+    second = LearningStore(learning_dir=str(tmp_path))
+    first.teach("deploy", ["build", "push"])
+    second.teach("rollback", ["revert"])
+    names = {l["name"] for l in first.list_learnings()}
+    assert names == {"deploy", "rollback"}
+    assert second.execute_learning(name="deploy")["success"]
+
+
+def test_stopped_server_finishes_in_flight_requests():
+    import urllib.request
+    from werkzeug.serving import make_server
+    from src.serve import InFlightRequests
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_app(environ, start_response):
+        started.set()
+        start_response("200 OK", [("Content-Type", "text/plain")])
+
+        def body():
+            release.wait(5)
+            yield b"done"
+        return body()
+
+    in_flight = InFlightRequests(slow_app)
+    server = make_server("127.0.0.1", 0, in_flight, threaded=True)
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    replies = []
+    client = threading.Thread(target=lambda: replies.append(urllib.request.urlopen(f"http://127.0.0.1:{server.port}/").read()))
+    client.start()
+    assert started.wait(5)
+    server.shutdown()
+    serving.join(5)
+    server.server_close()
+    assert in_flight.count == 1 and not in_flight.wait_idle(0.1)
+    release.set()
+    assert in_flight.wait_idle(5)
+    client.join(5)
+    assert replies == [b"done"]
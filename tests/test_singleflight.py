@@ -0,0 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fake_openai_server import FakeOpenAIServer
+from src.llm_client.call_metrics import CallMetrics
+from src.llm_client.ollama_client import OllamaClient, AsyncOllamaClient
+from src.llm_client.resilience import ResiliencePolicy
+from src.llm_client.singleflight import SingleFlight
+
+SUMMARIZE = [{"name": "summarize_conversation", "parameters": {"type": "object", "properties": {}}}]
+MESSAGES = [{"role": "user", "content": "same buffer"}]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeOpenAIServer(responses={"summarize_conversation": {"summary": "s", "key_topics": []}}, latency=0.2) as fake:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        yield fake
+
+
+def test_sync_identical_calls_share_one_request(server):
+    flights = SingleFlight()
+    client = OllamaClient(singleflight=flights, metrics=CallMetrics(), resilience=ResiliencePolicy(hedge_delay=None))
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: client.chat(MESSAGES, functions=SUMMARIZE), range(5)))
+    assert len(server.requests) == 1
+    assert all(r["arguments"] == {"summary": "s", "key_topics": []} for r in results)
+    # Followers get their own copy
+    results[0]["arguments"]["summary"] = "changed"
+    assert results[1]["arguments"]["summary"] == "s"
+    assert flights.stats()["deduplicated"] == 4
+
+
+def test_async_identical_calls_share_one_request(server):
+    flights = SingleFlight()
+    client = AsyncOllamaClient(singleflight=flights, metrics=CallMetrics(), resilience=ResiliencePolicy(hedge_delay=None))
+
+    async def run():
+        same = [client.chat(MESSAGES, functions=SUMMARIZE) for _ in range(4)]
+        other = client.chat([{"role": "user", "content": "different"}], functions=SUMMARIZE)
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(run())
+    assert len(server.requests) == 2
+    assert len(results) == 5
+    assert flights.stats()["deduplicated"] == 3
+
+
+def test_followers_see_the_leaders_error():
+    flights = SingleFlight()
+    started = []
+
+    def boom():
+        started.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flights.do, "k", boom) for _ in range(3)]
+        errors = [f.exception() for f in futures]
+    assert len(started) == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flights.stats()["in_flight"] == 0
@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+
+from src.store.background_executor import BackgroundExecutor
+from src.store.continuous_learning import ContinuousLearning
+from src.store.conversation_analyzer import ConversationAnalyzer
+from src.store.file_utils import atomic_write_json
+from src.store.learning_store import LearningStore
+from src.store.memory_types import MemoryTypes
+
+
+def _hammer(threads, fn):
+    workers = [threading.Thread(target=fn, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "data.json"
+    atomic_write_json(str(path), {"a": 1})
+    atomic_write_json(str(path), {"a": 2})
+    assert json.loads(path.read_text()) == {"a": 2}
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_learning_store_concurrent_updates(tmp_path):
+    store = LearningStore(learning_dir=str(tmp_path))
+    store.teach("shared", ["step"])
+
+    def work(t):
+        for i in range(25):
+            store.teach(f"proc {t} {i}", ["a", "b"], tags=[f"t{t}"])
+            store.execute_learning(name="shared")
+            store.list_learnings()
+            store.get_stats()
+
+    _hammer(8, work)
+    reloaded = LearningStore(learning_dir=str(tmp_path))
+    assert reloaded.get_stats()["total"] == 8 * 25 + 1
+    assert reloaded.get_learning(name="shared")["learning"]["execution_count"] == 8 * 25
+
+
+def test_returned_learnings_are_copies(tmp_path):
+    store = LearningStore(learning_dir=str(tmp_path))
+    store.teach("copy me", ["one"])
+    store.get_learning(name="copy me")["learning"]["steps"].append("mutated")
+    assert store.get_learning(name="copy me")["learning"]["steps"] == ["one"]
+
+
+class NullOllama:
+    def chat(self, messages, functions=None, **kwargs):
+        return {"content": "no call"}
+
+
+def test_conversation_buffers_under_concurrent_turns(tmp_path):
+    executor = BackgroundExecutor(path=str(tmp_path / "jobs.sqlite3"))
+    try:
+        analyzer = ConversationAnalyzer(NullOllama(), persist_dir=str(tmp_path), executor=executor)
+        memory_types = MemoryTypes(NullOllama(), None, None, persist_dir=str(tmp_path), executor=executor)
+        learning = ContinuousLearning(NullOllama(), None, executor=executor)
+
+        def work(t):
+            for i in range(50):
+                message = f"user {t} message {i}"
+                analyzer.log_conversation(message, "reply", {"label": "NEUTRAL", "score": 0.5})
+                memory_types.add_interaction(message, "reply", {"label": "NEUTRAL", "score": 0.5})
+                learning.process_message(message, "reply")
+
+        _hammer(8, work)
+        executor.flush(timeout=10)
+        log = json.loads((tmp_path / "conversation_log.json").read_text())
+        assert len(log["conversations"]) == 400
+        assert len(memory_types.conversation_buffer) <= 10
+        assert len(learning.conversation_buffer) <= 5
+    finally:
+        executor.shutdown(flush=False, timeout=1.0)